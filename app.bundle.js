@@ -214,21 +214,35 @@ const gamesData = [
   },
 ];
 
+// Feed pre-computado pelo pipeline Python (events.json): times, contagem e proximas partidas
+let eventsFeedPromise = null;
+
+function loadEventsFeed(force = false) {
+  if (!eventsFeedPromise || force) {
+    eventsFeedPromise = fetch("./events.json", { cache: force ? "no-cache" : "default" }).then(
+      (res) => {
+        if (!res.ok) throw new Error(`events.json HTTP ${res.status}`);
+        return res.json();
+      },
+    );
+    eventsFeedPromise.catch(() => {
+      eventsFeedPromise = null;
+    });
+  }
+  return eventsFeedPromise;
+}
+
 async function loadTeamsData() {
   try {
-    const res = await fetch("./scripts/data/teams.json");
-    if (!res.ok) {
-      console.warn("teams.json not available, using empty teams");
-      return;
-    }
-    const data = await res.json();
+    const feed = await loadEventsFeed();
+    const teams = feed.teams || {};
     for (const game of gamesData) {
-      if (data[game.id]) {
-        game.teams = data[game.id];
+      if (teams[game.id]) {
+        game.teams = teams[game.id];
       }
     }
   } catch (err) {
-    console.error("Failed to load teams.json:", err);
+    console.error("Failed to load events.json teams:", err);
   }
 }
 
@@ -242,11 +256,9 @@ const features = [
 // ==================== UTILS: API ====================
 async function loadCalendarData() {
   try {
-    const res = await fetch("./calendar.ics");
-    const text = await res.text();
-    const count = (text.match(/BEGIN:VEVENT/g) || []).length;
+    const feed = await loadEventsFeed();
     const el = document.getElementById("events-count");
-    if (el) animateCounter(el, 0, count, 2000);
+    if (el) animateCounter(el, 0, feed.total_events || 0, 2000);
   } catch (err) {
     console.error("Calendar load error:", err);
     const el = document.getElementById("events-count");
@@ -256,35 +268,17 @@ async function loadCalendarData() {
 
 async function loadLastUpdate() {
   try {
-    const apiUrl =
-      "https://api.github.com/repos/otaviozanon/esportCalendar/commits?path=calendar.ics&page=1&per_page=1";
-    const res = await fetch(apiUrl);
-    if (res.ok) {
-      const commits = await res.json();
-      if (commits.length > 0) {
-        const lastCommit = commits[0];
-        const date = new Date(lastCommit.commit.author.date);
-        const el = document.getElementById("last-update");
-        if (el) {
-          el.textContent = date.toLocaleString("pt-BR", {
-            day: "2-digit",
-            month: "2-digit",
-            year: "numeric",
-            hour: "2-digit",
-            minute: "2-digit",
-          });
-        }
-        return;
-      }
-    }
-    const stateRes = await fetch("./scripts/data/state.json");
-    const state = await stateRes.json();
-    const dates = Object.values(state.last_run || {});
-    if (dates.length > 0) {
-      const mostRecent = dates.sort().reverse()[0];
-      const date = new Date(mostRecent);
-      const el = document.getElementById("last-update");
-      if (el) el.textContent = date.toLocaleString("pt-BR");
+    const feed = await loadEventsFeed();
+    const date = new Date(feed.generated_at);
+    const el = document.getElementById("last-update");
+    if (el) {
+      el.textContent = date.toLocaleString("pt-BR", {
+        day: "2-digit",
+        month: "2-digit",
+        year: "numeric",
+        hour: "2-digit",
+        minute: "2-digit",
+      });
     }
   } catch (err) {
     console.error("Last update load error:", err);
@@ -792,92 +786,6 @@ async function init() {
   }
 }
 
-// ==================== ICS PARSER (UTILITY) ====================
-
-/**
- * Parser leve de arquivos .ics (iCalendar)
- * Extrai eventos (VEVENT) sem dependências externas
- */
-class ICSParser {
-  /**
-   * Parse de texto .ics para array de eventos
-   * @param {string} icsText - Conteúdo do arquivo .ics
-   * @returns {Array} Array de eventos parseados
-   */
-  static parse(icsText) {
-    const events = [];
-    const lines = icsText.split(/\r?\n/);
-    let inEvent = false;
-    let currentEvent = {};
-    let lastKey = null;
-
-    for (let i = 0; i < lines.length; i++) {
-      let line = lines[i];
-
-      // Linhas continuadas começam com espaço ou tab
-      if (line.startsWith(" ") || line.startsWith("\t")) {
-        if (lastKey && currentEvent[lastKey]) {
-          currentEvent[lastKey] += line.trim();
-        }
-        continue;
-      }
-
-      line = line.trim();
-
-      if (line === "BEGIN:VEVENT") {
-        inEvent = true;
-        currentEvent = {};
-        lastKey = null;
-      } else if (line === "END:VEVENT") {
-        if (currentEvent.summary && currentEvent.dtstart) {
-          events.push({
-            summary: currentEvent.summary,
-            dtstart: currentEvent.dtstart,
-            description: currentEvent.description || "",
-          });
-        }
-        inEvent = false;
-        lastKey = null;
-      } else if (line === "BEGIN:VALARM") {
-        // Para de processar quando encontrar VALARM (evita pegar description do alarme)
-        inEvent = false;
-      } else if (inEvent) {
-        if (line.startsWith("SUMMARY:")) {
-          currentEvent.summary = line.substring(8);
-          lastKey = "summary";
-        } else if (line.startsWith("DTSTART:")) {
-          currentEvent.dtstart = line.substring(8);
-          lastKey = "dtstart";
-        } else if (line.startsWith("DESCRIPTION:")) {
-          currentEvent.description = line
-            .substring(12)
-            .replace(/\\n/g, "\n")
-            .replace(/\\,/g, ",");
-          lastKey = "description";
-        }
-      }
-    }
-
-    return events;
-  }
-
-  /**
-   * Converte string ICS de data para objeto Date
-   * @param {string} icsDate - Formato: 20260710T200000Z
-   * @returns {Date} Objeto Date UTC
-   */
-  static parseDate(icsDate) {
-    const year = parseInt(icsDate.substring(0, 4));
-    const month = parseInt(icsDate.substring(4, 6)) - 1;
-    const day = parseInt(icsDate.substring(6, 8));
-    const hour = parseInt(icsDate.substring(9, 11));
-    const minute = parseInt(icsDate.substring(11, 13));
-    const second = parseInt(icsDate.substring(13, 15));
-
-    return new Date(Date.UTC(year, month, day, hour, minute, second));
-  }
-}
-
 // ==================== LIVE CALENDAR COMPONENT ====================
 
 /**
@@ -966,64 +874,33 @@ class LiveCalendar {
     });
   }
 
-  async loadCalendar() {
+  async loadCalendar(force = false) {
     try {
-      const response = await fetch("calendar.ics");
-      const icsText = await response.text();
-
-      // Parse usando ICSParser utility
-      const rawEvents = ICSParser.parse(icsText);
-
-      // Transforma em formato do LiveCalendar
-      this.events = rawEvents.map((event) => {
-        const game = this.extractGame(event.summary);
-        const tournament = this.extractTournament(event.description);
-
-        return {
-          summary: event.summary.replace(/^\[.*?\]\s*/, ""),
-          game: game,
-          start: ICSParser.parseDate(event.dtstart),
-          description: event.description,
-          tournament: tournament,
-        };
-      });
+      const feed = await loadEventsFeed(force);
+
+      // Feed ja vem ordenado e agrupado por dia/jogo: apenas achata
+      this.events = [];
+      for (const day of feed.days || []) {
+        for (const [game, matches] of Object.entries(day.games)) {
+          for (const match of matches) {
+            this.events.push({
+              summary: `${match.team1} vs ${match.team2}`,
+              game: game,
+              start: new Date(match.start),
+              tournament: match.tournament,
+              url: match.url,
+            });
+          }
+        }
+      }
 
       this.displayEvents();
     } catch (error) {
-      console.error("Erro ao carregar calendar.ics:", error);
+      console.error("Erro ao carregar events.json:", error);
       this.showError();
     }
   }
 
-  extractGame(summary) {
-    if (summary.includes("[CS2]") || summary.includes("[CS]")) return "CS2";
-    if (summary.includes("[V]") || summary.includes("[VAL]")) return "VAL";
-    if (summary.includes("[LOL]")) return "LOL";
-    if (summary.includes("[RL]")) return "RL";
-    return "OTHER";
-  }
-
-  extractTournament(description) {
-    // Split por quebra de linha (real ou literal \n)
-    const lines = description.split(/\\n|\n/);
-
-    // Encontra a linha com 🏆
-    const tournamentLine = lines.find((line) => line.includes("🏆"));
-
-    if (!tournamentLine) return "";
-
-    // Remove 🏆 e espaços
-    let tournament = tournamentLine.replace("🏆", "").trim();
-
-    // Se tiver vírgula, pega tudo depois dela (nome do torneio geralmente vem depois)
-    const commaIndex = tournament.indexOf(",");
-    if (commaIndex !== -1) {
-      tournament = tournament.substring(commaIndex + 1).trim();
-    }
-
-    return tournament;
-  }
-
   displayEvents() {
     const grid = this.container.querySelector("#calendar-grid");
     const now = new Date();
@@ -1199,8 +1076,8 @@ class LiveCalendar {
 
   startAutoRefresh() {
     setInterval(() => {
-      console.log("🔄 Auto-refresh: recarregando calendar.ics...");
-      this.loadCalendar();
+      console.log("🔄 Auto-refresh: recarregando events.json...");
+      this.loadCalendar(true);
     }, this.refreshInterval);
   }
 }
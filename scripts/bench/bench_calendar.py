@@ -0,0 +1,348 @@
+"""
+Benchmark sintetico das operacoes de calendar_manager com calendarios grandes.
+
+Gera calendarios com N eventos (taxa de duplicatas, fracao de eventos de terceiros e
+inchaco de cabecalho configuraveis), mede tempo e pico de memoria de cada operacao do
+pipeline (indice por ID de partida, upsert de uma raspagem simulada, remocao de nao
+listadas, merge de tres vias e save), salva baseline e sinaliza regressoes e crescimento
+nao linear.
+
+Uso:
+    python scripts/bench/bench_calendar.py --sizes 1000,10000 --save-baseline
+    python scripts/bench/bench_calendar.py --sizes 1000,10000,100000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
+
+import pytz
+
+from icalendar import Calendar
+
+from config import SOURCE_MARKER, DELETE_OLDER_THAN_DAYS, MatchRecord
+from calendar_manager import (
+    load_calendar,
+    save_calendar_merged,
+    prune_older_than,
+    remove_events_by_prefix,
+    get_event_url,
+    match_id_date,
+    _get_event_start,
+    _loaded_bytes,
+)
+from merge import merge_calendars
+from reconcile import index_by_match_id, remove_unlisted, upsert_records
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PREFIXES = ("[CS2] ", "[V] ", "[RL] ", "[LOL] ")
+TEAMS = ("FURIA", "MIBR", "paiN Gaming", "LOUD", "Imperial", "RED Canids", "Vitality", "NAVI", "G2", "Liquid")
+
+# Tempo minimo (s) para considerar diferenca como regressao (evita ruido em operacoes rapidas)
+MIN_REGRESSION_DELTA = 0.005
+
+# Raspagem simulada: dias de pagina, fracao remarcada, fracao que sumiu da pagina e novas partidas
+SCRAPED_DAYS = 3
+RESCHEDULE_SHARE = 0.1
+UNLISTED_SHARE = 0.05
+NEW_SHARE = 0.05
+
+
+def _fold(line: str) -> str:
+    """Quebra linhas ICS em 75 octetos (RFC 5545)."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts, current = [], b""
+    for ch in line:
+        enc = ch.encode("utf-8")
+        if len(current) + len(enc) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += enc
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def generate_calendar_bytes(
+    n_events: int,
+    dup_rate: float = 0.05,
+    foreign_share: float = 0.1,
+    header_bloat: int = 0,
+    seed: int = 42,
+) -> bytes:
+    """Gera ICS sintetico com n_events VEVENTs espalhados em +-30 dias a partir de hoje."""
+    rng = random.Random(seed)
+    now = datetime.now(pytz.utc).replace(second=0, microsecond=0)
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Esport Calendar BR//tips.gg//",
+        "X-WR-CALNAME:eSports Calendar",
+        "X-WR-TIMEZONE:America/Sao_Paulo",
+    ]
+    lines += ["REFRESH-INTERVAL;VALUE=DURATION:PT1H"] * (header_bloat + 1)
+    lines.append("X-PUBLISHED-TTL:PT1H")
+
+    originals: List[Tuple[str, str, datetime, str]] = []
+    for i in range(n_events):
+        if originals and rng.random() < dup_rate:
+            # Duplicata: mesmo UID (metade) ou mesma URL com horario remarcado (outra metade)
+            uid, summary, start, url = rng.choice(originals)
+            if rng.random() < 0.5:
+                start = start + timedelta(minutes=rng.choice((15, 30, 60)))
+                uid = f"dup-{i}"
+        else:
+            prefix = rng.choice(PREFIXES)
+            t1, t2 = rng.sample(TEAMS, 2)
+            summary = f"{prefix}{t1} vs {t2}"
+            start = now + timedelta(minutes=rng.randint(-30 * 24 * 60, 30 * 24 * 60))
+            slug = f"{t1}-vs-{t2}".lower().replace(" ", "-")
+            url = f"https://tips.gg/matches/game/{start.strftime('%d-%m-%Y')}/{slug}/{i:05d}/"
+            uid = f"{i:08x}"
+            originals.append((uid, summary, start, url))
+
+        foreign = rng.random() < foreign_share
+        description = "Evento pessoal" if foreign else f"\U0001f3c6 Torneio\\n\U0001f310 {url}\\n{SOURCE_MARKER}"
+        end = start + timedelta(hours=2)
+        lines += [
+            "BEGIN:VEVENT",
+            _fold(f"SUMMARY:{summary}"),
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTEND:{end.strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTSTAMP:{now.strftime('%Y%m%dT%H%M%SZ')}",
+            f"UID:{uid}",
+            _fold(f"DESCRIPTION:{description}"),
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            _fold(f"DESCRIPTION:Lembrete: {summary}"),
+            "TRIGGER:-PT15M",
+            "END:VALARM",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def simulate_scrape(index: Dict[str, object], now: datetime, seed: int = 7) -> Tuple[List[MatchRecord], List[date], Set[str]]:
+    """
+    Raspagem sintetica dos proximos SCRAPED_DAYS dias a partir do indice: partidas listadas
+    (parte remarcada), parte que sumiu da pagina e partidas novas. Retorna (registros, dias, IDs listados).
+    """
+    rng = random.Random(seed)
+    days = [now.date() + timedelta(days=i) for i in range(SCRAPED_DAYS)]
+    records, listed = [], set()
+
+    for match_id, comp in index.items():
+        day = match_id_date(match_id)
+        if day not in days or rng.random() < UNLISTED_SHARE:
+            continue
+        start = _get_event_start(comp)
+        if rng.random() < RESCHEDULE_SHARE:
+            start += timedelta(minutes=30)
+        records.append(MatchRecord(
+            game="bench", uid=str(comp.get("uid")), match_id=match_id, team1="", team2="",
+            summary=str(comp.get("summary")), start_utc=start, tournament="Torneio",
+            url=get_event_url(comp), day=day,
+        ))
+        listed.add(match_id)
+
+    for i in range(int(len(records) * NEW_SHARE) + 1):
+        day = days[i % len(days)]
+        match_id = f"game/{day.strftime('%d-%m-%Y')}/nova-vs-partida/{i:05d}"
+        records.append(MatchRecord(
+            game="bench", uid=f"new-{i}", match_id=match_id, team1="", team2="",
+            summary=f"{PREFIXES[0]}Nova vs Partida", start_utc=now + timedelta(days=i % len(days), hours=1),
+            tournament="Torneio", url=f"https://tips.gg/matches/{match_id}/", day=day,
+        ))
+        listed.add(match_id)
+    return records, days, listed
+
+
+def _prepare(src_path: str, out_path: str, now: datetime) -> Dict[str, object]:
+    """Entradas das operacoes, fora da medicao: raspagem simulada, base do merge e arquivo em disco."""
+    with open(src_path, "rb") as f:
+        raw = f.read()
+    index, _ = index_by_match_id(Calendar.from_ical(raw))
+    with open(out_path, "wb") as f:
+        f.write(raw)
+    _loaded_bytes[out_path] = raw
+    return {"scrape": simulate_scrape(index, now), "base": Calendar.from_ical(raw)}
+
+
+def _operations(cutoff, now: datetime, ctx: Dict[str, object]) -> List[Tuple[str, Callable]]:
+    """
+    Sequencia de operacoes na ordem do pipeline. Cada uma recebe (cal, caminho_saida).
+    merge_calendars mede o caminho de gravacao concorrente (outra execucao gravou no meio);
+    save_calendar_merged, o caminho comum (arquivo em disco igual ao lido).
+    """
+    records, days, listed = ctx["scrape"]
+
+    def index(cal, out):
+        ctx["index"], _ = index_by_match_id(cal)
+
+    return [
+        ("prune_older_than", lambda cal, out: prune_older_than(cal, cutoff)),
+        ("index_by_match_id", index),
+        ("upsert_records", lambda cal, out: upsert_records(cal, ctx["index"], records)),
+        ("remove_unlisted", lambda cal, out: remove_unlisted(cal, ctx["index"], PREFIXES[0], days, listed, now)),
+        ("merge_calendars", lambda cal, out: merge_calendars(ctx["base"], cal, ctx["base"])),
+        ("save_calendar_merged", lambda cal, out: save_calendar_merged(cal, out)),
+        ("remove_events_by_prefix", lambda cal, out: remove_events_by_prefix(cal, "[RL] ")),
+    ]
+
+
+def _run_pass(src_path: str, out_path: str, measure_memory: bool) -> Dict[str, float]:
+    """Executa load + operacoes em sequencia. Retorna segundos ou bytes de pico por operacao."""
+    results = {}
+    now = datetime.now(pytz.utc)
+    cutoff = now.date() - timedelta(days=DELETE_OLDER_THAN_DAYS)
+    ctx = _prepare(src_path, out_path, now)
+
+    def measure(name: str, fn: Callable):
+        if measure_memory:
+            tracemalloc.start()
+            value = fn()
+            results[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            started = time.perf_counter()
+            value = fn()
+            results[name] = time.perf_counter() - started
+        return value
+
+    cal = measure("load_calendar", lambda: load_calendar(src_path))
+    for name, op in _operations(cutoff, now, ctx):
+        measure(name, lambda: op(cal, out_path))
+    return results
+
+
+def run_benchmark(sizes: List[int], dup_rate: float, foreign_share: float, header_bloat: int) -> Dict[str, Dict]:
+    """Roda o benchmark para cada tamanho. Retorna {tamanho: {operacao: {seconds, peak_bytes}}}."""
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            src_path = os.path.join(tmp, f"cal_{n}.ics")
+            out_path = os.path.join(tmp, f"out_{n}.ics")
+            with open(src_path, "wb") as f:
+                f.write(generate_calendar_bytes(n, dup_rate, foreign_share, header_bloat))
+
+            times = _run_pass(src_path, out_path, measure_memory=False)
+            memory = _run_pass(src_path, out_path, measure_memory=True)
+            report[str(n)] = {
+                op: {"seconds": round(times[op], 6), "peak_bytes": memory[op]} for op in times
+            }
+            print(f"  {n} eventos ({os.path.getsize(src_path) / 1024:.0f} KB) medidos", flush=True)
+    return report
+
+
+def scaling_exponents(report: Dict[str, Dict]) -> Dict[str, float]:
+    """Expoente de crescimento entre o menor e o maior tamanho (1.0 = linear)."""
+    sizes = sorted(int(n) for n in report)
+    if len(sizes) < 2:
+        return {}
+    small, large = str(sizes[0]), str(sizes[-1])
+    exponents = {}
+    for op, stats in report[large].items():
+        t_small = report[small][op]["seconds"]
+        if t_small > 0 and stats["seconds"] > 0:
+            exponents[op] = math.log(stats["seconds"] / t_small) / math.log(sizes[-1] / sizes[0])
+    return exponents
+
+
+def compare_to_baseline(report: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Lista regressoes de tempo ou memoria acima de threshold x baseline."""
+    regressions = []
+    for n, ops in report.items():
+        for op, stats in ops.items():
+            base = baseline.get(n, {}).get(op)
+            if not base:
+                continue
+            if (
+                stats["seconds"] > base["seconds"] * threshold
+                and stats["seconds"] - base["seconds"] > MIN_REGRESSION_DELTA
+            ):
+                regressions.append(
+                    f"{op} @ {n}: {stats['seconds']:.4f}s vs baseline {base['seconds']:.4f}s"
+                )
+            if base["peak_bytes"] and stats["peak_bytes"] > base["peak_bytes"] * threshold:
+                regressions.append(
+                    f"{op} @ {n}: pico {stats['peak_bytes'] / 1e6:.1f} MB vs baseline {base['peak_bytes'] / 1e6:.1f} MB"
+                )
+    return regressions
+
+
+def print_report(report: Dict[str, Dict]) -> None:
+    sizes = sorted(report, key=int)
+    ops = list(report[sizes[0]])
+    header = f"{'operacao':<26}" + "".join(f"{n + ' ev':>22}" for n in sizes)
+    print(header)
+    print("-" * len(header))
+    for op in ops:
+        row = f"{op:<26}"
+        for n in sizes:
+            stats = report[n][op]
+            row += f"{stats['seconds'] * 1000:>11.1f} ms {stats['peak_bytes'] / 1e6:>6.1f} MB"
+        print(row)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sintetico de calendar_manager")
+    parser.add_argument("--sizes", default="1000,10000", help="Tamanhos separados por virgula (ex: 1000,10000,100000)")
+    parser.add_argument("--dup-rate", type=float, default=0.05, help="Fracao de eventos duplicados")
+    parser.add_argument("--foreign-share", type=float, default=0.1, help="Fracao de eventos sem SOURCE_MARKER")
+    parser.add_argument("--header-bloat", type=int, default=0, help="Linhas REFRESH-INTERVAL repetidas no cabecalho")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Arquivo de baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava resultados como nova baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Fator que caracteriza regressao")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Expoente de escala acima do qual alerta")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(
+        f"Benchmark calendar_manager | tamanhos {sizes} | duplicatas {args.dup_rate:.0%} "
+        f"| terceiros {args.foreign_share:.0%} | cabecalho +{args.header_bloat}"
+    )
+    report = run_benchmark(sizes, args.dup_rate, args.foreign_share, args.header_bloat)
+    print_report(report)
+
+    failed = False
+    exponents = scaling_exponents(report)
+    if exponents:
+        print("\nEscala (1.0 = linear):")
+        for op, exp in exponents.items():
+            flag = "  <-- nao linear" if exp > args.max_exponent else ""
+            failed |= bool(flag)
+            print(f"  {op:<26}{exp:.2f}{flag}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline salva em {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.threshold)
+        if regressions:
+            failed = True
+            print(f"\nRegressoes (> {args.threshold}x baseline):")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print("\nSem regressoes em relacao a baseline.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Arquivo historico das partidas podadas do calendario.
+
+Eventos removidos por prune_older_than sao anexados em particoes mensais
+(scripts/data/archive/YYYY-MM.jsonl.gz, mes pela data BRT do jogo), uma linha JSON
+compacta por partida. O arquivo so cresce por append: cada append vira um novo membro
+gzip, lido de forma transparente pelo gzip.open. O calendar.ics continua pequeno.
+
+Consulta (le apenas as particoes do periodo pedido):
+    python scripts/core/archive.py --team FURIA --game CS2 --year 2026
+    python scripts/core/archive.py --game VAL --from 2026-06 --to 2026-08 --json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List
+
+import pytz
+
+from config import ARCHIVE_DIR, BR_TZ_NAME, normalize_team
+from calendar_manager import _get_event_start, extract_match_id
+from feeds import event_entry, parse_summary, prefix_table
+from registry import load_registry
+
+BR_TZ = pytz.timezone(BR_TZ_NAME)
+PARTITION_PATTERN = re.compile(r"^(\d{4}-\d{2})\.jsonl\.gz$")
+
+
+def _partition_path(month: str, archive_dir: str) -> str:
+    return os.path.join(archive_dir, f"{month}.jsonl.gz")
+
+
+def build_archive_record(comp, prefixes) -> dict | None:
+    """Linha do arquivo para um VEVENT nosso. None se sem horario ou de jogo desconhecido."""
+    start = _get_event_start(comp)
+    parsed = parse_summary(str(comp.get("summary", "")), prefixes)
+    if start is None or parsed is None:
+        return None
+    game, team1, team2 = parsed
+    entry = event_entry(comp, start, team1, team2)
+    return {"game": game, "match_id": extract_match_id(entry["url"]), **entry}
+
+
+def archive_events(components: Iterable, archive_dir: str = ARCHIVE_DIR) -> int:
+    """Anexa eventos podados nas particoes mensais. Retorna quantos foram arquivados."""
+    prefixes = prefix_table(load_registry())
+    by_month: Dict[str, List[dict]] = {}
+
+    for comp in components:
+        record = build_archive_record(comp, prefixes)
+        if record is None:
+            continue
+        start = _get_event_start(comp)
+        by_month.setdefault(start.astimezone(BR_TZ).strftime("%Y-%m"), []).append(record)
+
+    if not by_month:
+        return 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    for month, records in sorted(by_month.items()):
+        lines = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        with gzip.open(_partition_path(month, archive_dir), "at", encoding="utf-8") as f:
+            f.write(lines)
+    return sum(len(r) for r in by_month.values())
+
+
+def list_partitions(archive_dir: str = ARCHIVE_DIR, month_from: str = None, month_to: str = None) -> List[str]:
+    """Meses (YYYY-MM) com particao no disco dentro do intervalo inclusivo informado."""
+    if not os.path.isdir(archive_dir):
+        return []
+    months = []
+    for name in os.listdir(archive_dir):
+        match = PARTITION_PATTERN.match(name)
+        if not match:
+            continue
+        month = match.group(1)
+        if (month_from and month < month_from) or (month_to and month > month_to):
+            continue
+        months.append(month)
+    return sorted(months)
+
+
+def query_archive(
+    team: str = None,
+    game: str = None,
+    month_from: str = None,
+    month_to: str = None,
+    archive_dir: str = ARCHIVE_DIR,
+) -> Iterator[dict]:
+    """
+    Partidas arquivadas que batem com os filtros, em ordem de particao e de gravacao.
+    Linhas repetidas (execucao que arquivou mas falhou ao salvar o calendario) saem uma vez.
+    """
+    seen = set()
+    team_norm = normalize_team(team) if team else None
+    game = game.upper() if game else None
+
+    for month in list_partitions(archive_dir, month_from, month_to):
+        with gzip.open(_partition_path(month, archive_dir), "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if game and record["game"] != game:
+                    continue
+                if team_norm and team_norm not in (normalize_team(record["team1"]), normalize_team(record["team2"])):
+                    continue
+                if record["uid"] in seen:
+                    continue
+                seen.add(record["uid"])
+                yield record
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta o historico de partidas arquivadas")
+    parser.add_argument("--team", help="Time (qualquer lado da partida)")
+    parser.add_argument("--game", help="Jogo (CS2, VAL, RL, LOL)")
+    parser.add_argument("--year", help="Ano (atalho para --from YYYY-01 --to YYYY-12)")
+    parser.add_argument("--from", dest="month_from", help="Mes inicial YYYY-MM")
+    parser.add_argument("--to", dest="month_to", help="Mes final YYYY-MM")
+    parser.add_argument("--json", action="store_true", help="Saida em JSON lines")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    month_from, month_to = args.month_from, args.month_to
+    if args.year:
+        month_from, month_to = month_from or f"{args.year}-01", month_to or f"{args.year}-12"
+
+    total = 0
+    for record in query_archive(args.team, args.game, month_from, month_to, args.archive_dir):
+        total += 1
+        if args.json:
+            print(json.dumps(record, ensure_ascii=False))
+        else:
+            print(f"{record['start']}  [{record['game']}] {record['team1']} vs {record['team2']}  {record['tournament']}")
+    if not args.json:
+        print(f"{total} partidas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Deteccao de mudanca nos artefatos versionados pelo workflow (calendar.ics e janelas,
+events.json, changelog.jsonl, state.json, teams.json, healthcheck.json e os calendarios
+dos perfis de filtro).
+
+Cada artefato tem um hash de conteudo no manifest.json, calculado sem os campos volateis
+(timestamps da execucao). Um artefato so e regravado quando o hash muda; ao final da
+execucao report_verdict() imprime "changed"/"unchanged" e exporta o veredito para o
+GitHub Actions, que pula o commit quando nada relevante mudou.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Set
+
+from config import (
+    CALENDAR_FILENAME,
+    EVENTS_FEED_FILE,
+    WINDOW_FEEDS,
+    STATE_FILE,
+    TEAMS_FILE,
+    HEALTHCHECK_FILE,
+    MANIFEST_FILE,
+    CHANGELOG_FILE,
+    NOTIFY_OUTBOX_FILE,
+    PROFILES_DIR,
+)
+from locking import file_lock
+
+TRACKED_ARTIFACTS = (
+    CALENDAR_FILENAME, *WINDOW_FEEDS, EVENTS_FEED_FILE, CHANGELOG_FILE,
+    NOTIFY_OUTBOX_FILE, STATE_FILE, TEAMS_FILE, HEALTHCHECK_FILE,
+)
+
+# Campos (caminho pontuado) ignorados no hash: mudam a cada execucao sem mudar o dado.
+# No healthcheck so sucesso/erros contam; estatisticas da execucao vao junto quando ha commit.
+VOLATILE_FIELDS = {
+    EVENTS_FEED_FILE: ("generated_at",),
+    HEALTHCHECK_FILE: ("timestamp", "stats", "games", "notifications", "freshness"),
+}
+
+_manifest_cache: Dict[str, str] | None = None
+_changed: Set[str] = set()
+
+
+def _artifact_key(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def _is_tracked(key: str) -> bool:
+    """Artefatos fixos e calendarios dos perfis de filtro (PROFILES_DIR)."""
+    return key in TRACKED_ARTIFACTS or key.startswith(f"{PROFILES_DIR}/")
+
+
+def _drop_field(data, dotted: str) -> None:
+    *parents, leaf = dotted.split(".")
+    for name in parents:
+        if not isinstance(data, dict):
+            return
+        data = data.get(name)
+    if isinstance(data, dict):
+        data.pop(leaf, None)
+
+
+def content_hash(path: str, content: bytes) -> str:
+    """SHA-256 do conteudo significativo: JSONs sem campos volateis e com chaves ordenadas."""
+    volatile = VOLATILE_FIELDS.get(_artifact_key(path))
+    if volatile:
+        try:
+            data = json.loads(content)
+            for dotted in volatile:
+                _drop_field(data, dotted)
+            content = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_manifest(path: str = MANIFEST_FILE) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError):
+        return {}
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Dict[str, str]:
+    """Carrega {artefato: hash}. Com cache em memoria."""
+    global _manifest_cache
+    if _manifest_cache is None:
+        _manifest_cache = _read_manifest(path)
+    return _manifest_cache
+
+
+def _atomic_write(path: str, content: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_artifact(path: str, content: bytes) -> bool:
+    """
+    Grava artefato apenas se o conteudo significativo mudou (ou o arquivo nao existe).
+    Mudancas so em campos volateis sao gravadas apenas se outro artefato ja mudou nesta
+    execucao (vao no mesmo commit). Caminhos fora de TRACKED_ARTIFACTS sao sempre gravados.
+    Retorna True se gravou.
+    Levanta IOError/PermissionError como open().
+    """
+    key = _artifact_key(path)
+    if not _is_tracked(key):
+        _atomic_write(path, content)
+        return True
+
+    manifest = load_manifest()
+    digest = content_hash(key, content)
+    if manifest.get(key) == digest and os.path.exists(path):
+        if not _changed or key in _changed:
+            return False
+        with open(path, "rb") as f:
+            if f.read() == content:
+                return False
+        _atomic_write(path, content)
+        return True
+
+    global _manifest_cache
+    with file_lock():
+        _atomic_write(path, content)
+        # Rele do disco: outra execucao pode ter atualizado outras entradas
+        manifest = _read_manifest()
+        manifest[key] = digest
+        _manifest_cache = manifest
+        _atomic_write(MANIFEST_FILE, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    _changed.add(key)
+    return True
+
+
+def changed_artifacts() -> Set[str]:
+    """Artefatos regravados nesta execucao."""
+    return set(_changed)
+
+
+def report_verdict() -> str:
+    """Imprime o veredito ("changed"/"unchanged") e o exporta em $GITHUB_OUTPUT como artifacts=<veredito>."""
+    verdict = "changed" if _changed else "unchanged"
+    detail = f" ({', '.join(sorted(_changed))})" if _changed else ""
+    print(f"artifacts: {verdict}{detail}")
+
+    github_output = os.getenv("GITHUB_OUTPUT")
+    if github_output:
+        with open(github_output, "a", encoding="utf-8") as f:
+            f.write(f"artifacts={verdict}\n")
+    return verdict
@@ -0,0 +1,329 @@
+"""
+Backfill de um intervalo de datas para um ou mais jogos.
+
+Busca as paginas de dia pela camada de provedores (fetch_with_retry) em N threads, dentro
+de um orcamento de requisicoes limitado pela cota mensal restante, e parseia o HTML num
+pool de processos. Cada pagina concluida vai para um spool local e e marcada em
+state["backfill"]; um job interrompido (Ctrl+C, cota, falhas) retoma de onde parou ao
+rodar o mesmo comando. Ao final, tudo e mesclado de uma vez: partidas anteriores ao corte
+de DELETE_OLDER_THAN_DAYS vao para o arquivo historico, as demais para o calendario.
+
+Uso:
+    python scripts/core/backfill.py --from 2026-09-01 --to 2026-09-30 --games CS2,VAL
+    python scripts/core/backfill.py --from 2026-09-01 --to 2026-09-30 --concurrency 4 --budget 200
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Set, Tuple
+
+import pytz
+
+from config import (
+    BACKFILL_SPOOL_FILE,
+    BR_TZ_NAME,
+    DELETE_OLDER_THAN_DAYS,
+    MAX_RETRIES,
+    MatchRecord,
+)
+from logger import setup_logger
+from calendar_manager import load_calendar, save_calendar_merged, create_event, build_event_description
+from reconcile import index_by_match_id, upsert_records
+from archive import archive_events
+from feeds import write_feeds
+from match_table import update_match_table
+from locking import file_lock
+from registry import load_registry
+from scraper import (
+    build_url_for_day,
+    fetch_with_retry,
+    get_active_api,
+    get_requests_by_provider,
+    load_render_decisions,
+    parse_day_page,
+)
+from fetch_trace import trace_context
+from generate_ics import load_state, save_state, record_usage, get_quota_remaining
+
+BR_TZ = pytz.timezone(BR_TZ_NAME)
+DEFAULT_CONCURRENCY = 2
+DEFAULT_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+# Requisicoes reservadas por pagina em voo: Scrape.do sem render + com render em cada tentativa
+PAGE_REQUEST_RESERVE = 2 * MAX_RETRIES
+
+logger = setup_logger("backfill")
+
+
+# ==================== SPOOL (resultados parciais) ====================
+
+def _record_to_json(record: MatchRecord) -> str:
+    return json.dumps({
+        "game": record.game, "uid": record.uid, "match_id": record.match_id,
+        "team1": record.team1, "team2": record.team2, "summary": record.summary,
+        "start_utc": record.start_utc.isoformat(), "tournament": record.tournament,
+        "url": record.url, "day": record.day.isoformat(), "organizer": record.organizer,
+    }, ensure_ascii=False)
+
+
+def _record_from_json(line: str) -> MatchRecord:
+    data = json.loads(line)
+    data["start_utc"] = datetime.fromisoformat(data["start_utc"])
+    data["day"] = date.fromisoformat(data["day"])
+    return MatchRecord(**data)
+
+
+def _append_spool(records: List[MatchRecord], path: str = BACKFILL_SPOOL_FILE) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(_record_to_json(record) + "\n")
+
+
+def _read_spool(path: str = BACKFILL_SPOOL_FILE) -> List[MatchRecord]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [_record_from_json(line) for line in f if line.strip()]
+
+
+def _clear_spool(path: str = BACKFILL_SPOOL_FILE) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# ==================== PLANO E CHECKPOINT ====================
+
+def plan_pages(game_keys: List[str], day_from: date, day_to: date) -> List[Tuple[str, date]]:
+    """Paginas (jogo, dia) do intervalo inclusivo, em ordem de dia."""
+    days = [day_from + timedelta(days=i) for i in range((day_to - day_from).days + 1)]
+    return [(game_key, day) for day in days for game_key in game_keys]
+
+
+def _page_key(game_key: str, day: date) -> str:
+    return f"{game_key}:{day.isoformat()}"
+
+
+def load_checkpoint(state: dict, job: dict, restart: bool) -> dict:
+    """Checkpoint do job em state['backfill']; comeca do zero se o job mudou ou restart."""
+    checkpoint = state.get("backfill")
+    if restart or not checkpoint or checkpoint.get("job") != job:
+        if checkpoint:
+            logger.info("♻️  Descartando checkpoint de backfill anterior")
+        _clear_spool()
+        checkpoint = {"job": job, "done": [], "started_at": datetime.now(pytz.utc).isoformat()}
+        state["backfill"] = checkpoint
+    return checkpoint
+
+
+# ==================== EXECUCAO ====================
+
+def _requests_made() -> int:
+    return sum(get_requests_by_provider().values())
+
+
+def _fetch_page(game_key: str, day: date, url: str) -> str | None:
+    with trace_context(game_key, day):
+        return fetch_with_retry(url)
+
+
+def fetch_and_parse(
+    pages: List[Tuple[str, date]],
+    games: dict,
+    checkpoint: dict,
+    state: dict,
+    concurrency: int,
+    workers: int,
+    budget: int,
+) -> Tuple[int, int]:
+    """
+    Busca (threads) e parseia (processos) as paginas pendentes, gravando spool e checkpoint
+    a cada pagina concluida. Pagina que nao e listagem de dia (captcha, bloqueio, erro) conta
+    como falha e fica pendente. O orcamento vale para as requisicoes registradas, mais uma
+    reserva de PAGE_REQUEST_RESERVE por pagina em voo.
+    Retorna (paginas concluidas, paginas com falha).
+    """
+    done: Set[str] = set(checkpoint["done"])
+    pending = iter(pages)
+    completed = failed = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=workers) as parse_pool:
+        fetching: Dict[object, Tuple[str, date]] = {}
+        parsing: Dict[object, Tuple[str, date]] = {}
+
+        def submit_fetches() -> None:
+            # Requisicoes ja feitas + pior caso das paginas em voo (render gasta 2 por tentativa)
+            while (
+                len(fetching) < concurrency
+                and _requests_made() + (len(fetching) + 1) * PAGE_REQUEST_RESERVE <= budget
+            ):
+                page = next(pending, None)
+                if page is None:
+                    return
+                game_key, day = page
+                url = build_url_for_day(games[game_key].base_path, day)
+                fetching[fetch_pool.submit(_fetch_page, game_key, day, url)] = page
+
+        submit_fetches()
+        while fetching or parsing:
+            finished, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in fetching:
+                    game_key, day = fetching.pop(future)
+                    html = future.result()
+                    if html:
+                        parsing[parse_pool.submit(
+                            parse_day_page, game_key, games[game_key], day, html, None, True
+                        )] = (game_key, day)
+                    else:
+                        failed += 1
+                        logger.warning(f"Falha ao buscar {game_key} {day.isoformat()} (fica pendente)")
+                else:
+                    game_key, day = parsing.pop(future)
+                    records, stats = future.result()
+                    if not stats.scraped_days:
+                        failed += 1
+                        logger.warning(
+                            f"Pagina {game_key} {day.isoformat()} sem SportsEvent nem aviso de dia vazio (fica pendente)"
+                        )
+                        continue
+                    _append_spool(records)
+                    done.add(_page_key(game_key, day))
+                    checkpoint["done"] = sorted(done)
+                    checkpoint["updated_at"] = datetime.now(pytz.utc).isoformat()
+                    save_state(state)
+                    completed += 1
+                    logger.info(
+                        f"{game_key} {day.strftime('%d/%m/%Y')} | PERMITIDOS ( {stats.matched} ) "
+                        f"| {len(done)}/{checkpoint['job']['pages']} paginas",
+                        extra={"game": game_key, "day": day.isoformat()},
+                    )
+            submit_fetches()
+
+    return completed, failed
+
+
+def merge_results(records: List[MatchRecord], today: date) -> Tuple[int, int, int]:
+    """Mescla registros num unico salvamento: antigos no arquivo, recentes/futuros no calendario."""
+    cutoff = today - timedelta(days=DELETE_OLDER_THAN_DAYS)
+    old = [r for r in records if r.start_utc.astimezone(BR_TZ).date() < cutoff]
+    recent = [r for r in records if r.start_utc.astimezone(BR_TZ).date() >= cutoff]
+
+    old_events = [
+        create_event(
+            summary=r.summary,
+            start_utc=r.start_utc,
+            description=build_event_description(r.tournament, r.url),
+            uid=r.uid,
+        )
+        for r in old
+    ]
+    archived = archive_events(old_events)
+
+    cal = load_calendar()
+    index, _ = index_by_match_id(cal)
+    result = upsert_records(cal, index, recent)
+    with file_lock():
+        cal, _ = save_calendar_merged(cal)
+        write_feeds(cal)
+        update_match_table(cal, records, old_events)
+    return archived, result.added, result.updated
+
+
+def run_backfill(
+    game_keys: List[str],
+    day_from: date,
+    day_to: date,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    budget: int | None = None,
+    workers: int = DEFAULT_PARSE_WORKERS,
+    restart: bool = False,
+    merge_partial: bool = False,
+) -> bool:
+    games = load_registry()
+    unknown = [g for g in game_keys if g not in games]
+    if unknown:
+        logger.error(f"❌ Jogos desconhecidos: {', '.join(unknown)}")
+        return False
+
+    state = load_state()
+    load_render_decisions(state.setdefault("render", {}))
+    now = datetime.now(BR_TZ)
+
+    pages = plan_pages(game_keys, day_from, day_to)
+    job = {"games": game_keys, "from": day_from.isoformat(), "to": day_to.isoformat(), "pages": len(pages)}
+    checkpoint = load_checkpoint(state, job, restart)
+    done = set(checkpoint["done"])
+    pending = [p for p in pages if _page_key(*p) not in done]
+
+    provider = get_active_api().value
+    remaining = get_quota_remaining(state, now)[provider]
+    budget = remaining if budget is None else min(budget, remaining)
+    logger.info(
+        f"\U0001f4da BACKFILL {', '.join(game_keys)} | {day_from.strftime('%d/%m/%Y')} a {day_to.strftime('%d/%m/%Y')} "
+        f"| {len(pending)}/{len(pages)} paginas pendentes | orcamento {budget} req ({provider}, cota restante {remaining})"
+    )
+
+    interrupted = False
+    failed = 0
+    try:
+        _, failed = fetch_and_parse(pending, games, checkpoint, state, concurrency, workers, budget)
+    except KeyboardInterrupt:
+        interrupted = True
+        logger.warning("⏸️  Interrompido; rode o mesmo comando para retomar")
+    finally:
+        record_usage(state, get_requests_by_provider(), now)
+        save_state(state)
+
+    complete = len(checkpoint["done"]) == len(pages)
+    if interrupted or (not complete and not merge_partial):
+        logger.info(
+            f"⏸️  {len(checkpoint['done'])}/{len(pages)} paginas concluidas "
+            f"({failed} falhas, {_requests_made()} req). Checkpoint salvo em state.json"
+        )
+        return False
+
+    records = _read_spool()
+    archived, added, updated = merge_results(records, now.date())
+    logger.info(
+        f"✅ Backfill mesclado | {len(records)} partidas | ARQUIVADAS ( {archived} ) "
+        f"| ADICIONADAS ( {added} ) | ATUALIZADAS ( {updated} ) | {_requests_made()} req"
+    )
+
+    state.pop("backfill", None)
+    save_state(state)
+    _clear_spool()
+    return True
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill de partidas para um intervalo de datas")
+    parser.add_argument("--from", dest="day_from", required=True, type=date.fromisoformat, help="Dia inicial YYYY-MM-DD")
+    parser.add_argument("--to", dest="day_to", required=True, type=date.fromisoformat, help="Dia final YYYY-MM-DD")
+    parser.add_argument("--games", help="Jogos separados por virgula (padrao: todos do registro)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Buscas simultaneas")
+    parser.add_argument("--workers", type=int, default=DEFAULT_PARSE_WORKERS, help="Processos de parse")
+    parser.add_argument("--budget", type=int, help="Maximo de requisicoes (limitado pela cota restante)")
+    parser.add_argument("--restart", action="store_true", help="Ignora checkpoint e comeca do zero")
+    parser.add_argument("--merge-partial", action="store_true", help="Mescla mesmo com paginas pendentes")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    if args.day_to < args.day_from:
+        logger.error("❌ --to anterior a --from")
+        return 1
+    game_keys = [g.strip().upper() for g in args.games.split(",")] if args.games else list(load_registry())
+    ok = run_backfill(
+        game_keys, args.day_from, args.day_to, args.concurrency, args.budget,
+        args.workers, args.restart, args.merge_partial,
+    )
+    return 0 if ok else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
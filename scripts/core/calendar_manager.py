@@ -6,7 +6,7 @@ import hashlib
 import os
 import re
 from datetime import datetime, date, timedelta
-from typing import Set, List
+from typing import Set, List, Tuple
 
 import pytz
 from icalendar import Calendar, Event, Alarm
@@ -20,34 +20,68 @@ from config import (
     EVENT_DURATION_HOURS,
     ALARM_MINUTES_BEFORE,
 )
+from artifacts import write_artifact
+from changelog import read_changelog
+from locking import file_lock
+from merge import merge_calendars
+from refresh_hint import apply_refresh_hint
 
 BR_TZ = pytz.timezone(BR_TZ_NAME)
 
 # Regex compilado para extrair URL (3x mais rapido)
 URL_PATTERN = re.compile(r'\U0001f310\s*(.+)', re.MULTILINE)
 
+# ID canonico da partida: caminho apos /matches/ (ex: counter-strike/15-08-2026/furia-vs-9z/12-00)
+MATCH_ID_PATTERN = re.compile(r'tips\.gg/matches/([^?#\s]+?)/?(?:[?#]|$)')
+MATCH_ID_DATE_PATTERN = re.compile(r'/(\d{2}-\d{2}-\d{4})/')
+# Segmentos de data (DD-MM-YYYY) e horario (HH-MM) do ID: mudam quando a partida eh remarcada
+MATCH_ID_SCHEDULE_PATTERN = re.compile(r'/(?:\d{2}-\d{2}-\d{4}|\d{2}-\d{2})(?=/)')
+
 
 def _ensure_calendar_props(cal: Calendar) -> None:
     props = {
         "x-wr-calname": "eSports Calendar",
         "x-wr-caldesc": "Calendario de jogos de eSports",
         "x-wr-timezone": BR_TZ_NAME,
-        "refresh-interval;VALUE=DURATION": "PT1H",
         "x-published-ttl": "PT1H",
     }
     for key, value in props.items():
         if key not in cal:
             cal.add(key, value)
 
+    # REFRESH-INTERVAL exige VALUE=DURATION; copias legadas (uma por execucao) colapsam em uma.
+    # O valor real e recalculado a cada gravacao (refresh_hint.py); PT1H so vale para o arquivo novo.
+    refresh = cal.get("refresh-interval")
+    if isinstance(refresh, list):
+        cal["refresh-interval"] = refresh[0]
+    elif refresh is None:
+        cal.add("refresh-interval", timedelta(hours=1), parameters={"VALUE": "DURATION"})
+
+
+# Bytes lidos por load_calendar, por caminho: base do merge de tres vias em save_calendar_merged
+_loaded_bytes = {}
+# Bytes em disco substituidos pelo ultimo save_calendar_merged, por caminho: base do changelog
+_replaced_bytes = {}
+
+
+def _read_bytes(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, PermissionError):
+        return None
+
 
 def load_calendar(path: str = CALENDAR_FILENAME) -> Calendar:
-    if os.path.exists(path):
+    with file_lock():
+        raw = _read_bytes(path)
+    _loaded_bytes[path] = raw or b""
+    if raw:
         try:
-            with open(path, "rb") as f:
-                cal = Calendar.from_ical(f.read())
-                _ensure_calendar_props(cal)
-                return cal
-        except (FileNotFoundError, ValueError, PermissionError):
+            cal = Calendar.from_ical(raw)
+            _ensure_calendar_props(cal)
+            return cal
+        except ValueError:
             pass
 
     cal = Calendar()
@@ -57,16 +91,56 @@ def load_calendar(path: str = CALENDAR_FILENAME) -> Calendar:
     return cal
 
 
-def save_calendar(cal: Calendar, path: str = CALENDAR_FILENAME) -> bool:
-    """Salva calendario ICS em disco. Levanta IOError em caso de falha."""
+def save_calendar(cal: Calendar, path: str = CALENDAR_FILENAME, data: bytes | None = None) -> bool:
+    """Salva calendario ICS em disco (data: bytes ja serializados de cal). Levanta IOError em caso de falha."""
     try:
-        with open(path, "wb") as f:
-            f.write(cal.to_ical())
+        write_artifact(path, cal.to_ical() if data is None else data)
         return True
     except (IOError, PermissionError) as e:
         raise IOError(f"Erro ao salvar {path}: {e}")
 
 
+def save_calendar_merged(cal: Calendar, path: str = CALENDAR_FILENAME) -> Tuple[Calendar, int]:
+    """
+    Salva sob lock. Se o arquivo mudou desde load_calendar (outra execucao gravou), faz
+    merge de tres vias por UID antes. A dica de atualizacao do cabecalho e recalculada.
+    Retorna (calendario gravado, conflitos resolvidos).
+    Levanta IOError em falha de gravacao e LockTimeout se o lock nao vier a tempo.
+    """
+    conflicts = 0
+    with file_lock():
+        disk = _read_bytes(path) or b""
+        base = _loaded_bytes.get(path)
+        if base is not None and disk != base:
+            cal, conflicts = merge_calendars(
+                Calendar.from_ical(base) if base else Calendar(),
+                cal,
+                Calendar.from_ical(disk) if disk else Calendar(),
+            )
+        apply_refresh_hint(
+            cal,
+            (start for start in map(_get_event_start, cal.walk("VEVENT")) if start is not None),
+            read_changelog(),
+            datetime.now(pytz.utc),
+        )
+        data = cal.to_ical()
+        save_calendar(cal, path, data)
+        _replaced_bytes[path] = disk
+        _loaded_bytes[path] = data
+    return cal, conflicts
+
+
+def replaced_calendar(path: str = CALENDAR_FILENAME) -> Calendar:
+    """Calendario que estava em disco antes do ultimo save_calendar_merged (vazio se nao havia)."""
+    raw = _replaced_bytes.get(path)
+    if raw:
+        try:
+            return Calendar.from_ical(raw)
+        except ValueError:
+            pass
+    return Calendar()
+
+
 def get_existing_uids(cal: Calendar) -> Set[str]:
     """Coleta todos UIDs ja existentes no calendario para evitar duplicatas."""
     return {
@@ -237,8 +311,8 @@ def dedupe_by_matchup(cal: Calendar) -> int:
     return removed
 
 
-def prune_older_than(cal: Calendar, cutoff_date: date) -> int:
-    """Remove eventos cuja data de inicio eh anterior a data de corte."""
+def prune_older_than(cal: Calendar, cutoff_date: date, pruned: List | None = None) -> int:
+    """Remove eventos cuja data de inicio eh anterior a data de corte. Se pruned for lista, recebe os removidos."""
     unique_components = []
     removed = 0
 
@@ -248,6 +322,8 @@ def prune_older_than(cal: Calendar, cutoff_date: date) -> int:
                 event_date = _event_start_date_local(comp)
                 if event_date and event_date < cutoff_date:
                     removed += 1
+                    if pruned is not None:
+                        pruned.append(comp)
                     continue
             unique_components.append(comp)
         else:
@@ -259,15 +335,17 @@ def prune_older_than(cal: Calendar, cutoff_date: date) -> int:
 
 def remove_events_by_prefix(cal: Calendar, prefix: str) -> int:
     """Remove todos eventos cujo summary comeca com o prefixo informado (ex: '[CS2]'). Retorna qtd removida."""
+    unique_components = []
     removed = 0
-    to_remove = [
-        comp
-        for comp in list(cal.walk("VEVENT"))
-        if str(comp.get("summary", "")).startswith(prefix)
-    ]
-    for comp in to_remove:
-        cal.subcomponents.remove(comp)
-        removed += 1
+
+    # Reconstroi subcomponents uma unica vez (list.remove por evento era O(n²))
+    for comp in cal.subcomponents:
+        if comp.name == 'VEVENT' and str(comp.get("summary", "")).startswith(prefix):
+            removed += 1
+            continue
+        unique_components.append(comp)
+
+    cal.subcomponents = unique_components
     return removed
 
 
@@ -278,6 +356,39 @@ def normalize_event_datetime_utc(dt: datetime) -> datetime:
     return dt.astimezone(pytz.utc).replace(microsecond=0, second=0)
 
 
+def get_event_url(component) -> str | None:
+    """Extrai URL da partida (linha com globo) do description do evento."""
+    match = URL_PATTERN.search(str(component.get("description", "")))
+    return match.group(1).strip() if match else None
+
+
+def extract_match_id(url: str) -> str | None:
+    """Extrai ID canonico da partida da URL do tips.gg. Retorna None se URL nao for de partida."""
+    match = MATCH_ID_PATTERN.search(url or "")
+    return match.group(1).lower() if match else None
+
+
+def match_id_date(match_id: str) -> date | None:
+    """Data da pagina de dia em que a partida eh listada (segmento DD-MM-YYYY do ID)."""
+    match = MATCH_ID_DATE_PATTERN.search(f"/{match_id}/")
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+
+def match_id_matchup(match_id: str) -> str:
+    """ID da partida sem os segmentos de data e horario (ex: counter-strike/furia-vs-9z)."""
+    return MATCH_ID_SCHEDULE_PATTERN.sub("", f"/{match_id}/").strip("/")
+
+
+def build_match_uid(game_key: str, match_id: str) -> str:
+    """Gera UID pela identidade da partida no tips.gg. Remarcacao de horario mantem o UID."""
+    return hashlib.sha256(f"{game_key}|{match_id}".encode()).hexdigest()
+
+
 def build_stable_uid(
     game_key: str,
     event_summary: str,
@@ -286,11 +397,20 @@ def build_stable_uid(
     organizer_name: str,
     match_url: str,
 ) -> str:
-    """Gera UID estavel via SHA256 com campos chave da partida. Mesmo jogo = mesmo UID."""
+    """Gera UID via SHA256 com campos chave da partida. Usado quando a URL nao traz ID de partida."""
     data = f"{game_key}|{event_summary}|{match_time_utc.isoformat()}|{tournament_desc}|{organizer_name}|{match_url}"
     return hashlib.sha256(data.encode()).hexdigest()
 
 
+def build_event_description(tournament: str, match_url: str) -> str:
+    """Monta description do evento: torneio, URL da partida e marcador de origem."""
+    return (
+        f"\U0001f3c6 {tournament}\n"
+        f"\U0001f310 {match_url}\n"
+        f"{SOURCE_MARKER}"
+    )
+
+
 def create_event(
     summary: str,
     start_utc: datetime,
@@ -329,7 +449,11 @@ class CalendarManager:
     def save(self) -> bool:
         """Persiste calendario em disco. Retorna True se sucesso, False se erro."""
         try:
-            save_calendar(self._calendar, self._path)
+            with file_lock():
+                self._calendar, _ = save_calendar_merged(self._calendar, self._path)
+                if self._path == CALENDAR_FILENAME:
+                    from feeds import write_feeds  # import tardio: feeds depende deste modulo
+                    write_feeds(self._calendar)
             return True
         except Exception:
             return False
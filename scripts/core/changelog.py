@@ -0,0 +1,166 @@
+"""
+Changelog versionado do calendario para sincronizacao incremental.
+
+Cada salvamento que muda partidas ganha uma versao (inteiro crescente) e uma linha em
+scripts/data/changelog.jsonl com os eventos adicionados, atualizados e removidos, por UID.
+Um cliente na versao N pede changes_since(N) e recebe um unico delta compacto: o custo
+cresce com o numero de mudancas, nao com o tamanho do calendario. Linhas mais antigas que
+CHANGELOG_RETENTION_DAYS sao descartadas na compactacao; clientes anteriores a janela
+recebem resync=true e recarregam events.json/calendar.ics.
+
+Uso:
+    python scripts/core/changelog.py --since 42
+    python scripts/core/changelog.py --compact
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import pytz
+
+from config import CHANGELOG_FILE, CHANGELOG_RETENTION_DAYS
+from artifacts import write_artifact
+from locking import file_lock
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def read_changelog(path: str = CHANGELOG_FILE) -> List[dict]:
+    """Registros do changelog em ordem de versao. Lista vazia se o arquivo nao existe."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def current_version(records: List[dict]) -> int:
+    return records[-1]["version"] if records else 0
+
+
+def diff_entries(
+    previous: Dict[str, dict],
+    current: Dict[str, dict],
+) -> Tuple[List[dict], List[dict], List[str]]:
+    """(adicionados, atualizados, UIDs removidos) entre dois mapas {uid: entrada}."""
+    added = [entry for uid, entry in current.items() if uid not in previous]
+    updated = [entry for uid, entry in current.items() if uid in previous and previous[uid] != entry]
+    removed = sorted(uid for uid in previous if uid not in current)
+    added.sort(key=lambda e: (e["start"], e["uid"]))
+    updated.sort(key=lambda e: (e["start"], e["uid"]))
+    return added, updated, removed
+
+
+def compact(records: List[dict], now_utc: datetime, retention_days: int = CHANGELOG_RETENTION_DAYS) -> List[dict]:
+    """Descarta registros fora da janela de retencao; o ultimo fica sempre (guarda a versao atual)."""
+    cutoff = (now_utc - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+    kept = [r for r in records[:-1] if r["at"] >= cutoff]
+    return kept + records[-1:]
+
+
+def _serialize(records: List[dict]) -> bytes:
+    return "".join(
+        json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records
+    ).encode("utf-8")
+
+
+def record_changes(
+    previous: Dict[str, dict],
+    current: Dict[str, dict],
+    now_utc: datetime,
+    path: str = CHANGELOG_FILE,
+) -> int:
+    """
+    Anexa um delta com nova versao se as partidas mudaram (e compacta o changelog).
+    Retorna a versao atual dos dados.
+    """
+    added, updated, removed = diff_entries(previous, current)
+    with file_lock():
+        records = read_changelog(path)
+        version = current_version(records)
+        kept = compact(records, now_utc)
+        if added or updated or removed:
+            version += 1
+            kept.append({
+                "version": version,
+                "at": now_utc.strftime(TIMESTAMP_FORMAT),
+                "added": added,
+                "updated": updated,
+                "removed": removed,
+            })
+        if len(kept) != len(records) or kept[-1:] != records[-1:]:
+            try:
+                write_artifact(path, _serialize(kept))
+            except (IOError, PermissionError) as e:
+                raise IOError(f"Erro ao salvar {path}: {e}")
+    return version
+
+
+def changes_since(since: int, records: List[dict] = None, path: str = CHANGELOG_FILE) -> dict:
+    """
+    Delta unico entre a versao since e a atual, com as mudancas de cada UID colapsadas.
+    resync=true quando since nao e coberto pelo changelog (cliente novo ou atrasado demais).
+    """
+    records = read_changelog(path) if records is None else records
+    version = current_version(records)
+    doc = {"since": since, "version": version, "resync": False, "added": [], "updated": [], "removed": []}
+
+    first = records[0]["version"] if records else 1
+    if since <= 0 or since < first - 1 or since > version:
+        doc["resync"] = True
+        return doc
+
+    existed: Dict[str, bool] = {}   # UID existia na versao since?
+    final: Dict[str, dict | None] = {}  # Entrada atual (None = removido)
+    for record in records:
+        if record["version"] <= since:
+            continue
+        for entry in record["added"]:
+            existed.setdefault(entry["uid"], False)
+            final[entry["uid"]] = entry
+        for entry in record["updated"]:
+            existed.setdefault(entry["uid"], True)
+            final[entry["uid"]] = entry
+        for uid in record["removed"]:
+            existed.setdefault(uid, True)
+            final[uid] = None
+
+    for uid, entry in final.items():
+        if entry is not None:
+            doc["updated" if existed[uid] else "added"].append(entry)
+        elif existed[uid]:
+            doc["removed"].append(uid)
+    doc["added"].sort(key=lambda e: (e["start"], e["uid"]))
+    doc["updated"].sort(key=lambda e: (e["start"], e["uid"]))
+    doc["removed"].sort()
+    return doc
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta e compacta o changelog do calendario")
+    parser.add_argument("--since", type=int, help="Imprime o delta desde esta versao (JSON)")
+    parser.add_argument("--compact", action="store_true", help="Aplica a retencao agora")
+    parser.add_argument("--path", default=CHANGELOG_FILE)
+    args = parser.parse_args(argv)
+
+    if args.compact:
+        with file_lock():
+            records = read_changelog(args.path)
+            kept = compact(records, datetime.now(pytz.utc))
+            if len(kept) != len(records):
+                write_artifact(args.path, _serialize(kept))
+        print(f"{len(records) - len(kept)} registros compactados, {len(kept)} mantidos")
+    if args.since is not None:
+        print(json.dumps(changes_since(args.since, path=args.path), ensure_ascii=False, indent=2))
+    elif not args.compact:
+        records = read_changelog(args.path)
+        first = records[0]["version"] if records else 0
+        print(f"versao {current_version(records)} | {len(records)} registros (desde a versao {first})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,71 +5,147 @@ Configuracoes centrais, modelos de dados e logica de filtragem de times.
 import os
 from dataclasses import dataclass, field
 from datetime import datetime, date
-from enum import Enum
 from typing import Optional, Dict, Set, List, Tuple
 
 
 # ==================== CONSTANTES ====================
 
 CALENDAR_FILENAME = "calendar.ics"
+EVENTS_FEED_FILE = "events.json"  # feed JSON das proximas partidas para o site
+# Calendarios de janela movel: arquivo -> (horas a frente, rotulo no nome do calendario)
+WINDOW_FEEDS = {
+    "calendar-24h.ics": (24, "24h"),
+    "calendar-7d.ics": (7 * 24, "7 dias"),
+}
 STATE_FILE = "scripts/data/state.json"
-LOG_LEVEL = "INFO"
+TEAMS_FILE = "scripts/data/teams.json"
+HEALTHCHECK_FILE = "scripts/data/healthcheck.json"
+MANIFEST_FILE = "scripts/data/manifest.json"  # hashes de conteudo dos artefatos versionados
+ARCHIVE_DIR = "scripts/data/archive"  # historico de partidas podadas (JSONL gzip por mes)
+CHANGELOG_FILE = "scripts/data/changelog.jsonl"  # deltas versionados do calendario (sync incremental)
+CHANGELOG_RETENTION_DAYS = 14  # Deltas mais antigos sao compactados (clientes mais atrasados ressincronizam)
+MATCH_TABLE_FILE = "scripts/data/match-table.bin"  # tabela colunar de partidas (analises sem parsear ICS)
+BACKFILL_SPOOL_FILE = "scripts/data/backfill-spool.jsonl"  # resultados parciais do backfill (local)
+PIPELINE_LOCK_FILE = "scripts/data/.pipeline.lock"  # lock consultivo de leitura/escrita de calendario e estado
+GAME_RUN_LOCK_FILE = "scripts/data/.run-{game}.lock"  # lock de raspagem por jogo (agenda ate last_run)
+LOCK_TIMEOUT_SECONDS = 120  # Espera maxima pelo lock antes de desistir da execucao
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" (emojis) ou "json" (JSON lines)
 
 BR_TZ_NAME = "America/Sao_Paulo"
 DELETE_OLDER_THAN_DAYS = 7
 
 SOURCE_MARKER = "X-SETT-SOURCE:TIPSGG"
 TIPS_URL_HINT = "https://tips.gg/matches/"
+# Textos que o tips.gg mostra num dia sem partidas. Pagina sem SportsEvent e sem um destes
+# (captcha, bloqueio, corpo de erro, resposta truncada) nao conta como dia raspado
+NO_MATCHES_MARKERS = ("No matches found", "There are no matches", "No upcoming matches")
 
 # ==================== APIs DE SCRAPING ====================
 
 # Scrape.do (Fallback)
 SCRAPE_DO_API_KEY = os.getenv("SCRAPE_DO_API_KEY", "")
 SCRAPE_DO_URL = "https://api.scrape.do/"
+SCRAPE_DO_RENDER_RECHECK_HOURS = 24  # Re-testa pagina sem render apos esse intervalo
 
 # Bright Data (Primario)
 BRIGHT_DATA_API_KEY = os.getenv("BRIGHT_DATA_API_KEY", "")
 BRIGHT_DATA_URL = "https://api.brightdata.com/request"
 BRIGHT_DATA_ZONE = "sport_calendar"
 
-# Configuracoes de retry
-MAX_RETRIES = 1  # Reduzido de 3 para 1 (economiza requisicoes)
-RETRY_BACKOFF = 1.5
+# Configuracoes de retry (ver retry_policy.py)
+# Tentativas por URL (cada uma pode cair no outro provedor). So falhas gastam a tentativa extra;
+# o backfill reserva cota por pagina proporcional a este valor (PAGE_REQUEST_RESERVE)
+MAX_RETRIES = max(1, int(os.getenv("SCRAPE_MAX_RETRIES", "2")))
+RETRY_BASE_DELAY = 1.0   # Espera minima entre tentativas (s); cresce com jitter decorrelacionado
+RETRY_MAX_DELAY = 10.0   # Teto da espera entre tentativas (s)
+PROVIDER_TIMEOUT_SECONDS = {"brightdata": 30, "scrapedo": 60}   # Timeout de cada tentativa
+PROVIDER_DEADLINE_SECONDS = {"brightdata": 45, "scrapedo": 90}  # Tempo total por URL no provedor
+
+# Hedging: se o Bright Data passar do percentil de latencia, envia a mesma URL ao Scrape.do
+# e usa a primeira resposta. Custa cota do Scrape.do; desligado por padrao.
+HEDGE_ENABLED = os.getenv("HEDGE_REQUESTS", "0") == "1"
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 5             # Amostras necessarias antes de usar o percentil
+HEDGE_DEFAULT_DELAY_SECONDS = 10.0  # Espera antes do hedge enquanto faltam amostras
+HEDGE_MIN_DELAY_SECONDS = 2.0     # Nunca dispara hedge antes disso
 
 # Configuracoes de eventos ICS
 EVENT_DURATION_HOURS = 2
 ALARM_MINUTES_BEFORE = 15
-
-# Configuracoes de frequencia (dependem da API ativa)
-# Bright Data (primario): CS2 a cada 50min (~27x/dia), outros 2x/dia
-# Calculo: 5000 req/mes - (3 jogos × 2x/dia × 5 req × 30 dias) = 4100 req
-# 4100 ÷ 5 req = 820 exec/mes ÷ 30 dias = 27 exec/dia = ~50min
-CS2_RUN_INTERVAL_MINUTES_BRIGHTDATA = 50
-VAL_RL_LOL_RUN_HOURS_BRIGHTDATA = [6, 18]
-
-# Scrape.do (fallback): CS2 3x/dia, outros 1x/dia
-CS2_RUN_HOURS_SCRAPEDO = [6, 12, 18]
-VAL_RL_LOL_RUN_HOURS_SCRAPEDO = [6]
+RESCHEDULE_MATCH_WINDOW_HOURS = 72  # Remarcacao que muda a URL: mesmo confronto/torneio ate essa distancia
+
+# Dica de atualizacao dos clientes (REFRESH-INTERVAL / X-PUBLISHED-TTL, ver refresh_hint.py)
+REFRESH_MIN_MINUTES = 15
+REFRESH_MAX_MINUTES = 12 * 60
+REFRESH_STEPS_MINUTES = (15, 30, 60, 120, 240, 360, 720)  # Degraus: o cabecalho so muda ao trocar de degrau
+REFRESH_LEAD_FRACTION = 0.25       # Intervalo = 1/4 do tempo ate a proxima partida
+REFRESH_CHANGE_WINDOW_HOURS = 24   # Janela do changelog para a frequencia de mudancas
+
+# Cotas mensais dos provedores (usadas pela projecao do modo --plan)
+BRIGHT_DATA_MONTHLY_QUOTA = 5000
+SCRAPE_DO_MONTHLY_QUOTA = 1000
+
+# Frequencia por jogo, lookahead e times ficam no registro declarativo (ver registry.py)
+# Custo mensal projetado: python scripts/core/generate_ics.py --plan
+REGISTRY_FILE = "scripts/data/games.json"
+# Perfis de filtro extras (secao "profiles" do registro): um calendario por audiencia,
+# gerado das mesmas paginas raspadas. O calendario principal e o perfil DEFAULT_PROFILE.
+PROFILES_DIR = "calendars"
+DEFAULT_PROFILE = "default"
+# Dias a frente cobertos pela lista de proximas partidas de uma pagina de time do tips.gg
+TEAM_PAGE_HORIZON_DAYS = 7
+CRAWL_STRATEGIES = ("auto", "day", "team")
+# Frescor (ver freshness.py): minutos entre a partida aparecer no tips.gg e estar no calendar.ics.
+# O alvo por jogo vem de "freshness_slo_minutes" no registro; este e o padrao.
+FRESHNESS_SLO_MINUTES = 12 * 60
+FRESHNESS_SLO_TARGET_PCT = 95  # % das partidas que precisam cumprir o alvo
+FRESHNESS_WINDOW_DAYS = 14     # Janela das medicoes guardadas em state.json
+
+# ==================== NOTIFICACOES ====================
+
+# Destinos de aviso de partidas novas/remarcadas (ver notifier.py); sem variavel = desligado
+NOTIFY_SINKS = {
+    name: target
+    for name, target in (
+        ("webhook", os.getenv("NOTIFY_WEBHOOK_URL", "")),
+        ("discord", os.getenv("NOTIFY_DISCORD_WEBHOOK_URL", "")),
+        ("file", os.getenv("NOTIFY_FILE", "")),
+    )
+    if target
+}
+NOTIFY_OUTBOX_FILE = "scripts/data/outbox.json"  # avisos pendentes por destino (entregues nas proximas execucoes)
+NOTIFY_BATCH_SIZE = 50       # Avisos por requisicao (Discord: no maximo 10 embeds por mensagem)
+NOTIFY_TIMEOUT_SECONDS = 10  # Timeout de cada entrega
+NOTIFY_RUN_ATTEMPTS = 3      # Entregas falhas seguidas de um destino antes de pausa-lo ate a proxima execucao
+NOTIFY_MAX_ATTEMPTS = 9      # Entregas falhas de um aviso (somando execucoes) antes de descarta-lo
+NOTIFY_DRAIN_SECONDS = 15    # Espera maxima pela entrega no fim da execucao; o resto fica no outbox
 
 
 # ==================== MODELOS ====================
 
-class GameKey(str, Enum):
-    CS2 = "CS2"
-    VAL = "VAL"
-    RL = "RL"
-    LOL = "LOL"
+@dataclass(frozen=True)
+class SchedulePolicy:
+    """Politica de execucao de um jogo para um provedor: a cada N minutos ou em horas fixas."""
+    mode: str  # "interval" ou "hours"
+    interval_minutes: int = 0
+    hours: Tuple[int, ...] = ()
 
 
 @dataclass
 class GameConfig:
+    key: str
     prefix: str
     base_path: str
     days_to_scrape: int
-    once_per_day: bool
-    run_at_hour: int
+    schedules: Dict[str, SchedulePolicy]
     teams: Set[str]
     exclusions: Set[str]
+    frontend_key: str = ""
+    crawl: str = "auto"  # "auto" (modelo de custo), "day" ou "team" (ver scraper.choose_strategy)
+    team_base_path: str = ""  # Base das paginas de time; vazio = so paginas de dia
+    team_slugs: Dict[str, str] = field(default_factory=dict)  # Time -> slug (padrao: nome normalizado)
+    freshness_slo_minutes: int = FRESHNESS_SLO_MINUTES
 
     def __post_init__(self):
         self.teams_norm = {self._normalize(t) for t in self.teams}
@@ -81,77 +157,54 @@ class GameConfig:
 
 
 @dataclass
-class ScrapedMatch:
-    teams: str
-    time: str
-    date: str = ""
-    game: str = ""
+class FilterProfile:
+    """Audiencia extra: mesmas paginas raspadas, filtro de times e calendario proprios."""
+    key: str
+    name: str      # X-WR-CALNAME do calendario
+    calendar: str  # Caminho do ICS gerado (em PROFILES_DIR)
+    games: Dict[str, GameConfig]  # GameConfig do jogo com prefixo, times e exclusoes do perfil
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    """Partida raspada e aprovada no filtro, sem objetos ICS (montados so para o que muda)."""
+    game: str
+    uid: str
+    match_id: Optional[str]
+    team1: str
+    team2: str
+    summary: str
+    start_utc: datetime
+    tournament: str
+    url: str
+    day: date
+    organizer: str = ""
 
 
 @dataclass
 class ScrapStats:
     days_scraped: int = 0
     scripts_total: int = 0
+    sports_events: int = 0
+    matched: int = 0
     added: int = 0
+    updated: int = 0
+    removed: int = 0
     skipped_tbd: int = 0
     skipped_past: int = 0
     skipped_not_allowed: int = 0
-    matches: List[ScrapedMatch] = field(default_factory=list)
-
-
-# ==================== TIMES ====================
-
-CS2_TEAMS = {
-    "FURIA",
-    "paiN Gaming",
-    "MIBR",
-    "Imperial",
-    "Fluxo",
-    "RED Canids",
-    "Legacy",
-    "ODDIK",
-    "Imperial Esports",
-    "Gaimin Gladiators",
-}
-
-CS2_EXCLUSIONS = {
-    "Imperial.A",
-    "Imperial Fe",
-    "MIBR.A",
-    "paiN.A",
-    "ODDIK.A",
-    "Imperial Academy",
-    "Imperial.Acd",
-    "Imperial Female",
-    "Furia Academy",
-    "Furia.A",
-    "Pain Academy",
-    "Mibr Academy",
-    "Legacy Academy",
-    "ODDIK Academy",
-    "RED Canids Academy",
-    "Fluxo Academy",
-}
-
-VALORANT_TEAMS = {
-    "LOUD",
-    "FURIA Esports",
-    "MIBR LOS",
-    "Team Liquid Brazil",
-}
-
-ROCKET_LEAGUE_TEAMS = {
-    "FURIA Esports",
-    "Team Secret",
-}
-
-LOL_TEAMS = {
-    "paiN Gaming",
-    "LOUD",
-    "Vivo Keyd Stars",
-    "RED Canids",
-    "FURIA"
-}
+    scraped_days: List[date] = field(default_factory=list)
+    listed_ids: Set[str] = field(default_factory=set)
+
+    def merge(self, other: "ScrapStats") -> None:
+        """Soma contadores e une dias/IDs de outro ScrapStats (ex: de outra pagina)."""
+        for name in (
+            "days_scraped", "scripts_total", "sports_events", "matched", "added", "updated",
+            "removed", "skipped_tbd", "skipped_past", "skipped_not_allowed",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.scraped_days.extend(other.scraped_days)
+        self.listed_ids |= other.listed_ids
 
 
 # ==================== FILTROS ====================
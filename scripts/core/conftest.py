@@ -0,0 +1,12 @@
+"""Roda os testes a partir da raiz do repositorio: caminhos de config.py sao relativos a ela."""
+
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(autouse=True)
+def _repo_root_cwd(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
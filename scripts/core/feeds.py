@@ -0,0 +1,209 @@
+"""
+Feeds derivados do calendario em memoria, gravados no mesmo passo de salvamento do ICS.
+
+events.json: proximas partidas pre-ordenadas, agrupadas por dia (BRT) e jogo, com times
+ja separados. O site faz uma unica requisicao pequena e nao precisa parsear ICS.
+
+calendar-24h.ics / calendar-7d.ics: janelas moveis do calendario (partidas em andamento e
+proximas N horas), com poucos KB independente do historico mantido no calendar.ics.
+
+changelog.jsonl: delta versionado do salvamento (ver changelog.py); a versao vai em events.json.
+
+Todos saem da mesma visao ordenada por horario (timeline), montada uma vez por salvamento.
+"""
+
+import bisect
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import pytz
+from icalendar import Calendar
+
+from config import BR_TZ_NAME, EVENTS_FEED_FILE, TEAMS_FILE, WINDOW_FEEDS, EVENT_DURATION_HOURS, GameConfig
+from calendar_manager import get_event_url, replaced_calendar, _get_event_start
+from registry import load_registry
+from artifacts import write_artifact
+from changelog import read_changelog, record_changes
+from refresh_hint import apply_refresh_hint
+
+BR_TZ = pytz.timezone(BR_TZ_NAME)
+TROPHY = "\U0001f3c6"
+
+
+def prefix_table(games: Dict[str, GameConfig]) -> List[Tuple[str, str]]:
+    """(prefixo, jogo) com prefixos mais longos primeiro para casar sem ambiguidade."""
+    return sorted(((cfg.prefix, key) for key, cfg in games.items()), key=lambda p: -len(p[0]))
+
+
+def parse_summary(summary: str, prefixes: List[Tuple[str, str]]) -> Tuple[str, str, str] | None:
+    """Separa '[CS2] FURIA vs MIBR' em (jogo, time1, time2). None se nao for de um jogo conhecido."""
+    for prefix, game in prefixes:
+        if summary.startswith(prefix):
+            team1, _, team2 = summary[len(prefix):].partition(" vs ")
+            return game, team1.strip(), team2.strip()
+    return None
+
+
+def _tournament(description: str) -> str:
+    """Nome do torneio da linha com trofeu (apos a virgula, se houver, como o site exibia)."""
+    for line in description.splitlines():
+        if line.startswith(TROPHY):
+            tournament = line[len(TROPHY):].strip()
+            return tournament.split(",", 1)[1].strip() if "," in tournament else tournament
+    return ""
+
+
+def event_entry(comp, start: datetime, team1: str, team2: str) -> dict:
+    """Representacao JSON de uma partida (formato dos itens de events.json)."""
+    return {
+        "uid": str(comp.get("uid", "")),
+        "start": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "team1": team1,
+        "team2": team2,
+        "tournament": _tournament(str(comp.get("description", ""))),
+        "url": get_event_url(comp) or "",
+    }
+
+
+def entries_by_uid(cal: Calendar, prefixes: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """{uid: entrada com jogo} de todas as partidas do calendario (base do changelog)."""
+    entries = {}
+    for comp in cal.walk("VEVENT"):
+        start = _get_event_start(comp)
+        parsed = parse_summary(str(comp.get("summary", "")), prefixes)
+        if start is None or parsed is None:
+            continue
+        game, team1, team2 = parsed
+        entry = event_entry(comp, start, team1, team2)
+        entries[entry["uid"]] = {"game": game, **entry}
+    return entries
+
+
+def build_timeline(cal: Calendar, since_utc: datetime) -> List[Tuple[datetime, object]]:
+    """Visao (inicio, VEVENT) ordenada por horario dos eventos que comecam a partir de since_utc."""
+    timeline = []
+    for comp in cal.walk("VEVENT"):
+        start = _get_event_start(comp)
+        if start is not None and start >= since_utc:
+            timeline.append((start, comp))
+    timeline.sort(key=lambda item: item[0])
+    return timeline
+
+
+def _timeline_since(now_utc: datetime) -> datetime:
+    """Inicio da visao: inclui partidas ainda em andamento."""
+    return now_utc - timedelta(hours=EVENT_DURATION_HOURS)
+
+
+def build_events_feed(
+    cal: Calendar,
+    games: Dict[str, GameConfig],
+    now_utc: datetime,
+    timeline: List[Tuple[datetime, object]] | None = None,
+    version: int = 0,
+) -> dict:
+    """Monta feed JSON com partidas futuras agrupadas por dia e jogo, ordenadas por horario."""
+    prefixes = prefix_table(games)
+    if timeline is None:
+        timeline = build_timeline(cal, _timeline_since(now_utc))
+    upcoming = []
+
+    for start, comp in timeline:
+        if start <= now_utc:
+            continue
+        parsed = parse_summary(str(comp.get("summary", "")), prefixes)
+        if parsed is None:
+            continue
+        game, team1, team2 = parsed
+        upcoming.append((start, game, event_entry(comp, start, team1, team2)))
+
+    days: List[dict] = []
+    for start, game, entry in upcoming:
+        day = start.astimezone(BR_TZ).date().isoformat()
+        if not days or days[-1]["date"] != day:
+            days.append({"date": day, "games": {}})
+        days[-1]["games"].setdefault(game, []).append(entry)
+
+    return {
+        "generated_at": now_utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "version": version,
+        "total_events": sum(1 for comp in cal.subcomponents if comp.name == "VEVENT"),
+        "upcoming_events": len(upcoming),
+        "teams": build_teams_feed(games),
+        "days": days,
+    }
+
+
+def build_teams_feed(games: Dict[str, GameConfig]) -> Dict[str, List[str]]:
+    """Times permitidos por jogo, chaveados pelo id usado no frontend."""
+    return {cfg.frontend_key: sorted(cfg.teams) for cfg in games.values()}
+
+
+def save_events_feed(feed: dict, path: str = EVENTS_FEED_FILE) -> None:
+    """Grava events.json compacto (so se o conteudo mudou, ver artifacts.py)."""
+    try:
+        write_artifact(path, json.dumps(feed, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    except (IOError, PermissionError) as e:
+        raise IOError(f"Erro ao salvar {path}: {e}")
+
+
+def calendar_shell(cal: Calendar, label: str) -> Calendar:
+    """Calendario vazio com o cabecalho de cal e o rotulo anexado ao nome."""
+    shell = Calendar()
+    for name, value in cal.items():
+        shell[name] = value
+    shell.pop("X-WR-CALNAME", None)
+    shell.add("x-wr-calname", f"{cal.get('x-wr-calname', 'eSports Calendar')} ({label})")
+    return shell
+
+
+def build_window_calendar(
+    cal: Calendar,
+    timeline: List[Tuple[datetime, object]],
+    now_utc: datetime,
+    hours: int,
+    label: str,
+) -> Calendar:
+    """Calendario com os eventos da visao ordenada que comecam antes de now + hours."""
+    window = calendar_shell(cal, label)
+
+    end = bisect.bisect_left(timeline, now_utc + timedelta(hours=hours), key=lambda item: item[0])
+    for _, comp in timeline[:end]:
+        window.add_component(comp)
+    return window
+
+
+def write_feeds(cal: Calendar) -> None:
+    """
+    Regera changelog, events.json e os calendarios de janela a partir do calendario em memoria
+    (logo apos save_calendar_merged, que guarda o calendario substituido para o delta).
+    """
+    now_utc = datetime.now(pytz.utc)
+    games = load_registry()
+    prefixes = prefix_table(games)
+    timeline = build_timeline(cal, _timeline_since(now_utc))
+
+    version = record_changes(
+        entries_by_uid(replaced_calendar(), prefixes), entries_by_uid(cal, prefixes), now_utc
+    )
+    save_events_feed(build_events_feed(cal, games, now_utc, timeline, version))
+    starts = [start for start, _ in timeline]
+    records = read_changelog()
+    for path, (hours, label) in WINDOW_FEEDS.items():
+        window = build_window_calendar(cal, timeline, now_utc, hours, label)
+        apply_refresh_hint(window, starts, records, now_utc, horizon_hours=hours)
+        try:
+            write_artifact(path, window.to_ical())
+        except (IOError, PermissionError) as e:
+            raise IOError(f"Erro ao salvar {path}: {e}")
+
+
+def write_teams_feed(games: Dict[str, GameConfig], path: str = TEAMS_FILE) -> Dict[str, List[str]]:
+    """Gera teams.json a partir do registro de jogos. Retorna os times gravados."""
+    teams = build_teams_feed(games)
+    try:
+        write_artifact(path, json.dumps(teams, indent=2, ensure_ascii=False).encode("utf-8"))
+    except (IOError, PermissionError) as e:
+        raise IOError(f"Erro ao salvar {path}: {e}")
+    return teams
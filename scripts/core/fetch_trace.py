@@ -0,0 +1,171 @@
+"""
+Trace por requisicao da camada de busca (JSON lines compacto, append-only, tamanho limitado).
+
+Cada chamada HTTP a um provedor vira uma linha com horario, jogo, dia, provedor, tentativa,
+status, latencia, espera no rate limit (slot reservado via _last_request_time), bytes da
+resposta e se o corpo trazia JSON-LD utilizavel. Jogo/dia/tentativa vem de um contexto
+(contextvars) definido por quem busca; o arquivo gira para .1 ao passar de TRACE_MAX_BYTES.
+
+Resumo por provedor, jogo e hora (BRT):
+    python scripts/core/fetch_trace.py
+    python scripts/core/fetch_trace.py --by provider --since 2026-10-01
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterator, List
+
+import pytz
+
+from config import BR_TZ_NAME
+
+TRACE_FILE = os.getenv("TRACE_FILE", "scripts/data/fetch-trace.jsonl")
+TRACE_ENABLED = os.getenv("FETCH_TRACE", "1") != "0"
+TRACE_MAX_BYTES = 2 * 1024 * 1024  # Ao passar disso, o arquivo atual vira .1 (no maximo 2x no disco)
+
+BR_TZ = pytz.timezone(BR_TZ_NAME)
+GROUPINGS = ("provider", "game", "hour")
+
+_game = contextvars.ContextVar("trace_game", default=None)
+_day = contextvars.ContextVar("trace_day", default=None)
+_attempt = contextvars.ContextVar("trace_attempt", default=None)
+_wait = contextvars.ContextVar("trace_wait", default=0.0)
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def trace_context(game: str = None, day: date = None):
+    """Jogo e dia das requisicoes feitas dentro do bloco (nesta thread/contexto)."""
+    tokens = [_game.set(game), _day.set(day.isoformat() if day else None)]
+    try:
+        yield
+    finally:
+        _day.reset(tokens[1])
+        _game.reset(tokens[0])
+
+
+def set_attempt(attempt: int) -> None:
+    """Tentativa atual de fetch_with_retry (1-based)."""
+    _attempt.set(attempt)
+
+
+def note_wait(seconds: float) -> None:
+    """Espera no rate limit antes da proxima requisicao (registrada nela e zerada)."""
+    _wait.set(seconds)
+
+
+def record(provider: str, url: str, status, duration: float, size: int, usable: bool, path: str = TRACE_FILE) -> None:
+    """Anexa uma linha ao trace. Falhas de escrita sao ignoradas (trace nunca derruba a execucao)."""
+    if not TRACE_ENABLED:
+        return
+    entry = {
+        "ts": round(time.time(), 3),
+        "game": _game.get(),
+        "day": _day.get(),
+        "prov": provider,
+        "try": _attempt.get(),
+        "st": str(status),
+        "ms": round(duration * 1000),
+        "wait_ms": round(_wait.get() * 1000),
+        "bytes": size,
+        "ld": usable,
+        "url": url,
+    }
+    _wait.set(0.0)
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    with _write_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > TRACE_MAX_BYTES:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+
+def read_trace(path: str = TRACE_FILE) -> Iterator[dict]:
+    """Linhas do trace, da mais antiga (.1) a mais recente."""
+    for candidate in (f"{path}.1", path):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Linha truncada por uma execucao interrompida
+
+
+def _group_key(entry: dict, by: str) -> str:
+    if by == "provider":
+        return entry.get("prov") or "?"
+    if by == "game":
+        return entry.get("game") or "-"
+    return datetime.fromtimestamp(entry["ts"], BR_TZ).strftime("%Y-%m-%d %H:00")
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def summarize(entries: List[dict], by: str) -> List[dict]:
+    """Agrega requisicoes por provedor, jogo ou hora: total, erros, bytes, latencias e % com JSON-LD."""
+    groups: Dict[str, List[dict]] = {}
+    for entry in entries:
+        groups.setdefault(_group_key(entry, by), []).append(entry)
+
+    rows = []
+    for key, items in sorted(groups.items()):
+        latencies = sorted(e["ms"] for e in items)
+        rows.append({
+            by: key,
+            "requests": len(items),
+            "errors": sum(1 for e in items if not e["st"].startswith("2")),
+            "bytes": sum(e.get("bytes", 0) for e in items),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "wait_ms": sum(e.get("wait_ms", 0) for e in items),
+            "usable_pct": round(100 * sum(1 for e in items if e.get("ld")) / len(items)),
+        })
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resumo do trace de requisicoes aos provedores")
+    parser.add_argument("--by", choices=GROUPINGS, action="append", help="Agrupamento (repetivel; padrao: todos)")
+    parser.add_argument("--since", type=date.fromisoformat, help="Apenas requisicoes a partir deste dia (BRT)")
+    parser.add_argument("--json", action="store_true", help="Saida em JSON")
+    parser.add_argument("--file", default=TRACE_FILE)
+    args = parser.parse_args(argv)
+
+    entries = list(read_trace(args.file))
+    if args.since:
+        entries = [e for e in entries if datetime.fromtimestamp(e["ts"], BR_TZ).date() >= args.since]
+
+    report = {by: summarize(entries, by) for by in (args.by or GROUPINGS)}
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{len(entries)} requisicoes no trace")
+    for by, rows in report.items():
+        print(f"\n{'por ' + by:<18} {'req':>6} {'erros':>6} {'MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'espera s':>9} {'JSON-LD':>8}")
+        for row in rows:
+            print(
+                f"{row[by]:<18} {row['requests']:>6} {row['errors']:>6} {row['bytes'] / 1e6:>8.2f} "
+                f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['wait_ms'] / 1000:>9.1f} {row['usable_pct']:>7}%"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
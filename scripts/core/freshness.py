@@ -0,0 +1,199 @@
+"""
+Frescor do calendario: quanto tempo uma partida listada no tips.gg leva para estar no calendar.ics.
+
+Nao sabemos quando o tips.gg publicou a partida, mas sabemos quando a pagina daquele dia foi
+raspada pela ultima vez sem ela. Por partida nova (UID) guardamos em state["freshness"]:
+- listed_after: ultima raspagem anterior da pagina do dia (a partida apareceu depois disso)
+- first_seen: raspagem que a encontrou
+- published: salvamento do calendario que a incluiu
+O frescor e published - listed_after (limite superior). Sem raspagem anterior conhecida nao ha
+limite: a partida so conta em without_previous_scrape, fora dos percentis e do alvo. Partida
+que era TBD e passou a ter time monitorado conta como nova. Remarcacoes guardam a deteccao,
+o horario anterior e o novo, e medem o mesmo atraso e a antecedencia da deteccao em relacao
+ao horario anterior.
+
+Percentis e cumprimento do alvo (freshness_slo_minutes do registro) por jogo vao para o
+healthcheck; servem para ajustar as agendas em games.json pela latencia medida.
+
+Uso:
+    python scripts/core/freshness.py
+    python scripts/core/freshness.py --json
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+import pytz
+
+from config import FRESHNESS_SLO_TARGET_PCT, FRESHNESS_WINDOW_DAYS, STATE_FILE, GameConfig
+from reconcile import ReconcileResult
+from registry import load_registry
+
+# ISO em UTC: o merge de tres vias do state.json fica com o maior timestamp (ver merge_json)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _ts(dt: datetime) -> str:
+    return dt.astimezone(pytz.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def _dt(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=pytz.utc)
+
+
+def _minutes(start: str, end: str) -> float:
+    return (_dt(end) - _dt(start)).total_seconds() / 60
+
+
+def _freshness(state: dict) -> dict:
+    fresh = state.setdefault("freshness", {})
+    fresh.setdefault("pages", {})
+    fresh.setdefault("matches", {})
+    fresh.setdefault("reschedules", {})
+    return fresh
+
+
+def note_scrape(state: dict, game_key: str, result: ReconcileResult, scraped_days: Iterable, now: datetime) -> None:
+    """Registra partidas novas e remarcadas do jogo e a hora da raspagem de cada pagina de dia."""
+    fresh = _freshness(state)
+    pages = fresh["pages"].setdefault(game_key, {})
+    seen = _ts(now)
+
+    for record in result.new:
+        fresh["matches"].setdefault(record.uid, {
+            "game": game_key,
+            "listed_after": pages.get(record.day.isoformat()),
+            "first_seen": seen,
+            "published": None,
+        })
+    for record, previous_start in result.rescheduled:
+        # Chave por deteccao: duas remarcacoes da mesma partida sao duas medicoes
+        fresh["reschedules"][f"{record.uid}@{seen}"] = {
+            "game": game_key,
+            "listed_after": pages.get(record.day.isoformat()),
+            "detected": seen,
+            "previous_start": _ts(previous_start),
+            "start": _ts(record.start_utc),
+            "published": None,
+        }
+    for day in scraped_days:
+        pages[day.isoformat()] = seen
+
+
+def mark_published(state: dict, now: datetime) -> int:
+    """Marca como publicadas as medicoes pendentes (chamar apos salvar o calendario). Retorna quantas."""
+    fresh = _freshness(state)
+    published = _ts(now)
+    count = 0
+    for item in list(fresh["matches"].values()) + list(fresh["reschedules"].values()):
+        if item["published"] is None:
+            item["published"] = published
+            count += 1
+    return count
+
+
+def prune(state: dict, now: datetime, window_days: int = FRESHNESS_WINDOW_DAYS) -> None:
+    """Descarta medicoes e horarios de pagina mais antigos que a janela."""
+    fresh = _freshness(state)
+    cutoff = _ts(now - timedelta(days=window_days))
+    day_cutoff = cutoff[:10]
+    for key in ("matches", "reschedules"):
+        fresh[key] = {
+            k: v for k, v in fresh[key].items()
+            if (v["published"] or v.get("first_seen") or v.get("detected")) >= cutoff
+        }
+    for game, pages in fresh["pages"].items():
+        fresh["pages"][game] = {day: ts for day, ts in pages.items() if day >= day_cutoff}
+
+
+def _percentile(values: List[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 1)
+
+
+def summarize(state: dict, games: Dict[str, GameConfig] = None) -> Dict[str, dict]:
+    """Por jogo: percentis de frescor (min), % dentro do alvo e atraso/antecedencia das remarcacoes."""
+    fresh = _freshness(state)
+    games = games if games is not None else load_registry()
+    summary = {}
+
+    for game_key, cfg in games.items():
+        latencies, unbounded = [], 0
+        for item in fresh["matches"].values():
+            if item["game"] != game_key or item["published"] is None:
+                continue
+            if item["listed_after"] is None:
+                unbounded += 1  # first_seen ~ published: mediria ~0 min e inflaria o alvo
+                continue
+            latencies.append(_minutes(item["listed_after"], item["published"]))
+
+        moves = [
+            r for r in fresh["reschedules"].values() if r["game"] == game_key and r["published"] is not None
+        ]
+        if not latencies and not moves and not unbounded:
+            continue
+
+        slo = cfg.freshness_slo_minutes
+        met = round(100 * sum(1 for m in latencies if m <= slo) / len(latencies), 1) if latencies else None
+        summary[game_key] = {
+            "new_matches": len(latencies) + unbounded,
+            "without_previous_scrape": unbounded,
+            "p50_minutes": _percentile(latencies, 50),
+            "p90_minutes": _percentile(latencies, 90),
+            "p95_minutes": _percentile(latencies, 95),
+            "slo_minutes": slo,
+            "slo_met_pct": met,
+            "slo_ok": met is None or met >= FRESHNESS_SLO_TARGET_PCT,
+            "reschedules": len(moves),
+            "reschedule_p50_minutes": _percentile(
+                [_minutes(r["listed_after"], r["published"]) for r in moves if r["listed_after"]], 50
+            ),
+            # Antecedencia da deteccao em relacao ao horario antigo (negativa = detectada depois dele)
+            "reschedule_lead_p50_hours": _percentile(
+                [_minutes(r["detected"], r["previous_start"]) / 60 for r in moves], 50
+            ),
+        }
+    return summary
+
+
+def _cell(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Frescor do calendario por jogo (medicoes em state.json)")
+    parser.add_argument("--json", action="store_true", help="Saida em JSON")
+    parser.add_argument("--state", default=STATE_FILE)
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.state, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    summary = summarize(state)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return 0
+    if not summary:
+        print(f"Sem medicoes nos ultimos {FRESHNESS_WINDOW_DAYS} dias")
+        return 0
+    print(f"{'jogo':<6} {'novas':>6} {'p50 min':>8} {'p90 min':>8} {'p95 min':>8} {'alvo':>6} {'no alvo':>8} {'remarc.':>8}")
+    for game, row in summary.items():
+        met = f"{row['slo_met_pct']}%" if row["slo_met_pct"] is not None else "-"
+        flag = "" if row["slo_ok"] else "  ⚠️"
+        print(
+            f"{game:<6} {row['new_matches']:>6} {_cell(row['p50_minutes']):>8} {_cell(row['p90_minutes']):>8} "
+            f"{_cell(row['p95_minutes']):>8} {row['slo_minutes']:>6} {met:>8} {row['reschedules']:>8}{flag}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
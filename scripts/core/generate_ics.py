@@ -1,221 +1,382 @@
 """
 Esport Calendar Scraper - Raspa eventos de tips.gg e gera calendario ICS.
-Suporta CS2, Valorant, Rocket League, League of Legends.
+Jogos, times, lookahead e agendas vem do registro declarativo (scripts/data/games.json).
 
-CS2 raspa sempre hoje e amanha (2 dias) em cada execucao.
 Ponto de entrada principal. Delega orquestracao para os modulos especializados.
 """
 
+import argparse
+import copy
 import json
 import os
 import sys
 import time
 from datetime import datetime, timedelta, date
-from typing import List
+from typing import Dict, List, Tuple
 
 import pytz
+from icalendar import Calendar
 
 from config import (
     CALENDAR_FILENAME,
+    EVENTS_FEED_FILE,
+    WINDOW_FEEDS,
+    ARCHIVE_DIR,
     DELETE_OLDER_THAN_DAYS,
-    CS2_TEAMS,
-    CS2_EXCLUSIONS,
-    VALORANT_TEAMS,
-    ROCKET_LEAGUE_TEAMS,
-    LOL_TEAMS,
     BR_TZ_NAME,
     STATE_FILE,
-    CS2_RUN_INTERVAL_MINUTES_BRIGHTDATA,
-    VAL_RL_LOL_RUN_HOURS_BRIGHTDATA,
-    CS2_RUN_HOURS_SCRAPEDO,
-    VAL_RL_LOL_RUN_HOURS_SCRAPEDO,
+    BRIGHT_DATA_MONTHLY_QUOTA,
+    SCRAPE_DO_MONTHLY_QUOTA,
+    DEFAULT_PROFILE,
+    PROFILES_DIR,
+    GAME_RUN_LOCK_FILE,
+    FilterProfile,
     GameConfig,
-    GameKey,
     ScrapStats,
 )
 from logger import setup_logger
 from calendar_manager import (
     load_calendar,
-    save_calendar,
-    get_existing_uids,
-    dedupe_by_uid,
-    dedupe_by_url,
-    dedupe_by_matchup,
+    save_calendar_merged,
     prune_older_than,
 )
-from scraper import scrape_days_for_game, get_active_api, ScraperAPI
+from reconcile import index_by_match_id, reconcile_game
+from scraper import (
+    scrape_days_for_profiles,
+    choose_strategy,
+    crawl_costs,
+    crawl_teams,
+    plan_urls,
+    get_active_api,
+    get_fetch_metrics,
+    get_requests_by_provider,
+    load_render_decisions,
+    ScraperAPI,
+)
 from healthcheck import save_healthcheck
+from registry import load_profiles, load_registry
+from feeds import write_feeds, write_teams_feed
+from artifacts import write_artifact, report_verdict
+from archive import archive_events
+from match_table import update_match_table
+from notifier import Dispatcher, build_events
+from freshness import mark_published, note_scrape, prune as prune_freshness, summarize as summarize_freshness
+from locking import file_lock, try_file_lock, LockTimeout
+from merge import merge_json
+from metrics import build_openmetrics, save_metrics
+from profiling import profile_run
 
 
 BR_TZ = pytz.timezone(BR_TZ_NAME)
 
-GAMES_CONFIG = {
-    GameKey.CS2: GameConfig(
-        prefix="[CS2] ",
-        base_path="https://tips.gg/csgo/matches/",
-        days_to_scrape=2,
-        once_per_day=False,
-        run_at_hour=0,
-        teams=CS2_TEAMS,
-        exclusions=CS2_EXCLUSIONS,
-    ),
-    GameKey.VAL: GameConfig(
-        prefix="[V] ",
-        base_path="https://tips.gg/valorant/matches/",
-        days_to_scrape=1,
-        once_per_day=True,
-        run_at_hour=6,
-        teams=VALORANT_TEAMS,
-        exclusions=set(),
-    ),
-    GameKey.RL: GameConfig(
-        prefix="[RL] ",
-        base_path="https://tips.gg/rl/matches/",
-        days_to_scrape=1,
-        once_per_day=True,
-        run_at_hour=6,
-        teams=ROCKET_LEAGUE_TEAMS,
-        exclusions=set(),
-    ),
-    GameKey.LOL: GameConfig(
-        prefix="[LOL] ",
-        base_path="https://tips.gg/lol/matches/",
-        days_to_scrape=1,
-        once_per_day=True,
-        run_at_hour=6,
-        teams=LOL_TEAMS,
-        exclusions=set(),
-    ),
-}
-
 
 # ==================== GERENCIAMENTO DE ESTADO ====================
 
 _state_cache: dict = None
+_state_base: dict = None  # Estado em disco na ultima leitura/gravacao (base do merge de tres vias)
+
+
+def _read_state_file() -> dict | None:
+    if not os.path.exists(STATE_FILE):
+        return None
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
+        logger = setup_logger("state")
+        logger.warning(f"Falha ao carregar state.json: {e}")
+        return None
+
 
 def load_state() -> dict:
     """Carrega estado do arquivo state.json. Retorna dict vazio se inexistente. Com cache em memoria."""
-    global _state_cache
+    global _state_cache, _state_base
 
     if _state_cache is not None:
         return _state_cache
 
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                _state_cache = json.load(f)
-                return _state_cache
-        except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-            logger = setup_logger("state")
-            logger.warning(f"Falha ao carregar state.json: {e}")
-
-    _state_cache = {"last_run": {}}
+    with file_lock():
+        data = _read_state_file()
+    _state_cache = data if data is not None else {"last_run": {}}
+    _state_base = copy.deepcopy(_state_cache)
     return _state_cache
 
 
 def save_state(state: dict) -> None:
-    """Persiste estado em state.json. Atualiza cache."""
-    global _state_cache
+    """
+    Persiste estado em state.json sob lock. Se outra execucao gravou desde a leitura, faz
+    merge de tres vias (merge_json) e atualiza o dict recebido in-place. Atualiza cache.
+    """
+    global _state_cache, _state_base
 
     try:
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2)
+        with file_lock():
+            disk = _read_state_file()
+            if disk is not None and disk != (_state_base or {}):
+                merged = merge_json(_state_base or {}, state, disk)
+                state.clear()
+                state.update(merged)
+            write_artifact(STATE_FILE, json.dumps(state, indent=2).encode("utf-8"))
         _state_cache = state
+        _state_base = copy.deepcopy(state)
     except (IOError, PermissionError) as e:
         raise IOError(f"Erro ao salvar state.json: {e}")
 
 
-def get_run_config():
-    """Retorna configuracao de frequencia baseada na API ativa."""
-    active_api = get_active_api()
+def record_usage(state: dict, requests_by_provider: dict, now: datetime) -> None:
+    """Acumula requisicoes do mes por provedor em state['usage'] (base da cota restante)."""
+    month = now.strftime("%Y-%m")
+    usage = state.setdefault("usage", {})
+    # Mantem apenas o mes corrente
+    for key in [k for k in usage if k != month]:
+        del usage[key]
+    month_usage = usage.setdefault(month, {})
+    for provider, count in requests_by_provider.items():
+        month_usage[provider] = month_usage.get(provider, 0) + count
 
-    if active_api == ScraperAPI.BRIGHT_DATA:
-        return {
-            "cs2_mode": "interval",  # A cada X minutos
-            "cs2_interval_min": CS2_RUN_INTERVAL_MINUTES_BRIGHTDATA,
-            "val_rl_lol_hours": VAL_RL_LOL_RUN_HOURS_BRIGHTDATA,
-        }
-    else:  # SCRAPE_DO
-        return {
-            "cs2_mode": "fixed_hours",  # Horarios fixos
-            "cs2_hours": CS2_RUN_HOURS_SCRAPEDO,
-            "val_rl_lol_hours": VAL_RL_LOL_RUN_HOURS_SCRAPEDO,
-        }
-
-
-def should_run_game(game_key: GameKey, once_per_day: bool, run_at_hour: int) -> bool:
-    """Verifica se jogo deve rodar agora baseado na API ativa."""
-    now = datetime.now(BR_TZ)
-    config = get_run_config()
-    state = load_state()
 
-    # CS2: logica dinamica baseada na API
-    if game_key == GameKey.CS2:
-        last_run_str = state.get("last_run", {}).get(game_key)
+def get_quota_remaining(state: dict, now: datetime) -> dict:
+    """Retorna requisicoes restantes na cota mensal de cada provedor."""
+    month_usage = state.get("usage", {}).get(now.strftime("%Y-%m"), {})
+    quotas = {
+        ScraperAPI.BRIGHT_DATA.value: BRIGHT_DATA_MONTHLY_QUOTA,
+        ScraperAPI.SCRAPE_DO.value: SCRAPE_DO_MONTHLY_QUOTA,
+    }
+    return {p: max(0, q - month_usage.get(p, 0)) for p, q in quotas.items()}
 
-        if not last_run_str:
-            return True
 
-        try:
-            last_run = datetime.fromisoformat(last_run_str)
+def _get_last_run(state: dict, game_key: str) -> datetime | None:
+    """Le last_run do jogo. Valores antigos apenas com data sao tratados como meia-noite BRT."""
+    last_run_str = state.get("last_run", {}).get(game_key)
+    if not last_run_str:
+        return None
+    try:
+        last_run = datetime.fromisoformat(last_run_str)
+    except (ValueError, TypeError):
+        return None
+    return BR_TZ.localize(last_run) if last_run.tzinfo is None else last_run
 
-            # Bright Data: a cada X minutos
-            if config["cs2_mode"] == "interval":
-                minutes_since = (now - last_run).total_seconds() / 60
-                return minutes_since >= config["cs2_interval_min"]
 
-            # Scrape.do: horarios fixos
-            else:
-                cs2_hours = config["cs2_hours"]
-                if now.hour not in cs2_hours:
-                    return False
-                return last_run.hour != now.hour or last_run.date() != now.date()
+def get_schedule(cfg: GameConfig, active_api: ScraperAPI = None):
+    """Retorna politica de agenda do jogo para a API ativa (ou para a API informada)."""
+    active_api = active_api or get_active_api()
+    return cfg.schedules[active_api.value]
 
-        except (ValueError, TypeError):
-            return True
 
-    # VAL/RL/LOL: horarios fixos baseados na API
-    allowed_hours = config["val_rl_lol_hours"]
+def should_run_game(
+    cfg: GameConfig,
+    now: datetime = None,
+    state: dict = None,
+    active_api: ScraperAPI = None,
+) -> bool:
+    """Verifica se jogo deve rodar agora pela sua politica de agenda. now/state/active_api permitem simulacao."""
+    now = now or datetime.now(BR_TZ)
+    policy = get_schedule(cfg, active_api)
+    state = state if state is not None else load_state()
 
-    if now.hour not in allowed_hours:
+    if policy.mode == "hours" and now.hour not in policy.hours:
         return False
 
-    last_run_str = state.get("last_run", {}).get(game_key)
-    if not last_run_str:
+    last_run = _get_last_run(state, cfg.key)
+    if last_run is None:
         return True
 
-    try:
-        last_run = datetime.fromisoformat(last_run_str)
-        # Permite se for horario diferente ou dia diferente
-        return last_run.hour != now.hour or last_run.date() != now.date()
-    except (ValueError, TypeError):
-        return True
+    # Intervalo: a cada N minutos
+    if policy.mode == "interval":
+        minutes_since = (now - last_run).total_seconds() / 60
+        return minutes_since >= policy.interval_minutes
 
+    # Horas fixas: uma execucao por hora permitida
+    last_run = last_run.astimezone(now.tzinfo)
+    return last_run.hour != now.hour or last_run.date() != now.date()
 
-def mark_game_as_run(game_key: GameKey) -> None:
-    """Marca jogo como executado. CS2 usa timestamp completo, outros jogos apenas data."""
-    state = load_state()
-    state.setdefault("last_run", {})
 
-    now = datetime.now(BR_TZ)
+def describe_next_run(cfg: GameConfig, now: datetime, state: dict, active_api: ScraperAPI = None) -> str:
+    """Descreve quando o jogo rodara novamente, para o log de execucoes puladas."""
+    policy = get_schedule(cfg, active_api)
+
+    if policy.mode == "interval":
+        last_run = _get_last_run(state, cfg.key)
+        minutes_since = (now - last_run).total_seconds() / 60 if last_run else policy.interval_minutes
+        minutes_remaining = max(0, policy.interval_minutes - minutes_since)
+        return f"em {minutes_remaining:.0f} min (a cada {policy.interval_minutes} min)"
 
-    # CS2: salva timestamp completo (ISO) para controle de intervalo
-    if game_key == GameKey.CS2:
-        state["last_run"][game_key] = now.isoformat()
+    next_hours = [h for h in policy.hours if h > now.hour]
+    if next_hours:
+        next_hour, next_run_date = next_hours[0], now.date()
     else:
-        # Outros jogos: apenas data (controle diario)
-        state["last_run"][game_key] = now.strftime("%Y-%m-%d")
+        next_hour, next_run_date = policy.hours[0], now.date() + timedelta(days=1)
+    hours_str = ", ".join(f"{h:02d}:00" for h in policy.hours)
+    return f"{next_hour:02d}:00 ({next_run_date.strftime('%d/%m/%Y')}) (horarios: {hours_str})"
+
+
+def record_run(state: dict, game_key: str, now: datetime) -> None:
+    """Registra execucao (timestamp ISO completo) no dict de estado, sem persistir."""
+    state.setdefault("last_run", {})[game_key] = now.isoformat()
+
 
+def mark_game_as_run(game_key: str) -> None:
+    """Marca jogo como executado e persiste em state.json."""
+    state = load_state()
+    record_run(state, game_key, datetime.now(BR_TZ))
     save_state(state)
 
 
-def get_cs2_target_days(today: date) -> List[date]:
-    """Retorna dias-alvo para CS2: hoje e amanha, sempre."""
-    return [today, today + timedelta(days=1)]
+def get_target_days(cfg: GameConfig, today: date) -> List[date]:
+    """Retorna dias-alvo do jogo: hoje e os proximos dias ate o lookahead do registro."""
+    return [today + timedelta(days=i) for i in range(cfg.days_to_scrape)]
+
+
+# ==================== PLANEJAMENTO (DRY-RUN) ====================
+
+CRON_STEP_MINUTES = 10  # Mesmo intervalo do cron em update-ics.yml
+PLAN_PROJECTION_DAYS = 30
+
+
+def simulate_runs(
+    start: datetime,
+    end: datetime,
+    active_api: ScraperAPI,
+    state: dict,
+    step_minutes: int = CRON_STEP_MINUTES,
+) -> List[tuple]:
+    """
+    Simula execucoes do cron entre start e end sem acesso a rede.
+    Usa should_run_game e get_target_days reais sobre uma copia do estado.
+    Retorna lista de (horario, jogo, url) que seriam buscadas.
+    """
+    sim_state = json.loads(json.dumps(state))
+    games = load_registry()
+    profiles = load_profiles()
+    fetches = []
+    tick = start
+
+    while tick <= end:
+        for game_key, cfg in games.items():
+            if not should_run_game(cfg, now=tick, state=sim_state, active_api=active_api):
+                continue
+
+            teams = crawl_teams(_game_profiles(game_key, cfg, profiles))
+            for url in plan_urls(cfg, teams, get_target_days(cfg, tick.date())):
+                fetches.append((tick, game_key, url))
+
+            record_run(sim_state, game_key, tick)
+
+        tick += timedelta(minutes=step_minutes)
+
+    return fetches
+
+
+def run_plan(start: datetime = None, end: datetime = None, step_minutes: int = CRON_STEP_MINUTES) -> bool:
+    """
+    Modo --plan: mostra URLs que seriam buscadas (agora ou no intervalo simulado)
+    e a projecao mensal de requisicoes por provedor. Nao faz requisicoes.
+    """
+    logger = setup_logger("plan")
+    state = load_state()
+    active_api = get_active_api()
+    start = start or datetime.now(BR_TZ)
+    end = end or start
+
+    logger.info("=" * 60)
+    logger.info("\U0001f9ed PLANEJAMENTO (dry-run, sem rede)")
+    logger.info(
+        f"\U0001f552 {start.strftime('%d/%m/%Y %H:%M')} -> {end.strftime('%d/%m/%Y %H:%M')} "
+        f"| passo {step_minutes} min | API ativa: {active_api.value}"
+    )
+    logger.info("=" * 60)
+
+    profiles = load_profiles()
+    for game_key, cfg in load_registry().items():
+        target_days = get_target_days(cfg, start.date())
+        teams = crawl_teams(_game_profiles(game_key, cfg, profiles))
+        costs = crawl_costs(cfg, teams, target_days)
+        costs_str = " | ".join(f"{strategy} {n} req" for strategy, n in costs.items())
+        logger.info(f"\U0001f9ee {game_key} | estrategia {choose_strategy(cfg, teams, target_days)} ({costs_str})")
+    logger.info("-" * 60)
+
+    fetches = simulate_runs(start, end, active_api, state, step_minutes)
+    for tick, game_key, url in fetches:
+        logger.info(f"{tick.strftime('%d/%m %H:%M')} | {game_key} | {active_api.value} | {url}")
+    logger.info(f"\U0001f4e6 Total no intervalo: {len(fetches)} requisicoes")
+    logger.info("-" * 60)
+
+    # Projecao mensal: simula 30 dias para cada provedor, partindo de estado vazio
+    quotas = {
+        ScraperAPI.BRIGHT_DATA: BRIGHT_DATA_MONTHLY_QUOTA,
+        ScraperAPI.SCRAPE_DO: SCRAPE_DO_MONTHLY_QUOTA,
+    }
+    projection_end = start + timedelta(days=PLAN_PROJECTION_DAYS)
+    for api, quota in quotas.items():
+        projected = simulate_runs(start, projection_end, api, {"last_run": {}}, step_minutes)
+        per_game = {}
+        for _, game_key, _ in projected:
+            per_game[game_key] = per_game.get(game_key, 0) + 1
+        games_str = " | ".join(f"{k} {v}" for k, v in per_game.items())
+        usage = len(projected) / quota * 100 if quota else 0.0
+        logger.info(
+            f"\U0001f4ca Projecao {PLAN_PROJECTION_DAYS} dias ({api.value}): {len(projected)} req "
+            f"({usage:.0f}% de {quota}) | {games_str}"
+        )
+
+    logger.info("=" * 60)
+    return True
+
+
+def _emit_metrics(success: bool, games_stats: dict, cal, execution_time: float, duplicates_removed: int) -> None:
+    """Contabiliza uso de cota no state.json e grava metricas OpenMetrics da execucao."""
+    now = datetime.now(BR_TZ)
+    state = load_state()
+    record_usage(state, get_requests_by_provider(), now)
+    try:
+        save_state(state)
+    except IOError as e:
+        setup_logger("metrics").warning(str(e))
+
+    fetch_metrics = get_fetch_metrics()
+    hedge = fetch_metrics["hedge"]
+    if hedge["sent"]:
+        setup_logger("metrics").info(
+            f"\U0001fa83 Hedge: {hedge['sent']} enviados | {hedge['won']} venceram "
+            f"| {hedge['tail_saved_seconds']:.1f}s de cauda cortados | custo {hedge['extra_requests']}"
+        )
+
+    calendar_bytes = os.path.getsize(CALENDAR_FILENAME) if os.path.exists(CALENDAR_FILENAME) else 0
+    calendar_events = sum(1 for comp in cal.subcomponents if comp.name == "VEVENT")
+
+    save_metrics(build_openmetrics(
+        fetch_metrics=fetch_metrics,
+        games_stats=games_stats,
+        calendar_events=calendar_events,
+        calendar_bytes=calendar_bytes,
+        quota_remaining=get_quota_remaining(state, now),
+        success=success,
+        execution_time_seconds=execution_time,
+        timestamp=now.timestamp(),
+        duplicates_removed=duplicates_removed,
+    ))
+
+
+def _game_profiles(game_key: str, cfg: GameConfig, profiles: Dict[str, FilterProfile]) -> Dict[str, GameConfig]:
+    """Filtros do jogo: o principal (DEFAULT_PROFILE) e os dos perfis extras que o incluem."""
+    return {DEFAULT_PROFILE: cfg, **{key: p.games[game_key] for key, p in profiles.items() if game_key in p.games}}
+
 
+def _load_profile_calendar(profile: FilterProfile, cutoff: date) -> Tuple[Calendar, Dict[str, object]]:
+    """Calendario de um perfil extra, ja podado (sem arquivar: o historico e o do principal) e indexado."""
+    cal = load_calendar(profile.calendar)
+    cal.pop("X-WR-CALNAME", None)
+    cal.add("x-wr-calname", profile.name)
+    prune_older_than(cal, cutoff)
+    index, _ = index_by_match_id(cal)
+    return cal, index
 
-def main() -> bool:
-    """Orquestrador principal. Carrega calendario, raspa partidas, gera eventos ICS e salva. Retorna True se sucesso."""
+
+def main(games_filter: List[str] = None) -> bool:
+    """
+    Orquestrador principal. Carrega calendario, raspa partidas, gera eventos ICS e salva. Retorna True se sucesso.
+    games_filter restringe a execucao a alguns jogos (jobs paralelos por jogo).
+    """
     logger = setup_logger("generate_ics")
     start_time = time.time()
     errors = []
@@ -228,161 +389,159 @@ def main() -> bool:
     logger.info(f"🌐 API ativa: {api_name}")
     logger.info("=" * 60)
 
-    cal = load_calendar()
-    state = load_state()
     now = datetime.now(BR_TZ)
     today = now.date()
+    cutoff = today - timedelta(days=DELETE_OLDER_THAN_DAYS)
+    profiles = load_profiles()
 
-    deduped = dedupe_by_uid(cal)
-    if deduped > 0:
-        logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped} eventos duplicados (UID)")
-
-    deduped_url = dedupe_by_url(cal)
-    if deduped_url > 0:
-        logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped_url} eventos duplicados (URL)")
-
-    deduped_matchup = dedupe_by_matchup(cal)
-    if deduped_matchup > 0:
-        logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped_matchup} eventos duplicados por confronto")
-
-    existing_uids = get_existing_uids(cal)
+    try:
+        cal = load_calendar()
+        state = load_state()
+        # Perfis extras: mesmas paginas, filtro e calendario proprios
+        profile_cals = {key: _load_profile_calendar(p, cutoff) for key, p in profiles.items()}
+    except LockTimeout as e:
+        logger.error(f"\u274c {e}")
+        return False
+    load_render_decisions(state.setdefault("render", {}))
+    # Entrega o backlog de avisos de execucoes anteriores enquanto raspa (thread propria)
+    dispatcher = Dispatcher().start()
 
-    cutoff = today - timedelta(days=DELETE_OLDER_THAN_DAYS)
-    removed = prune_older_than(cal, cutoff)
+    pruned = []
+    removed = prune_older_than(cal, cutoff, pruned)
     if removed > 0:
         logger.info(f"\U0001f5d1\ufe0f  Removidos {removed} eventos anteriores a {cutoff.strftime('%d/%m/%Y')}")
 
+    # Indice por ID de partida do tips.gg (colapsa duplicatas legadas do UID antigo)
+    match_index, deduped = index_by_match_id(cal)
+    if deduped > 0:
+        logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped} eventos duplicados (ID da partida)")
+
     total_added = 0
+    run_records = []  # Partidas raspadas nesta execucao (organizador para a tabela de partidas)
+    notify_events = []  # Partidas novas/remarcadas; so entram no outbox depois do save
 
     try:
-        for game_key, cfg in GAMES_CONFIG.items():
-            if not should_run_game(game_key, cfg.once_per_day, cfg.run_at_hour):
-                config = get_run_config()
-
-                # CS2: mostra proximo horario baseado na API
-                if game_key == GameKey.CS2:
-                    state = load_state()
-                    last_run_str = state.get("last_run", {}).get(game_key)
-
-                    if config["cs2_mode"] == "interval":
-                        # Bright Data: mostra minutos restantes
-                        if last_run_str:
-                            try:
-                                last_run = datetime.fromisoformat(last_run_str)
-                                minutes_since = (now - last_run).total_seconds() / 60
-                                minutes_remaining = max(0, config["cs2_interval_min"] - minutes_since)
-                                logger.info(
-                                    f"\u23ed\ufe0f  CS2 proxima execucao em {minutes_remaining:.0f} min "
-                                    f"(a cada {config['cs2_interval_min']} min)"
-                                )
-                            except (ValueError, TypeError):
-                                pass
-                    else:
-                        # Scrape.do: mostra proximo horario fixo
-                        cs2_hours = config["cs2_hours"]
-                        next_hours = [h for h in cs2_hours if h > now.hour]
-                        if next_hours:
-                            next_hour = next_hours[0]
-                            next_run_date = today
-                        else:
-                            next_hour = cs2_hours[0]
-                            next_run_date = today + timedelta(days=1)
-
-                        logger.info(
-                            f"\u23ed\ufe0f  CS2 proxima execucao: "
-                            f"{next_hour:02d}:00 ({next_run_date.strftime('%d/%m/%Y')}) "
-                            f"(horarios: {', '.join([f'{h:02d}:00' for h in cs2_hours])})"
-                        )
-                else:
-                    # VAL/RL/LOL: mostra proximo horario
-                    allowed_hours = config["val_rl_lol_hours"]
-                    next_hours = [h for h in allowed_hours if h > now.hour]
-                    if next_hours:
-                        next_hour = next_hours[0]
-                        next_run_date = today
-                    else:
-                        next_hour = allowed_hours[0]
-                        next_run_date = today + timedelta(days=1)
-
+        for game_key, cfg in load_registry().items():
+            if games_filter and game_key not in games_filter:
+                continue
+            # Lock de execucao do jogo da checagem de agenda ate o last_run gravado: outra execucao
+            # sobreposta nao raspa (nem gasta cota com) o mesmo jogo; ela pula e so mescla o calendario
+            with try_file_lock(GAME_RUN_LOCK_FILE.format(game=game_key)) as claimed:
+                if not claimed:
+                    logger.info(f"\u23ed\ufe0f  {game_key} sendo raspado por outra execucao")
+                    continue
+                if not should_run_game(cfg):
                     logger.info(
-                        f"\u23ed\ufe0f  {game_key.value} proxima execucao: "
-                        f"{next_hour:02d}:00 ({next_run_date.strftime('%d/%m/%Y')}) "
-                        f"(horarios: {', '.join([f'{h:02d}:00' for h in allowed_hours])})"
+                        f"\u23ed\ufe0f  {game_key} proxima execucao: {describe_next_run(cfg, now, load_state())}"
                     )
-                continue
+                    continue
 
-            if game_key == GameKey.CS2:
-                target_days = get_cs2_target_days(today)
+                target_days = get_target_days(cfg, today)
                 days_str = ", ".join(d.strftime("%d/%m/%Y") for d in target_days)
-                logger.info(
-                    f"\U0001f4c5 {game_key.value} | LIMPANDO {days_str}"
-                )
-            else:
-                target_days = [today]
-                logger.info(f"\U0001f4c5 {game_key.value} | LIMPANDO {today.strftime('%d/%m/%Y')}")
-
-            aggregated_stats = ScrapStats()
-            all_new_events = []
-
-            for target_day in target_days:
-                new_events, stats = scrape_days_for_game(game_key, cfg, [target_day], existing_uids)
-
-                all_new_events.extend(new_events)
-                aggregated_stats.scripts_total += stats.scripts_total
-                aggregated_stats.skipped_not_allowed += stats.skipped_not_allowed
-                aggregated_stats.skipped_tbd += stats.skipped_tbd
-                aggregated_stats.skipped_past += stats.skipped_past
-                aggregated_stats.added += stats.added
-                aggregated_stats.matches.extend(stats.matches)
-
-                prefix = "   " if len(target_days) > 1 else ""
-                logger.info(
-                    f"{prefix}{target_day.strftime('%d/%m/%Y')} | ENCONTRADOS ( {stats.scripts_total} ) "
-                    f"| NAO PERMITIDOS ( {stats.skipped_not_allowed} ) "
-                    f"| ADICIONADOS ( {stats.added} )"
-                )
-
-            for ev in all_new_events:
-                cal.add_component(ev)
-
-            total_added += aggregated_stats.added
-
-            # Coleta stats por jogo para healthcheck
-            games_stats[game_key.value] = {
-                "added": aggregated_stats.added,
-                "scraped": aggregated_stats.scripts_total,
-                "filtered": aggregated_stats.skipped_not_allowed,
-                "skipped_tbd": aggregated_stats.skipped_tbd,
-                "skipped_past": aggregated_stats.skipped_past
-            }
+                logger.info(f"\U0001f4c5 {game_key} | LIMPANDO {days_str}")
+
+                aggregated_stats = ScrapStats()
+                all_records = []
+                all_filters = _game_profiles(game_key, cfg, profiles)
+                game_profiles = {key: f for key, f in all_filters.items() if key != DEFAULT_PROFILE}
+                profile_records = {key: [] for key in game_profiles}
+
+                # Paginas de dia (uma por dia) ou de time (uma por time, todos os dias de uma vez)
+                strategy = choose_strategy(cfg, crawl_teams(all_filters), target_days)
+                batches = [target_days] if strategy == "team" else [[d] for d in target_days]
+
+                for batch in batches:
+                    # Uma busca e um parse por pagina, qualquer que seja o numero de perfis
+                    results = scrape_days_for_profiles(game_key, all_filters, batch, strategy)
+                    records, stats = results[DEFAULT_PROFILE]
+                    for key in game_profiles:
+                        profile_records[key].extend(results[key][0])
+
+                    all_records.extend(records)
+                    run_records.extend(records)
+                    aggregated_stats.merge(stats)
+
+                    prefix = "   " if len(batches) > 1 else ""
+                    label = (
+                        f"{stats.days_scraped} paginas de time" if strategy == "team"
+                        else batch[0].strftime('%d/%m/%Y')
+                    )
+                    logger.info(
+                        f"{prefix}{label} | ENCONTRADOS ( {stats.scripts_total} ) "
+                        f"| NAO PERMITIDOS ( {stats.skipped_not_allowed} ) "
+                        f"| PERMITIDOS ( {stats.matched} )",
+                        extra={"game": game_key, "day": batch[0].isoformat()},
+                    )
 
-            if aggregated_stats.matches:
-                matches_str = " | ".join(
-                    [f"[{m.game}] {m.date} {m.teams} - {m.time}" for m in aggregated_stats.matches]
+                result = reconcile_game(
+                    cal,
+                    match_index,
+                    cfg.prefix,
+                    all_records,
+                    aggregated_stats.scraped_days,
+                    aggregated_stats.listed_ids,
                 )
+                aggregated_stats.added = result.added
+                aggregated_stats.updated = result.updated
+                aggregated_stats.removed = result.removed
                 logger.info(
-                    f"- JOGOS | {matches_str}"
+                    f"{game_key} | ADICIONADOS ( {result.added} ) | ATUALIZADOS ( {result.updated} ) "
+                    f"| REMOVIDOS ( {result.removed} )",
+                    extra={"game": game_key},
                 )
 
-            logger.info("-" * 60)
-
-            # Marca execucao (CS2 sempre marca timestamp, outros so se once_per_day)
-            if game_key == GameKey.CS2 or cfg.once_per_day:
-                mark_game_as_run(game_key)
+                for key, profile_cfg in game_profiles.items():
+                    profile_cal, profile_index = profile_cals[key]
+                    profile_result = reconcile_game(
+                        profile_cal,
+                        profile_index,
+                        profile_cfg.prefix,
+                        profile_records[key],
+                        aggregated_stats.scraped_days,
+                        aggregated_stats.listed_ids,
+                    )
+                    logger.info(
+                        f"   perfil {key} | ADICIONADOS ( {profile_result.added} ) "
+                        f"| ATUALIZADOS ( {profile_result.updated} ) | REMOVIDOS ( {profile_result.removed} )",
+                        extra={"game": game_key, "profile": key},
+                    )
 
-            logger.info("-" * 60)
+                total_added += aggregated_stats.added
+                notify_events.extend(build_events(result, int(time.time())))
+                # Primeira vez vista e ultima raspagem de cada pagina (frescor); persiste com o last_run
+                note_scrape(load_state(), game_key, result, aggregated_stats.scraped_days, datetime.now(pytz.utc))
+
+                # Coleta stats por jogo para healthcheck
+                games_stats[game_key] = {
+                    "added": aggregated_stats.added,
+                    "updated": aggregated_stats.updated,
+                    "removed": aggregated_stats.removed,
+                    "scraped": aggregated_stats.scripts_total,
+                    "filtered": aggregated_stats.skipped_not_allowed,
+                    "skipped_tbd": aggregated_stats.skipped_tbd,
+                    "skipped_past": aggregated_stats.skipped_past,
+                    "pages": aggregated_stats.days_scraped,
+                    "sports_events": aggregated_stats.sports_events,
+                }
+
+                changed_records = result.changed
+                if changed_records:
+                    matches_str = " | ".join(
+                        [
+                            f"[{r.game}] {r.day.strftime('%d/%m')} {r.team1} x {r.team2} - "
+                            f"{r.start_utc.astimezone(BR_TZ).strftime('%H:%M')}"
+                            for r in changed_records
+                        ]
+                    )
+                    logger.info(
+                        f"- JOGOS | {matches_str}"
+                    )
 
-        deduped_final = dedupe_by_uid(cal)
-        if deduped_final > 0:
-            logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped_final} eventos duplicados (UID final)")
+                logger.info("-" * 60)
 
-        deduped_url_final = dedupe_by_url(cal)
-        if deduped_url_final > 0:
-            logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped_url_final} eventos duplicados (URL final)")
+                mark_game_as_run(game_key)
 
-        deduped_matchup_final = dedupe_by_matchup(cal)
-        if deduped_matchup_final > 0:
-            logger.info(f"\U0001f5d1\ufe0f  Removidos {deduped_matchup_final} eventos duplicados por confronto (final)")
+                logger.info("-" * 60)
 
     except Exception as e:
         error_msg = f"{type(e).__name__}: {e}"
@@ -398,18 +557,46 @@ def main() -> bool:
             total_added=total_added,
             errors=errors,
             execution_time_seconds=execution_time,
-            games_processed=games_stats
+            games_processed=games_stats,
+            notifications=dispatcher.close(),
+            freshness=summarize_freshness(load_state()),
         )
+        _emit_metrics(False, games_stats, cal, execution_time, deduped)
         return False
 
-    logger.info(f"\U0001f4be Salvando {CALENDAR_FILENAME}...")
+    logger.info(f"\U0001f4be Salvando {CALENDAR_FILENAME}, {EVENTS_FEED_FILE} e janelas {', '.join(WINDOW_FEEDS)}...")
     try:
-        save_calendar(cal)
-    except IOError as e:
+        # Lock unico para calendario e feeds derivados: outra execucao nao grava no meio
+        with file_lock():
+            # Arquiva antes de salvar: se o save falhar, a proxima execucao poda (e arquiva) de novo
+            archived = archive_events(pruned)
+            if archived:
+                logger.info(f"\U0001f4e6 Arquivados {archived} eventos podados em {ARCHIVE_DIR}")
+            cal, conflicts = save_calendar_merged(cal)
+            if conflicts:
+                logger.warning(f"\U0001f500 Calendario alterado por outra execucao; merge com {conflicts} conflitos")
+            logger.info(f"\U0001f501 Dica de atualizacao dos clientes: {cal.get('x-published-ttl')}")
+            write_feeds(cal)
+            write_teams_feed(load_registry())
+            update_match_table(cal, run_records)
+            if profile_cals:
+                os.makedirs(PROFILES_DIR, exist_ok=True)
+            for key, (profile_cal, _) in profile_cals.items():
+                save_calendar_merged(profile_cal, profiles[key].calendar)
+            # Partidas raspadas nesta (ou em execucao anterior com save falho) agora estao publicadas
+            state = load_state()
+            mark_published(state, datetime.now(pytz.utc))
+            prune_freshness(state, datetime.now(pytz.utc))
+            save_state(state)
+    except (IOError, LockTimeout) as e:
         logger.error(str(e))
+        dispatcher.close()
+        _emit_metrics(False, games_stats, cal, time.time() - start_time, deduped)
         return False
 
     logger.info(f"\u2705 Concluido | Total adicionados: {total_added}")
+    if dispatcher.enqueue(notify_events):
+        logger.info(f"\U0001f514 {len(notify_events)} avisos na fila de {', '.join(dispatcher.sinks)}")
 
     # Salva healthcheck com sucesso
     execution_time = time.time() - start_time
@@ -421,14 +608,42 @@ def main() -> bool:
         total_scraped=total_scraped,
         errors=errors,
         execution_time_seconds=execution_time,
-        games_processed=games_stats
+        games_processed=games_stats,
+        notifications=dispatcher.close(),
+        freshness=summarize_freshness(load_state()),
     )
+    _emit_metrics(True, games_stats, cal, execution_time, deduped)
 
     logger.info(f"\u23f1\ufe0f  Tempo de execucao: {execution_time:.2f}s")
     logger.info("=" * 60)
     return True
 
 
+def _parse_plan_datetime(value: str) -> datetime:
+    """Converte 'YYYY-MM-DD' ou 'YYYY-MM-DDTHH:MM' para datetime em BRT."""
+    dt = datetime.fromisoformat(value)
+    return BR_TZ.localize(dt) if dt.tzinfo is None else dt.astimezone(BR_TZ)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gera calendario ICS de partidas de eSports.")
+    parser.add_argument("--plan", action="store_true", help="Dry-run: mostra URLs e custo projetado sem rede")
+    parser.add_argument("--plan-from", type=_parse_plan_datetime, help="Inicio da simulacao (YYYY-MM-DD[THH:MM])")
+    parser.add_argument("--plan-to", type=_parse_plan_datetime, help="Fim da simulacao (YYYY-MM-DD[THH:MM])")
+    parser.add_argument("--plan-step", type=int, default=CRON_STEP_MINUTES, help="Passo da simulacao em minutos")
+    parser.add_argument("--profile", action="store_true", help="Grava perfil de CPU/memoria em profiling/")
+    parser.add_argument("--games", help="Roda apenas estes jogos, separados por virgula (ex.: CS2,VAL)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    success = main()
+    args = parse_args()
+    with profile_run("generate_ics", enabled=args.profile):
+        if args.plan:
+            success = run_plan(args.plan_from, args.plan_to, args.plan_step)
+        else:
+            try:
+                success = main([g.strip().upper() for g in args.games.split(",")] if args.games else None)
+            finally:
+                report_verdict()
     sys.exit(0 if success else 1)
@@ -10,7 +10,8 @@ from typing import Dict, Any, List
 
 import pytz
 
-HEALTHCHECK_FILE = "scripts/data/healthcheck.json"
+from config import HEALTHCHECK_FILE
+from artifacts import write_artifact
 
 
 def save_healthcheck(
@@ -19,7 +20,9 @@ def save_healthcheck(
     total_scraped: int = 0,
     errors: List[str] = None,
     execution_time_seconds: float = 0.0,
-    games_processed: Dict[str, Dict[str, Any]] = None
+    games_processed: Dict[str, Dict[str, Any]] = None,
+    notifications: Dict[str, Dict[str, Any]] = None,
+    freshness: Dict[str, Dict[str, Any]] = None
 ) -> None:
     """
     Salva healthcheck JSON para monitoramento.
@@ -31,6 +34,8 @@ def save_healthcheck(
         errors: Lista de erros encontrados
         execution_time_seconds: Tempo total de execucao
         games_processed: Detalhes por jogo
+        notifications: Backlog e latencia de entrega por destino de aviso (Dispatcher.report)
+        freshness: Percentis de frescor e cumprimento do alvo por jogo (freshness.summarize)
     """
     errors = errors or []
     games_processed = games_processed or {}
@@ -44,13 +49,15 @@ def save_healthcheck(
             "execution_time_seconds": round(execution_time_seconds, 2)
         },
         "games": games_processed,
+        "notifications": notifications or {},
+        "freshness": freshness or {},
         "errors": errors,
         "version": "1.0.0"
     }
     
     try:
-        with open(HEALTHCHECK_FILE, "w", encoding="utf-8") as f:
-            json.dump(healthcheck, f, indent=2)
+        # Timestamp e duracao sao volateis: sem outra mudanca o arquivo nao e regravado
+        write_artifact(HEALTHCHECK_FILE, json.dumps(healthcheck, indent=2).encode("utf-8"))
     except (IOError, PermissionError) as e:
         # Nao falha execucao principal se healthcheck falhar
         print(f"Warning: Falha ao salvar healthcheck: {e}")
@@ -0,0 +1,89 @@
+"""
+Lock consultivo (flock) entre processos que leem/gravam calendar.ics e state.json.
+
+O lock cobre apenas as secoes curtas de leitura e gravacao: a raspagem roda fora dele,
+entao execucoes concorrentes (cron, workflow_dispatch, deletes, --games separados)
+progridem em paralelo e a gravacao faz merge de tres vias se o disco mudou (ver merge.py).
+A excecao eh o lock de execucao por jogo (GAME_RUN_LOCK_FILE), mantido da checagem de agenda
+ate o last_run gravado, para duas execucoes nao rasparem (e gastarem cota com) o mesmo jogo.
+Reentrante no mesmo processo, por arquivo; espera no maximo LOCK_TIMEOUT_SECONDS.
+"""
+
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, lock vira no-op (uso local de um processo so)
+    fcntl = None
+
+from config import PIPELINE_LOCK_FILE, LOCK_TIMEOUT_SECONDS
+
+LOCK_POLL_SECONDS = 0.2
+
+_registry_lock = threading.Lock()
+_held = {}  # caminho -> _HeldLock: reentrancia e descritor por arquivo de lock
+
+
+class LockTimeout(TimeoutError):
+    """Lock nao obtido dentro do tempo maximo."""
+
+
+class _HeldLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+def _held_lock(path: str) -> _HeldLock:
+    with _registry_lock:
+        return _held.setdefault(path, _HeldLock())
+
+
+@contextmanager
+def file_lock(path: str = PIPELINE_LOCK_FILE, timeout: float = LOCK_TIMEOUT_SECONDS):
+    """Adquire lock exclusivo em path (cria o arquivo). Levanta LockTimeout apos timeout segundos."""
+    held = _held_lock(path)
+
+    if not held.thread_lock.acquire(timeout=timeout):
+        raise LockTimeout(f"Lock {path} ocupado por outra thread ha {timeout:g}s")
+    try:
+        if held.depth == 0 and fcntl is not None:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise LockTimeout(f"Lock {path} ocupado por outro processo ha {timeout:g}s")
+                    time.sleep(LOCK_POLL_SECONDS)
+            held.fd = fd
+        held.depth += 1
+        try:
+            yield
+        finally:
+            held.depth -= 1
+            if held.depth == 0 and held.fd is not None:
+                fcntl.flock(held.fd, fcntl.LOCK_UN)
+                os.close(held.fd)
+                held.fd = None
+    finally:
+        held.thread_lock.release()
+
+
+@contextmanager
+def try_file_lock(path: str):
+    """Como file_lock, mas sem esperar: entrega True com o lock ou False se outro o detem."""
+    with ExitStack() as stack:
+        try:
+            stack.enter_context(file_lock(path, timeout=0))
+        except LockTimeout:
+            yield False
+            return
+        yield True
@@ -1,20 +1,110 @@
 """
 Configuracao de logging centralizada.
+
+Backend unico configurado uma vez por processo: os loggers do projeto emitem para
+uma fila (QueueHandler) e uma thread (QueueListener) formata e escreve no console.
+Formato padrao eh o legivel com emojis; LOG_FORMAT=json emite JSON lines.
+Processos filhos criados por fork (ProcessPoolExecutor do backfill) nao herdam a thread
+do listener, entao passam a escrever direto no console.
 """
 
+import atexit
+import json
 import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from config import LOG_LEVEL, LOG_FORMAT
+
+ROOT_LOGGER_NAME = "esport_calendar"
+
+# Campos estruturados aceitos via extra={...} e incluidos no formato JSON
+STRUCTURED_FIELDS = ("game", "day", "profile", "provider", "url", "duration", "attempt", "status")
+
+_listener: QueueListener = None
+_console: logging.Handler = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON por linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in STRUCTURED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value if isinstance(value, (int, float, bool)) else str(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler que nao formata na thread emissora; a fila eh local ao processo."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _build_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        return JsonLinesFormatter()
+    return logging.Formatter("[%(asctime)s] %(message)s", datefmt="%H:%M:%S")
+
+
+def configure_logging(fmt: str = LOG_FORMAT, level: str = LOG_LEVEL) -> None:
+    """Configura backend de logging uma unica vez. Chamadas seguintes nao tem efeito."""
+    global _listener, _console
+    if _console is not None:
+        return
+
+    console = logging.StreamHandler()
+    console.setFormatter(_build_formatter(fmt))
+    _console = console
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.handlers = [_InProcessQueueHandler(log_queue)]
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e encerra a thread de escrita. Seguro chamar mais de uma vez."""
+    global _listener, _console
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _console = None
+    logging.getLogger(ROOT_LOGGER_NAME).handlers = []
+
+
+def _use_direct_handler_in_child() -> None:
+    """Apos fork a fila nao tem mais leitor (a thread do listener fica no pai): escreve direto."""
+    global _listener
+    if _console is None:
+        return
+    _listener = None
+    logging.getLogger(ROOT_LOGGER_NAME).handlers = [_console]
+
 
+os.register_at_fork(after_in_child=_use_direct_handler_in_child)
 
-def setup_logger(name: str = "esport_calendar") -> logging.Logger:
-    """Configura e retorna logger com timestamp HH:MM:SS e output em stdout."""
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
 
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(message)s",
-        datefmt="%H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    return logger
+def setup_logger(name: str = ROOT_LOGGER_NAME) -> logging.Logger:
+    """Retorna logger do projeto (filho de esport_calendar). Idempotente: nao duplica handlers."""
+    configure_logging()
+    if name != ROOT_LOGGER_NAME and not name.startswith(f"{ROOT_LOGGER_NAME}."):
+        name = f"{ROOT_LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
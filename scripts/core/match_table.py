@@ -0,0 +1,474 @@
+"""
+Tabela colunar das partidas para analises de agenda sem parsear ICS.
+
+Uma coluna por campo (jogo, time1, time2, inicio UTC, torneio, organizador, primeira vez
+vista, ultima atualizacao, remarcacoes) em arrays tipados: horarios em segundos epoch
+(int64) e textos codificados por dicionario (codigo inteiro + vocabulario). O pipeline
+sincroniza a tabela com o calendario a cada salvamento; partidas podadas continuam nela,
+entao consultas sobre anos de historico leem um unico arquivo binario
+(scripts/data/match-table.bin) em milissegundos.
+
+Filtros e agrupamentos usam NumPy quando instalado (opcional) e caem para array/listas
+puras caso contrario, com o mesmo resultado. Horas e semanas em BRT fixo (UTC-3, sem
+horario de verao desde 2019).
+
+Relatorios:
+    python scripts/core/match_table.py --report weekly --game CS2
+    python scripts/core/match_table.py --report hours --team FURIA
+    python scripts/core/match_table.py --report reschedules --from 2026-01-01
+    python scripts/core/match_table.py --rebuild
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+import pytz
+from icalendar import Calendar
+
+from config import BR_TZ_NAME, MATCH_TABLE_FILE, MatchRecord, normalize_team
+from artifacts import write_artifact
+from archive import build_archive_record, query_archive
+from calendar_manager import load_calendar
+from feeds import entries_by_uid, prefix_table
+from locking import file_lock
+from registry import load_registry
+
+try:
+    import numpy as _np
+except ImportError:  # Sem NumPy: mesmas operacoes sobre array/listas (mais lentas, mesmo resultado)
+    _np = None
+
+MAGIC = b"MTBL1\n"
+BRT_OFFSET_SECONDS = -3 * 3600
+EPOCH_MONDAY = date(1970, 1, 5)  # Primeira segunda-feira apos o epoch (1970-01-01 foi quinta)
+REPORTS = ("weekly", "hours", "reschedules")
+
+# (coluna, typecode do array, vocabulario dos codigos ou None para valores numericos)
+COLUMNS = (
+    ("game", "B", "game"),
+    ("team1", "i", "team"),
+    ("team2", "i", "team"),
+    ("start", "q", None),
+    ("tournament", "i", "tournament"),
+    ("organizer", "i", "organizer"),
+    ("first_seen", "q", None),   # 0 = desconhecido (partida importada do arquivo historico)
+    ("last_updated", "q", None),
+    ("reschedules", "H", None),  # Quantas vezes o horario de inicio mudou
+)
+VOCABULARIES = ("game", "team", "tournament", "organizer")
+
+
+class MatchTable:
+    """Partidas por UID em colunas tipadas (uma linha por partida, ordem de insercao)."""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, code, _ in COLUMNS}
+        self.vocab: Dict[str, List[str]] = {kind: [] for kind in VOCABULARIES}
+        self.uids: List[str] = []
+        self._codes: Dict[str, Dict[str, int]] = {kind: {} for kind in VOCABULARIES}
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def encode(self, kind: str, value: str) -> int:
+        codes = self._codes[kind]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.vocab[kind])
+            self.vocab[kind].append(value)
+        return code
+
+    def upsert(self, entry: dict, organizer: str, now: int) -> str:
+        """Insere ou atualiza a partida de uma entrada de feed. Retorna added, updated ou unchanged."""
+        values = {
+            "game": self.encode("game", entry["game"]),
+            "team1": self.encode("team", entry["team1"]),
+            "team2": self.encode("team", entry["team2"]),
+            "start": _epoch(entry["start"]),
+            "tournament": self.encode("tournament", entry["tournament"]),
+        }
+        row = self._rows.get(entry["uid"])
+        if row is None:
+            values.update(
+                organizer=self.encode("organizer", organizer), first_seen=now, last_updated=now, reschedules=0
+            )
+            self._rows[entry["uid"]] = len(self.uids)
+            self.uids.append(entry["uid"])
+            for name, _, _ in COLUMNS:
+                self.columns[name].append(values[name])
+            return "added"
+
+        if organizer:  # Entradas do calendario nao trazem organizador: mantem o ja conhecido
+            values["organizer"] = self.encode("organizer", organizer)
+        cols = self.columns
+        if all(cols[name][row] == value for name, value in values.items()):
+            return "unchanged"
+        if cols["start"][row] != values["start"]:
+            cols["reschedules"][row] = min(cols["reschedules"][row] + 1, 0xFFFF)
+        for name, value in values.items():
+            cols[name][row] = value
+        cols["last_updated"][row] = now
+        return "updated"
+
+    def delete(self, uids: Iterable[str]) -> int:
+        """Remove partidas por UID (reconstroi as colunas; raro: so cancelamentos)."""
+        drop = {self._rows[uid] for uid in uids if uid in self._rows}
+        if not drop:
+            return 0
+        keep = [i for i in range(len(self.uids)) if i not in drop]
+        for name, code, _ in COLUMNS:
+            col = self.columns[name]
+            self.columns[name] = array(code, (col[i] for i in keep))
+        self.uids = [self.uids[i] for i in keep]
+        self._rows = {uid: i for i, uid in enumerate(self.uids)}
+        return len(drop)
+
+    def vector(self, name: str):
+        """Coluna como ndarray (sem copia) com NumPy, ou o proprio array sem."""
+        col = self.columns[name]
+        return _np.frombuffer(col, dtype=col.typecode) if _np is not None and len(col) else col
+
+    def codes_matching(self, kind: str, value: str) -> List[int]:
+        """Codigos do vocabulario cujo valor casa com value (times comparados normalizados)."""
+        if kind == "team":
+            target = normalize_team(value)
+            return [code for code, name in enumerate(self.vocab[kind]) if normalize_team(name) == target]
+        return [code for code, name in enumerate(self.vocab[kind]) if name.upper() == value.upper()]
+
+    # -------------------- persistencia --------------------
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            {
+                "rows": len(self.uids),
+                "columns": [[name, code] for name, code, _ in COLUMNS],
+                "vocab": self.vocab,
+                "uids": self.uids,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        parts = [MAGIC, struct.pack("<I", len(header)), header]
+        for name, _, _ in COLUMNS:
+            col = self.columns[name]
+            if sys.byteorder == "big":
+                col = array(col.typecode, col)
+                col.byteswap()
+            parts.append(col.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MatchTable":
+        if not data.startswith(MAGIC):
+            raise ValueError("arquivo nao e uma tabela de partidas")
+        offset = len(MAGIC)
+        (header_len,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        header = json.loads(data[offset:offset + header_len])
+        offset += header_len
+
+        table = cls()
+        rows = header["rows"]
+        for name, code in header["columns"]:
+            col = array(code)
+            size = col.itemsize * rows
+            col.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                col.byteswap()
+            table.columns[name] = col
+            offset += size
+        table.vocab = header["vocab"]
+        table._codes = {kind: {v: i for i, v in enumerate(values)} for kind, values in table.vocab.items()}
+        table.uids = header["uids"]
+        table._rows = {uid: i for i, uid in enumerate(table.uids)}
+        return table
+
+
+def _epoch(timestamp: str) -> int:
+    return int(datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.utc).timestamp())
+
+
+def load_table(path: str = MATCH_TABLE_FILE) -> MatchTable | None:
+    """Tabela gravada no disco. None se ainda nao existe."""
+    try:
+        with open(path, "rb") as f:
+            return MatchTable.from_bytes(f.read())
+    except FileNotFoundError:
+        return None
+
+
+# ==================== FILTROS E AGRUPAMENTOS ====================
+
+def elementwise(values, fn):
+    """fn aplicado a cada valor; com NumPy, uma unica chamada sobre o vetor inteiro."""
+    return fn(values) if _np is not None and not isinstance(values, (array, list)) else [fn(v) for v in values]
+
+
+def take(values, rows):
+    """Valores nas linhas selecionadas (indexacao vetorizada com NumPy)."""
+    if _np is not None and not isinstance(values, (array, list)):
+        return values[rows]
+    return [values[i] for i in rows]
+
+
+def filter_rows(
+    table: MatchTable,
+    game: str = None,
+    team: str = None,
+    start_from: datetime = None,
+    start_to: datetime = None,
+):
+    """Indices das partidas que batem com todos os filtros (time em qualquer lado, inicio em [from, to))."""
+    games = table.codes_matching("game", game) if game else None
+    teams = table.codes_matching("team", team) if team else None
+    low = int(start_from.timestamp()) if start_from else None
+    high = int(start_to.timestamp()) if start_to else None
+
+    if _np is not None:
+        mask = _np.ones(len(table), dtype=bool)
+        if games is not None:
+            mask &= _np.isin(table.vector("game"), games)
+        if teams is not None:
+            mask &= _np.isin(table.vector("team1"), teams) | _np.isin(table.vector("team2"), teams)
+        if low is not None:
+            mask &= table.vector("start") >= low
+        if high is not None:
+            mask &= table.vector("start") < high
+        return _np.flatnonzero(mask)
+
+    cols = table.columns
+    games = set(games) if games is not None else None
+    teams = set(teams) if teams is not None else None
+    return [
+        i for i in range(len(table))
+        if (games is None or cols["game"][i] in games)
+        and (teams is None or cols["team1"][i] in teams or cols["team2"][i] in teams)
+        and (low is None or cols["start"][i] >= low)
+        and (high is None or cols["start"][i] < high)
+    ]
+
+
+def group_count(*keys) -> Dict[Tuple, int]:
+    """Contagem por combinacao de chaves (vetores do mesmo tamanho)."""
+    if _np is not None and keys and len(keys[0]) and not isinstance(keys[0], (array, list)):
+        unique, counts = _np.unique(_np.stack(keys, axis=1), axis=0, return_counts=True)
+        return {tuple(int(v) for v in key): int(n) for key, n in zip(unique, counts)}
+    return dict(Counter(zip(*keys)))
+
+
+def group_sum(keys, values) -> Dict[int, int]:
+    """Soma de values por chave."""
+    if _np is not None and len(keys) and not isinstance(keys, (array, list)):
+        unique, inverse = _np.unique(keys, return_inverse=True)
+        sums = _np.bincount(inverse, weights=values)
+        return {int(k): int(s) for k, s in zip(unique, sums)}
+    totals: Dict[int, int] = {}
+    for key, value in zip(keys, values):
+        totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def week_index(starts):
+    """Semana (BRT, comecando na segunda) de cada inicio, contada a partir de EPOCH_MONDAY."""
+    return elementwise(starts, lambda s: ((s + BRT_OFFSET_SECONDS) // 86400 - 4) // 7)
+
+
+def hour_of_day(starts):
+    """Hora BRT (0-23) de cada inicio."""
+    return elementwise(starts, lambda s: (s + BRT_OFFSET_SECONDS) % 86400 // 3600)
+
+
+# ==================== SINCRONIZACAO COM O PIPELINE ====================
+
+def sync_table(
+    table: MatchTable,
+    entries: Dict[str, dict],
+    organizers: Dict[str, str],
+    now: int,
+    archived: Iterable[dict] = (),
+) -> Dict[str, int]:
+    """
+    Atualiza a tabela com as partidas do calendario (e as recem-arquivadas). Partidas futuras que
+    sumiram do calendario foram canceladas e saem; passadas ficam como historico.
+    """
+    counts = Counter()
+    for entry in list(archived) + list(entries.values()):
+        counts[table.upsert(entry, organizers.get(entry["url"], ""), now)] += 1
+
+    starts = table.columns["start"]
+    cancelled = [uid for i, uid in enumerate(table.uids) if starts[i] >= now and uid not in entries]
+    counts["removed"] = table.delete(cancelled)
+    return dict(counts)
+
+
+def update_match_table(
+    cal: Calendar,
+    records: Iterable[MatchRecord] = (),
+    archived_components: Iterable = (),
+    now_utc: datetime = None,
+    path: str = MATCH_TABLE_FILE,
+) -> Dict[str, int]:
+    """
+    Sincroniza a tabela com o calendario salvo e grava se mudou (chamar sob file_lock, apos o save).
+    records dao o organizador (que o ICS nao guarda); archived_components sao eventos que foram direto
+    para o arquivo historico sem passar pelo calendario (backfill).
+    """
+    now = int((now_utc or datetime.now(pytz.utc)).timestamp())
+    prefixes = prefix_table(load_registry())
+    archived = [build_archive_record(comp, prefixes) for comp in archived_components]
+
+    table = load_table(path)
+    if table is None:
+        table = MatchTable()
+        archived = list(query_archive()) + archived
+    counts = sync_table(
+        table,
+        entries_by_uid(cal, prefixes),
+        {r.url: r.organizer for r in records if r.organizer},
+        now,
+        [a for a in archived if a is not None],
+    )
+    try:
+        write_artifact(path, table.to_bytes())
+    except (IOError, PermissionError) as e:
+        raise IOError(f"Erro ao salvar {path}: {e}")
+    return counts
+
+
+# ==================== RELATORIOS ====================
+
+def tracked_team_codes(table: MatchTable) -> List[int]:
+    """Codigos dos times monitorados no registro (qualquer jogo)."""
+    tracked = {normalize_team(t) for cfg in load_registry().values() for t in cfg.teams}
+    return [code for code, name in enumerate(table.vocab["team"]) if normalize_team(name) in tracked]
+
+
+def report_weekly(table: MatchTable, rows, team_codes: List[int]) -> List[dict]:
+    """Partidas por time por semana (cada lado da partida conta para o seu time)."""
+    weeks = week_index(take(table.vector("start"), rows))
+    counts = Counter()
+    for side in ("team1", "team2"):
+        for (week, team), n in group_count(weeks, take(table.vector(side), rows)).items():
+            counts[(week, team)] += n
+
+    wanted = set(team_codes)
+    report: Dict[int, List] = {}
+    for (week, team), n in counts.items():
+        if team in wanted:
+            report.setdefault(week, []).append((table.vocab["team"][team], n))
+    return [
+        {"week": (EPOCH_MONDAY + timedelta(weeks=week)).isoformat(), "teams": dict(sorted(teams, key=lambda t: (-t[1], t[0])))}
+        for week, teams in sorted(report.items())
+    ]
+
+
+def report_hours(table: MatchTable, rows) -> Dict[int, int]:
+    """Partidas por hora de inicio (BRT), 0-23."""
+    counts = group_count(hour_of_day(take(table.vector("start"), rows)))
+    return {hour: counts.get((hour,), 0) for hour in range(24)}
+
+
+def report_reschedules(table: MatchTable, rows) -> List[dict]:
+    """Por jogo: partidas, quantas tiveram o horario alterado e o total de remarcacoes."""
+    games = take(table.vector("game"), rows)
+    reschedules = take(table.vector("reschedules"), rows)
+    totals = group_count(games)
+    moved = group_count(take(games, [i for i, n in enumerate(reschedules) if n > 0]))
+    sums = group_sum(games, reschedules)
+    return [
+        {
+            "game": table.vocab["game"][code],
+            "matches": n,
+            "rescheduled": moved.get((code,), 0),
+            "rescheduled_pct": round(100 * moved.get((code,), 0) / n, 1),
+            "reschedules": sums.get(code, 0),
+        }
+        for (code,), n in sorted(totals.items(), key=lambda item: table.vocab["game"][item[0][0]])
+    ]
+
+
+def _print_report(report: str, data) -> None:
+    if report == "weekly":
+        for week in data:
+            teams = " | ".join(f"{team} {n}" for team, n in week["teams"].items())
+            print(f"semana {week['week']} | {teams}")
+    elif report == "hours":
+        peak = max(data.values()) or 1
+        for hour, n in data.items():
+            print(f"{hour:02d}h {n:>6} {'#' * round(40 * n / peak)}")
+    else:
+        print(f"{'jogo':<6} {'partidas':>9} {'remarcadas':>11} {'%':>6} {'remarcacoes':>12}")
+        for row in data:
+            print(
+                f"{row['game']:<6} {row['matches']:>9} {row['rescheduled']:>11} "
+                f"{row['rescheduled_pct']:>6} {row['reschedules']:>12}"
+            )
+
+
+def _parse_day(value: str) -> datetime:
+    return pytz.timezone(BR_TZ_NAME).localize(datetime.fromisoformat(value))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Relatorios de agenda sobre a tabela colunar de partidas")
+    parser.add_argument("--report", choices=REPORTS, action="append", help="Relatorio (repetivel; padrao: todos)")
+    parser.add_argument("--game", help="Jogo (CS2, VAL, RL, LOL)")
+    parser.add_argument("--team", help="Time (qualquer lado); no weekly, restringe a este time")
+    parser.add_argument("--from", dest="start_from", type=_parse_day, help="Inicio a partir de YYYY-MM-DD (BRT)")
+    parser.add_argument("--to", dest="start_to", type=_parse_day, help="Inicio antes de YYYY-MM-DD (BRT)")
+    parser.add_argument("--json", action="store_true", help="Saida em JSON")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recria a tabela do arquivo historico + calendario (perde contagem de remarcacoes)")
+    parser.add_argument("--path", default=MATCH_TABLE_FILE)
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        with file_lock():
+            cal = load_calendar()
+            table = MatchTable()
+            counts = sync_table(table, entries_by_uid(cal, prefix_table(load_registry())), {},
+                                int(time.time()), query_archive())
+            write_artifact(args.path, table.to_bytes())
+        print(f"tabela recriada: {len(table)} partidas ({counts.get('added', 0)} inseridas)")
+
+    started = time.perf_counter()
+    table = load_table(args.path)
+    if table is None:
+        print(f"{args.path} nao existe; rode o pipeline ou --rebuild")
+        return 1
+    rows = filter_rows(table, args.game, args.team, args.start_from, args.start_to)
+
+    results = {}
+    for report in args.report or REPORTS:
+        if report == "weekly":
+            codes = table.codes_matching("team", args.team) if args.team else tracked_team_codes(table)
+            results[report] = report_weekly(table, rows, codes)
+        elif report == "hours":
+            results[report] = report_hours(table, rows)
+        else:
+            results[report] = report_reschedules(table, rows)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    print(
+        f"{len(rows)} de {len(table)} partidas | {elapsed_ms:.1f} ms "
+        f"({'NumPy' if _np is not None else 'array'})"
+    )
+    for report, data in results.items():
+        print(f"\n== {report} ==")
+        _print_report(report, data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Merge de tres vias (base, nosso, deles) para calendario e estado.
+
+Usado na gravacao quando o arquivo em disco mudou desde a leitura (outra execucao gravou
+no meio). Eventos sao casados por UID: mudanca de um lado so vence; mudanca dos dois
+lados fica com o de maior SEQUENCE (empate: maior DTSTAMP, depois o nosso); remocao de
+um lado vence se o outro nao alterou o evento.
+"""
+
+from typing import Dict, Tuple
+
+from icalendar import Calendar
+
+_MISSING = object()
+
+
+def _events_by_uid(cal: Calendar) -> Dict[str, object]:
+    return {str(c.get("uid")): c for c in cal.subcomponents if c.name == "VEVENT" and c.get("uid")}
+
+
+def _same(a, b) -> bool:
+    if a is None or b is None:
+        return a is b
+    return a.to_ical() == b.to_ical()
+
+
+def _newer(ours, theirs):
+    """Resolve edicao concorrente do mesmo evento."""
+    def rank(comp):
+        stamp = comp.get("dtstamp")
+        return int(comp.get("sequence", 0)), stamp.dt if stamp is not None else None
+
+    our_rank, their_rank = rank(ours), rank(theirs)
+    if their_rank[0] != our_rank[0]:
+        return theirs if their_rank[0] > our_rank[0] else ours
+    if our_rank[1] and their_rank[1] and their_rank[1] > our_rank[1]:
+        return theirs
+    return ours
+
+
+def merge_calendars(base: Calendar, ours: Calendar, theirs: Calendar) -> Tuple[Calendar, int]:
+    """Calendario mesclado (cabecalho e ordem do nosso) e quantidade de conflitos resolvidos."""
+    base_events, our_events, their_events = _events_by_uid(base), _events_by_uid(ours), _events_by_uid(theirs)
+    conflicts = 0
+
+    merged = Calendar()
+    for name, value in ours.items():
+        merged[name] = value
+    for comp in ours.subcomponents:
+        if comp.name != "VEVENT" or not comp.get("uid"):
+            merged.add_component(comp)
+
+    def resolve(uid: str):
+        nonlocal conflicts
+        b, o, t = base_events.get(uid), our_events.get(uid), their_events.get(uid)
+        if o is not None and t is not None:
+            if _same(o, b) or _same(o, t):
+                return t
+            if _same(t, b):
+                return o
+            conflicts += 1
+            return _newer(o, t)
+        if o is not None:
+            # Deles removeram: respeita se nao mexemos no evento
+            return None if b is not None and _same(o, b) else o
+        if t is not None:
+            return None if b is not None and _same(t, b) else t
+        return None
+
+    for uid in list(our_events) + [u for u in their_events if u not in our_events]:
+        event = resolve(uid)
+        if event is not None:
+            merged.add_component(event)
+    return merged, conflicts
+
+
+def merge_json(base, ours, theirs):
+    """
+    Merge de tres vias de dados JSON (state.json). Chave alterada de um lado so vence;
+    alterada dos dois: dicts recursivo, numeros somam os deltas (contadores de uso),
+    strings ficam com a maior (timestamps ISO), listas unem; demais, o nosso.
+    """
+    if ours == theirs:
+        return ours
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in list(ours) + [k for k in theirs if k not in ours]:
+            value = merge_json(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+    if ours is _MISSING or theirs is _MISSING:
+        return theirs if ours is _MISSING else ours
+    if isinstance(ours, (int, float)) and isinstance(theirs, (int, float)) and not isinstance(ours, bool):
+        start = base if isinstance(base, (int, float)) else 0
+        return start + (ours - start) + (theirs - start)
+    if isinstance(ours, str) and isinstance(theirs, str):
+        return max(ours, theirs)
+    if isinstance(ours, list) and isinstance(theirs, list):
+        return ours + [item for item in theirs if item not in ours]
+    return ours
@@ -0,0 +1,148 @@
+"""
+Exportador OpenMetrics (formato textfile do Prometheus) para execucoes do scraper.
+Apenas formata valores ja coletados em ScrapStats/games_stats e nos contadores do scraper.
+
+O arquivo e sobrescrito a cada execucao com os numeros daquela execucao, entao tudo que e
+por execucao sai como gauge *_last_run, nunca como counter: rate()/increase() sobre valores
+que voltam a zero a cada execucao dariam numeros errados. Pelo mesmo motivo a latencia nao
+eh um histogram: os gauges evitam os sufixos _bucket/_count/_sum e o label le, reservados.
+"""
+
+import os
+from typing import Dict, Any, List, Iterable, Tuple
+
+METRICS_FILE = os.getenv("METRICS_FILE", "scripts/data/metrics.prom")
+METRIC_PREFIX = "esport_calendar"
+
+# Buckets de latencia (segundos) - proxies com render levam dezenas de segundos
+LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, Dict, float]]) -> List[str]:
+    """Gera linhas de uma familia de metricas: # TYPE, # HELP e amostras."""
+    full = f"{METRIC_PREFIX}_{name}"
+    lines = [f"# TYPE {full} {kind}", f"# HELP {full} {help_text}"]
+    for suffix, labels, value in samples:
+        lines.append(f"{full}{suffix}{_labels(labels)} {value}")
+    return lines
+
+
+def _within_samples(labels: Dict[str, Any], observations: List[float]) -> List[Tuple[str, Dict, float]]:
+    """Requisicoes desta execucao com latencia ate cada limite (cumulativo por bound_seconds)."""
+    return [
+        ("", {**labels, "bound_seconds": str(bound)}, sum(1 for o in observations if o <= bound))
+        for bound in LATENCY_BUCKETS
+    ]
+
+
+def build_openmetrics(
+    fetch_metrics: Dict[str, Any],
+    games_stats: Dict[str, Dict[str, Any]],
+    calendar_events: int,
+    calendar_bytes: int,
+    quota_remaining: Dict[str, int],
+    success: bool,
+    execution_time_seconds: float,
+    timestamp: float,
+    duplicates_removed: int = 0,
+) -> str:
+    """Monta documento OpenMetrics completo da execucao."""
+    lines = []
+
+    lines += _family(
+        "fetch_requests_last_run", "gauge", "Requisicoes aos provedores de scraping por status na execucao.",
+        [("", {"provider": p, "status": s}, n)
+         for (p, s), n in sorted(fetch_metrics.get("requests", {}).items())],
+    )
+
+    latency = sorted(fetch_metrics.get("latency", {}).items())
+    lines += _family(
+        "fetch_latency_within_last_run", "gauge", "Requisicoes da execucao com latencia ate bound_seconds.",
+        [sample for p, observations in latency for sample in _within_samples({"provider": p}, observations)],
+    )
+    lines += _family(
+        "fetch_latency_measured_last_run", "gauge", "Requisicoes da execucao com latencia medida.",
+        [("", {"provider": p}, len(observations)) for p, observations in latency],
+    )
+    lines += _family(
+        "fetch_latency_seconds_spent_last_run", "gauge", "Soma das latencias da execucao (s).",
+        [("", {"provider": p}, round(sum(observations), 3)) for p, observations in latency],
+    )
+
+    hedge = fetch_metrics.get("hedge", {})
+    lines += _family(
+        "hedge_sent_last_run", "gauge", "Requisicoes de hedge disparadas (primario acima do percentil).",
+        [("", {}, hedge.get("sent", 0))],
+    )
+    lines += _family(
+        "hedge_won_last_run", "gauge", "Hedges que responderam antes do provedor primario.",
+        [("", {}, hedge.get("won", 0))],
+    )
+    lines += _family(
+        "hedge_tail_saved_seconds_last_run", "gauge", "Latencia de cauda cortada pelo hedge (primario - vencedor).",
+        [("", {}, hedge.get("tail_saved_seconds", 0.0))],
+    )
+    lines += _family(
+        "hedge_extra_requests_last_run", "gauge", "Requisicoes extras (cota) gastas com hedge por provedor.",
+        [("", {"provider": p}, n) for p, n in sorted(hedge.get("extra_requests", {}).items())],
+    )
+
+    per_game = [
+        ("pages_parsed", "Paginas de partidas parseadas.", "pages"),
+        ("sports_events", "SportsEvents JSON-LD encontrados.", "sports_events"),
+        ("events_added", "Eventos adicionados ao calendario.", "added"),
+        ("events_updated", "Eventos atualizados in-place (remarcacoes).", "updated"),
+        ("events_removed", "Eventos removidos por nao serem mais listados.", "removed"),
+        ("events_filtered", "Eventos descartados por time nao permitido.", "filtered"),
+        ("events_skipped_tbd", "Eventos descartados por time TBD.", "skipped_tbd"),
+        ("events_skipped_past", "Eventos descartados por horario passado.", "skipped_past"),
+    ]
+    for name, help_text, key in per_game:
+        lines += _family(
+            f"{name}_last_run", "gauge", help_text,
+            [("", {"game": game}, stats.get(key, 0)) for game, stats in sorted(games_stats.items())],
+        )
+
+    lines += _family(
+        "duplicates_removed_last_run", "gauge", "Eventos duplicados colapsados no calendario, por politica.",
+        [("", {"policy": "match_id"}, duplicates_removed)],
+    )
+    lines += _family("calendar_events", "gauge", "Eventos no calendario salvo.", [("", {}, calendar_events)])
+    lines += _family("calendar_bytes", "gauge", "Tamanho do calendario salvo em bytes.", [("", {}, calendar_bytes)])
+    lines += _family(
+        "quota_remaining", "gauge", "Requisicoes restantes na cota mensal do provedor.",
+        [("", {"provider": p}, n) for p, n in sorted(quota_remaining.items())],
+    )
+    lines += _family("run_success", "gauge", "1 se a ultima execucao teve sucesso.", [("", {}, int(success))])
+    lines += _family(
+        "run_duration_seconds", "gauge", "Duracao da ultima execucao.", [("", {}, round(execution_time_seconds, 3))],
+    )
+    lines += _family(
+        "last_run_timestamp_seconds", "gauge", "Horario (epoch) da ultima execucao.", [("", {}, round(timestamp, 3))],
+    )
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def save_metrics(content: str, path: str = METRICS_FILE) -> None:
+    """Grava arquivo de metricas de forma atomica (coletor textfile nunca le arquivo parcial)."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except (IOError, PermissionError) as e:
+        # Nao falha execucao principal se metricas falharem
+        print(f"Warning: Falha ao salvar metricas: {e}")
@@ -0,0 +1,395 @@
+"""
+Avisos de partidas novas e remarcadas, entregues em segundo plano.
+
+A execucao enfileira os avisos (apos salvar o calendario) num outbox persistente
+(scripts/data/outbox.json) com uma fila por destino. Uma thread entrega em lotes enquanto
+o pipeline segue: um destino lento ou fora do ar nunca atrasa a raspagem nem o save. No fim
+da execucao a entrega tem ate NOTIFY_DRAIN_SECONDS; o que sobrar fica no outbox e sai na
+proxima execucao (entrega pelo menos uma vez).
+
+Avisos da mesma partida ainda nao entregues sao colapsados: nova + remarcada vira uma nova
+com o horario atual; remarcada de volta ao horario anterior some. Falhas esperam com jitter
+decorrelacionado (RetryPolicy); apos NOTIFY_RUN_ATTEMPTS falhas seguidas o destino fica pausado
+ate a proxima execucao. Um aviso e descartado apos NOTIFY_MAX_ATTEMPTS entregas falhas ou quando
+a partida ja comecou.
+
+Destinos (variaveis de ambiente): NOTIFY_WEBHOOK_URL (JSON generico), NOTIFY_DISCORD_WEBHOOK_URL
+(mensagem com embeds) e NOTIFY_FILE (JSON lines local, para testes). Outros destinos entram com
+register_sink(nome, funcao, tamanho do lote).
+
+Uso:
+    python scripts/core/notifier.py            # backlog por destino
+    python scripts/core/notifier.py --drain    # entrega o outbox agora
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+import pytz
+import requests
+
+from config import (
+    BR_TZ_NAME,
+    NOTIFY_BATCH_SIZE,
+    NOTIFY_DRAIN_SECONDS,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_OUTBOX_FILE,
+    NOTIFY_RUN_ATTEMPTS,
+    NOTIFY_SINKS,
+    NOTIFY_TIMEOUT_SECONDS,
+    MatchRecord,
+)
+from artifacts import write_artifact
+from locking import file_lock
+from logger import setup_logger
+from reconcile import ReconcileResult
+from retry_policy import RetryPolicy
+
+logger = setup_logger("notifier")
+
+BR_TZ = pytz.timezone(BR_TZ_NAME)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DISCORD_MAX_EMBEDS = 10
+
+# Espera entre entregas falhas de um destino (dentro da execucao)
+DELIVERY_POLICY = RetryPolicy(
+    max_attempts=NOTIFY_RUN_ATTEMPTS,
+    base_delay=1.0,
+    max_delay=30.0,
+    attempt_timeout=NOTIFY_TIMEOUT_SECONDS,
+    deadline=NOTIFY_DRAIN_SECONDS,
+)
+
+
+# ==================== AVISOS ====================
+
+def _event(record: MatchRecord, kind: str, detected_at: int, previous_start: datetime = None) -> dict:
+    return {
+        "kind": kind,
+        "uid": record.uid,
+        "game": record.game,
+        "team1": record.team1,
+        "team2": record.team2,
+        "start": record.start_utc.astimezone(pytz.utc).strftime(TIMESTAMP_FORMAT),
+        "previous_start": previous_start.astimezone(pytz.utc).strftime(TIMESTAMP_FORMAT) if previous_start else None,
+        "tournament": record.tournament,
+        "url": record.url,
+        "detected_at": detected_at,
+        "attempts": 0,
+    }
+
+
+def build_events(result: ReconcileResult, detected_at: int) -> List[dict]:
+    """Avisos das partidas novas e remarcadas de uma reconciliacao."""
+    events = [_event(record, "added", detected_at) for record in result.new]
+    events += [_event(record, "rescheduled", detected_at, previous) for record, previous in result.rescheduled]
+    return events
+
+
+def coalesce(existing: dict | None, event: dict) -> dict | None:
+    """Junta um aviso novo ao pendente da mesma partida. None = nada a avisar."""
+    if existing is None:
+        return event
+    merged = {**event, "detected_at": existing["detected_at"], "attempts": existing["attempts"]}
+    if existing["kind"] == "added":
+        merged.update(kind="added", previous_start=None)
+        return merged
+    merged["previous_start"] = existing["previous_start"]
+    return None if merged["previous_start"] == merged["start"] else merged
+
+
+# ==================== DESTINOS ====================
+
+def _format_start(timestamp: str) -> str:
+    dt = datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=pytz.utc)
+    return dt.astimezone(BR_TZ).strftime("%d/%m %H:%M")
+
+
+def send_webhook(url: str, events: List[dict]) -> None:
+    """POST JSON generico: {"events": [...]}."""
+    response = requests.post(url, json={"events": events}, timeout=NOTIFY_TIMEOUT_SECONDS)
+    response.raise_for_status()
+
+
+def send_discord(url: str, events: List[dict]) -> None:
+    """Webhook no formato do Discord: um embed por partida."""
+    embeds = []
+    for event in events:
+        when = _format_start(event["start"])
+        if event["kind"] == "rescheduled":
+            when = f"{_format_start(event['previous_start'])} → {when}"
+        embeds.append({
+            "title": f"[{event['game']}] {event['team1']} vs {event['team2']}",
+            "description": f"\U0001f3c6 {event['tournament']}\n\U0001f552 {when} (BRT)",
+            "url": event["url"] or None,
+        })
+    added = sum(1 for e in events if e["kind"] == "added")
+    content = f"\U0001f4c5 {added} partidas novas, {len(events) - added} remarcadas"
+    response = requests.post(url, json={"content": content, "embeds": embeds}, timeout=NOTIFY_TIMEOUT_SECONDS)
+    response.raise_for_status()
+
+
+def send_file(path: str, events: List[dict]) -> None:
+    """Anexa o lote como uma linha JSON (destino local para testes)."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"sent_at": int(time.time()), "events": events}, ensure_ascii=False) + "\n")
+
+
+# Destino -> (funcao de envio(alvo, avisos), avisos por lote)
+SINKS: Dict[str, Tuple[Callable[[str, List[dict]], None], int]] = {
+    "webhook": (send_webhook, NOTIFY_BATCH_SIZE),
+    "discord": (send_discord, DISCORD_MAX_EMBEDS),
+    "file": (send_file, NOTIFY_BATCH_SIZE),
+}
+
+
+def register_sink(name: str, send: Callable[[str, List[dict]], None], batch_size: int = NOTIFY_BATCH_SIZE) -> None:
+    SINKS[name] = (send, batch_size)
+
+
+# ==================== OUTBOX ====================
+
+def read_outbox(path: str = NOTIFY_OUTBOX_FILE) -> dict:
+    """{"pending": {destino: [avisos]}, "totals": {destino: {delivered, dropped}}}."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            outbox = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        outbox = {}
+    outbox.setdefault("pending", {})
+    outbox.setdefault("totals", {})
+    return outbox
+
+
+def _percentile(values: List[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 1)
+
+
+class Dispatcher:
+    """Entrega o outbox numa thread propria; enqueue/close sao chamados pelo pipeline."""
+
+    def __init__(self, sinks: Dict[str, str] = None, path: str = NOTIFY_OUTBOX_FILE):
+        self.sinks = {name: target for name, target in (NOTIFY_SINKS if sinks is None else sinks).items() if name in SINKS}
+        self.path = path
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pending: Dict[str, Dict[str, dict]] = {name: {} for name in self.sinks}
+        self._done: Dict[str, Set[Tuple[str, int]]] = {name: set() for name in self.sinks}  # (uid, detected_at)
+        self._next_attempt: Dict[str, float] = {name: 0.0 for name in self.sinks}
+        self._delay: Dict[str, float] = {name: 0.0 for name in self.sinks}
+        self._streak: Dict[str, int] = {name: 0 for name in self.sinks}  # Falhas seguidas na execucao
+        self._stats = {
+            name: {"delivered": 0, "dropped": 0, "failures": 0, "latencies": [], "last_error": None}
+            for name in self.sinks
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def start(self) -> "Dispatcher":
+        """Carrega o backlog do outbox e comeca a entregar em segundo plano."""
+        if not self.enabled:
+            return self
+        pending = read_outbox(self.path)["pending"]
+        with self._lock:
+            for name in self.sinks:
+                for event in pending.get(name, []):
+                    self._pending[name][event["uid"]] = event
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+        return self
+
+    def enqueue(self, events: Iterable[dict]) -> int:
+        """Coloca avisos na fila de cada destino (colapsando por partida). Retorna quantos entraram."""
+        events = list(events)
+        if not self.enabled or not events:
+            return 0
+        with self._lock:
+            for queue in self._pending.values():
+                for event in events:
+                    merged = coalesce(queue.get(event["uid"]), dict(event))
+                    if merged is None:
+                        queue.pop(event["uid"], None)
+                    else:
+                        queue[event["uid"]] = merged
+        self._wake.set()
+        return len(events)
+
+    def _next_batch(self, name: str) -> List[dict]:
+        with self._lock:
+            if time.monotonic() < self._next_attempt[name]:
+                return []
+            queue = sorted(self._pending[name].values(), key=lambda e: (e["detected_at"], e["start"]))
+            return [dict(e) for e in queue[:SINKS[name][1]]]
+
+    def _deliver(self, name: str, batch: List[dict]) -> None:
+        send = SINKS[name][0]
+        try:
+            send(self.sinks[name], batch)
+        except Exception as e:  # Qualquer falha do destino so adia a entrega
+            self._failed(name, batch, f"{type(e).__name__}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            queue = self._pending[name]
+            for event in batch:
+                current = queue.get(event["uid"])
+                if current is not None and current["start"] == event["start"] and current["kind"] == event["kind"]:
+                    del queue[event["uid"]]
+                self._done[name].add((event["uid"], event["detected_at"]))
+                self._stats[name]["latencies"].append(now - event["detected_at"])
+            self._stats[name]["delivered"] += len(batch)
+            self._delay[name] = 0.0
+            self._streak[name] = 0
+            self._next_attempt[name] = 0.0
+
+    def _failed(self, name: str, batch: List[dict], error: str) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats["failures"] += 1
+            stats["last_error"] = error[:200]
+            now_utc = time.strftime(TIMESTAMP_FORMAT, time.gmtime())
+            queue = self._pending[name]
+            for event in batch:
+                current = queue.get(event["uid"])
+                if current is None:
+                    continue
+                current["attempts"] += 1
+                if current["attempts"] >= NOTIFY_MAX_ATTEMPTS or current["start"] <= now_utc:
+                    del queue[event["uid"]]
+                    self._done[name].add((event["uid"], event["detected_at"]))
+                    stats["dropped"] += 1
+            self._streak[name] += 1
+            if self._streak[name] >= DELIVERY_POLICY.max_attempts:
+                self._next_attempt[name] = float("inf")
+                retry = "proxima execucao"
+            else:
+                self._delay[name] = DELIVERY_POLICY.next_delay(self._delay[name])
+                self._next_attempt[name] = time.monotonic() + self._delay[name]
+                retry = f"{self._delay[name]:.1f}s"
+        logger.warning(f"⚠️  Aviso {name} falhou ({error[:120]}); nova tentativa: {retry}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            sent = False
+            for name in self.sinks:
+                batch = self._next_batch(name)
+                if batch:
+                    self._deliver(name, batch)
+                    sent = True
+            if not sent:
+                self._wake.wait(0.5)
+                self._wake.clear()
+
+    def backlog(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: len(queue) for name, queue in self._pending.items()}
+
+    def close(self, timeout: float = NOTIFY_DRAIN_SECONDS) -> dict:
+        """
+        Espera a entrega por ate timeout, para a thread e grava o que ficou no outbox.
+        Retorna o resumo para o healthcheck (vazio sem destinos configurados).
+        """
+        if not self.enabled:
+            return {}
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while time.monotonic() < deadline and any(self.backlog().values()):
+            with self._lock:
+                waiting = min(self._next_attempt[n] for n, q in self._pending.items() if q)
+            if waiting > deadline:
+                break  # Todos os destinos com backlog estao em espera alem do prazo
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(1.0)  # Entrega em andamento fica no outbox e sai de novo na proxima execucao
+        self._save()
+        return self.report()
+
+    def _save(self) -> None:
+        """Mescla com o outbox do disco (outra execucao pode ter gravado) e grava sob o lock."""
+        with file_lock():
+            outbox = read_outbox(self.path)
+            with self._lock:
+                for name in self.sinks:
+                    queue = {
+                        e["uid"]: e for e in outbox["pending"].get(name, [])
+                        if (e["uid"], e["detected_at"]) not in self._done[name]
+                    }
+                    for uid, event in self._pending[name].items():
+                        queue[uid] = event
+                    outbox["pending"][name] = sorted(queue.values(), key=lambda e: (e["detected_at"], e["uid"]))
+                    totals = outbox["totals"].setdefault(name, {"delivered": 0, "dropped": 0})
+                    totals["delivered"] += self._stats[name]["delivered"]
+                    totals["dropped"] += self._stats[name]["dropped"]
+            try:
+                write_artifact(self.path, json.dumps(outbox, indent=2, ensure_ascii=False).encode("utf-8"))
+            except (IOError, PermissionError) as e:
+                logger.error(f"❌ Erro ao salvar {self.path}: {e}")
+
+    def report(self) -> dict:
+        """Por destino: backlog, idade do aviso mais antigo, entregas, falhas e latencia de entrega."""
+        now = time.time()
+        with self._lock:
+            report = {}
+            for name, queue in self._pending.items():
+                stats = self._stats[name]
+                oldest = min((e["detected_at"] for e in queue.values()), default=None)
+                report[name] = {
+                    "backlog": len(queue),
+                    "oldest_pending_seconds": round(now - oldest) if oldest is not None else None,
+                    "delivered": stats["delivered"],
+                    "failures": stats["failures"],
+                    "dropped": stats["dropped"],
+                    "latency_p50_seconds": _percentile(stats["latencies"], 50),
+                    "latency_p95_seconds": _percentile(stats["latencies"], 95),
+                    "last_error": stats["last_error"],
+                }
+        return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backlog e entrega manual do outbox de avisos")
+    parser.add_argument("--drain", action="store_true", help="Entrega o outbox agora (destinos do ambiente)")
+    parser.add_argument("--timeout", type=float, default=NOTIFY_DRAIN_SECONDS * 4)
+    parser.add_argument("--path", default=NOTIFY_OUTBOX_FILE)
+    args = parser.parse_args(argv)
+
+    if args.drain:
+        dispatcher = Dispatcher(path=args.path)
+        if not dispatcher.enabled:
+            print("Nenhum destino configurado (NOTIFY_WEBHOOK_URL, NOTIFY_DISCORD_WEBHOOK_URL, NOTIFY_FILE)")
+            return 1
+        report = dispatcher.start().close(args.timeout)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0 if not any(r["backlog"] for r in report.values()) else 1
+
+    outbox = read_outbox(args.path)
+    now = time.time()
+    for name, events in sorted(outbox["pending"].items()):
+        totals = outbox["totals"].get(name, {})
+        oldest = f"{(now - min(e['detected_at'] for e in events)) / 60:.0f} min" if events else "-"
+        print(
+            f"{name:<8} backlog {len(events):>4} | mais antigo {oldest:>8} "
+            f"| entregues {totals.get('delivered', 0)} | descartados {totals.get('dropped', 0)}"
+        )
+    if not outbox["pending"]:
+        print("outbox vazio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Perfilamento sob demanda de uma execucao completa (--profile).
+
+Quando ativo, grava em profiling/:
+  - <nome>-<ts>.pstats      dump do cProfile (abrir com python -m pstats ou snakeviz)
+  - <nome>-<ts>-alloc.txt   top N alocacoes do tracemalloc por linha
+  - <nome>-<ts>.collapsed   pilhas amostradas no formato collapsed (flamegraph.pl, speedscope)
+Desligado, profile_run nao instala nada: custo zero.
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from logger import setup_logger
+
+PROFILE_DIR = "profiling"
+PROFILE_TOP_N = 30
+SAMPLE_INTERVAL_SECONDS = 0.005
+TRACEMALLOC_FRAMES = 25
+
+
+class StackSampler(threading.Thread):
+    """Amostrador de pilhas da thread alvo: le sys._current_frames() em intervalo fixo e conta pilhas colapsadas."""
+
+    def __init__(self, target_thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _write_alloc_report(snapshot: tracemalloc.Snapshot, path: str, top_n: int) -> None:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    total = sum(s.size for s in stats)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Top {top_n} alocacoes vivas por linha (total {total / 1024:.1f} KiB)\n\n")
+        for index, stat in enumerate(stats[:top_n], 1):
+            frame = stat.traceback[0]
+            f.write(f"#{index}: {frame.filename}:{frame.lineno} {stat.size / 1024:.1f} KiB ({stat.count} blocos)\n")
+
+
+@contextmanager
+def profile_run(name: str, enabled: bool, out_dir: str = PROFILE_DIR, top_n: int = PROFILE_TOP_N):
+    """Envolve a execucao em cProfile + tracemalloc + amostrador de pilhas se enabled."""
+    if not enabled:
+        yield
+        return
+
+    logger = setup_logger("profiling")
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{base}.pstats")
+        _write_alloc_report(snapshot, f"{base}-alloc.txt", top_n)
+        sampler.write_collapsed(f"{base}.collapsed")
+        logger.info(
+            f"\U0001f52c Perfil gravado em {base}.* | {elapsed:.2f}s | pico de memoria {peak / 1e6:.1f} MB "
+            f"| {sum(sampler.samples.values())} amostras"
+        )
@@ -0,0 +1,229 @@
+"""
+Reconciliacao do calendario com o tips.gg, chaveada pelo ID canonico da partida (URL).
+
+Recebe MatchRecords compactos do scraper. Partidas existentes sao atualizadas no VEVENT
+(mesmo UID) quando mudam horario, titulo ou descricao; VEVENT+VALARM so sao criados para
+partidas novas. Remarcacao que reescreve a URL (data/horario fazem parte do ID) eh
+reconhecida pelo mesmo confronto e torneio dentro de RESCHEDULE_MATCH_WINDOW_HOURS. Eventos so sao removidos quando o tips.gg deixa de lista-los.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Set, Iterable, Tuple
+
+import pytz
+from icalendar import Calendar
+
+from config import EVENT_DURATION_HOURS, RESCHEDULE_MATCH_WINDOW_HOURS, MatchRecord
+from calendar_manager import (
+    is_ours,
+    build_event_description,
+    create_event,
+    get_event_url,
+    extract_match_id,
+    match_id_date,
+    match_id_matchup,
+    normalize_event_datetime_utc,
+    _get_event_start,
+)
+
+
+@dataclass
+class ReconcileResult:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    changed_uids: Set[str] = field(default_factory=set)  # UIDs no calendario (podem ser legados)
+    changed: List[MatchRecord] = field(default_factory=list)
+    new: List[MatchRecord] = field(default_factory=list)
+    rescheduled: List[Tuple[MatchRecord, datetime]] = field(default_factory=list)  # (partida, inicio anterior)
+
+
+def _index_key(match_id: str | None, uid: str) -> str:
+    """Chave do indice: ID da partida ou, sem ID na URL, o proprio UID."""
+    return match_id or f"uid:{uid}"
+
+
+def index_by_match_id(cal: Calendar) -> tuple:
+    """
+    Indexa nossos eventos por ID de partida (ou UID, se a URL nao tiver ID). Duplicatas do
+    mesmo ID (legado do UID antigo) sao removidas, mantendo o de horario mais recente.
+    Retorna (indice, qtd removida).
+    """
+    index: Dict[str, object] = {}
+    duplicates = set()
+
+    for comp in cal.walk("VEVENT"):
+        if not is_ours(comp):
+            continue
+        match_id = _index_key(extract_match_id(get_event_url(comp)), str(comp.get("uid", "")))
+
+        current = index.get(match_id)
+        if current is None:
+            index[match_id] = comp
+            continue
+
+        current_dt = _get_event_start(current)
+        comp_dt = _get_event_start(comp)
+        if comp_dt and (not current_dt or comp_dt > current_dt):
+            index[match_id] = comp
+            duplicates.add(id(current))
+        else:
+            duplicates.add(id(comp))
+
+    if duplicates:
+        cal.subcomponents = [c for c in cal.subcomponents if id(c) not in duplicates]
+    return index, len(duplicates)
+
+
+def _set_prop(component, name: str, value) -> None:
+    component.pop(name, None)
+    component.add(name, value)
+
+
+def _update_event(existing, record: MatchRecord) -> bool:
+    """Copia horario/titulo/descricao da partida raspada para o VEVENT existente. Retorna True se mudou."""
+    new_start = normalize_event_datetime_utc(record.start_utc)
+    old_start = _get_event_start(existing)
+    new_summary = record.summary
+    new_description = build_event_description(record.tournament, record.url)
+
+    if (
+        old_start == new_start
+        and str(existing.get("summary", "")) == new_summary
+        and str(existing.get("description", "")) == new_description
+    ):
+        return False
+
+    _set_prop(existing, "summary", new_summary)
+    _set_prop(existing, "dtstart", new_start)
+    _set_prop(existing, "dtend", new_start + timedelta(hours=EVENT_DURATION_HOURS))
+    _set_prop(existing, "description", new_description)
+    _set_prop(existing, "dtstamp", datetime.now(pytz.utc))
+    _set_prop(existing, "sequence", int(existing.get("sequence", 0)) + 1)
+
+    for alarm in existing.walk("VALARM"):
+        _set_prop(alarm, "description", f"Lembrete: {new_summary}")
+    return True
+
+
+def _find_rescheduled(index: Dict[str, object], record: MatchRecord, listed: Set[str]) -> str | None:
+    """
+    Chave do evento que eh esta partida sob a URL antiga: mesmo confronto (ID sem data/horario),
+    mesmo torneio e inicio a no maximo RESCHEDULE_MATCH_WINDOW_HOURS. Ignora IDs ainda listados.
+    """
+    if not record.match_id:
+        return None
+    matchup = match_id_matchup(record.match_id)
+    tournament_line = build_event_description(record.tournament, "").split("\n", 1)[0]
+    window = timedelta(hours=RESCHEDULE_MATCH_WINDOW_HOURS)
+    new_start = normalize_event_datetime_utc(record.start_utc)
+
+    best, best_gap = None, None
+    for key, comp in index.items():
+        if key in listed or key.startswith("uid:") or match_id_matchup(key) != matchup:
+            continue
+        if str(comp.get("description", "")).split("\n", 1)[0] != tournament_line:
+            continue
+        start = _get_event_start(comp)
+        if start is None or abs(start - new_start) > window:
+            continue
+        gap = abs(start - new_start)
+        if best_gap is None or gap < best_gap:
+            best, best_gap = key, gap
+    return best
+
+
+def upsert_records(cal: Calendar, index: Dict[str, object], records: Iterable[MatchRecord]) -> ReconcileResult:
+    """
+    Cria VEVENT para partidas novas e atualiza in-place as ja existentes (mesmo ID de partida,
+    ou mesma partida remarcada sob URL nova: o indice passa para o ID novo e o UID fica).
+    """
+    result = ReconcileResult()
+    records = list(records)
+    listed = {_index_key(r.match_id, r.uid) for r in records}
+
+    for record in records:
+        key = _index_key(record.match_id, record.uid)
+        existing = index.get(key)
+        if existing is None:
+            old_key = _find_rescheduled(index, record, listed)
+            if old_key is not None:
+                existing = index.pop(old_key)
+                index[key] = existing
+
+        if existing is None:
+            event = create_event(
+                summary=record.summary,
+                start_utc=record.start_utc,
+                description=build_event_description(record.tournament, record.url),
+                uid=record.uid,
+            )
+            cal.add_component(event)
+            index[key] = event
+            result.added += 1
+            result.changed_uids.add(record.uid)
+            result.changed.append(record)
+            result.new.append(record)
+            continue
+
+        previous_start = _get_event_start(existing)
+        if _update_event(existing, record):
+            result.updated += 1
+            result.changed_uids.add(str(existing.get("uid")))
+            result.changed.append(record)
+            if previous_start != _get_event_start(existing):
+                result.rescheduled.append((record, previous_start))
+        else:
+            result.unchanged += 1
+
+    return result
+
+
+def remove_unlisted(
+    cal: Calendar,
+    index: Dict[str, object],
+    prefix: str,
+    scraped_days: Iterable[date],
+    listed_ids: Set[str],
+    now_utc: datetime,
+) -> int:
+    """
+    Remove eventos futuros do jogo cuja pagina de dia foi raspada com sucesso
+    mas que nao aparecem mais nela (partida cancelada/removida pelo tips.gg).
+    """
+    scraped_days = set(scraped_days)
+    stale = set()
+
+    for match_id, comp in index.items():
+        if match_id in listed_ids or match_id_date(match_id) not in scraped_days:
+            continue
+        if not str(comp.get("summary", "")).startswith(prefix):
+            continue
+        start = _get_event_start(comp)
+        if start and start > now_utc:
+            stale.add(match_id)
+
+    if not stale:
+        return 0
+
+    stale_ids = {id(index[m]) for m in stale}
+    cal.subcomponents = [c for c in cal.subcomponents if id(c) not in stale_ids]
+    for match_id in stale:
+        del index[match_id]
+    return len(stale)
+
+
+def reconcile_game(
+    cal: Calendar,
+    index: Dict[str, object],
+    prefix: str,
+    records: List[MatchRecord],
+    scraped_days: Iterable[date],
+    listed_ids: Set[str],
+) -> ReconcileResult:
+    """Upsert das partidas raspadas de um jogo e remocao das que o tips.gg deixou de listar."""
+    result = upsert_records(cal, index, records)
+    result.removed = remove_unlisted(cal, index, prefix, scraped_days, listed_ids, datetime.now(pytz.utc))
+    return result
@@ -0,0 +1,101 @@
+"""
+Dica de atualizacao dos calendarios publicados (REFRESH-INTERVAL e X-PUBLISHED-TTL).
+
+Em vez de PT1H fixo, cada feed recebe um intervalo calculado na hora de gravar:
+- proximidade da proxima partida: o cliente atualiza ~1/REFRESH_LEAD_FRACTION vezes ate ela
+  comecar (partida em andamento = intervalo minimo). Num feed de janela (24h, 7 dias) conta
+  tambem quando a proxima partida de fora entra na janela;
+- frequencia recente de mudancas (versoes do changelog nas ultimas REFRESH_CHANGE_WINDOW_HOURS):
+  no maximo metade do intervalo medio entre mudancas.
+O menor dos dois e limitado a [REFRESH_MIN_MINUTES, REFRESH_MAX_MINUTES] e arredondado para
+baixo para um degrau de REFRESH_STEPS_MINUTES: o cabecalho so muda ao trocar de degrau, entao
+o ICS nao e regravado a cada execucao. Dias sem partida pedem poucas atualizacoes; dias de
+jogo, mais frequentes.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from icalendar import Calendar
+
+from config import (
+    EVENT_DURATION_HOURS,
+    REFRESH_CHANGE_WINDOW_HOURS,
+    REFRESH_LEAD_FRACTION,
+    REFRESH_MAX_MINUTES,
+    REFRESH_MIN_MINUTES,
+    REFRESH_STEPS_MINUTES,
+)
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"  # Campo "at" do changelog
+
+
+def lead_minutes(starts: Iterable[datetime], now_utc: datetime, horizon_hours: int = None) -> float | None:
+    """
+    Minutos ate a proxima mudanca relevante do feed: inicio da proxima partida (0 se ha partida
+    em andamento) ou, em feed de janela, a entrada da proxima partida de fora na janela.
+    None se nao ha partida futura.
+    """
+    live_since = now_utc - timedelta(hours=EVENT_DURATION_HOURS)
+    upcoming = sorted(s for s in starts if s >= live_since)
+    if not upcoming:
+        return None
+    if horizon_hours is None:
+        return max(0.0, (upcoming[0] - now_utc).total_seconds() / 60)
+
+    horizon = now_utc + timedelta(hours=horizon_hours)
+    beyond = next((s for s in upcoming if s >= horizon), None)
+    entering = (beyond - horizon).total_seconds() / 60 if beyond is not None else None
+    if upcoming[0] >= horizon:
+        return entering
+    lead = max(0.0, (upcoming[0] - now_utc).total_seconds() / 60)
+    return lead if entering is None else min(lead, entering)
+
+
+def change_gap_minutes(
+    records: List[dict],
+    now_utc: datetime,
+    window_hours: int = REFRESH_CHANGE_WINDOW_HOURS,
+) -> float | None:
+    """Intervalo medio entre versoes do changelog na janela. None se nada mudou nela."""
+    cutoff = (now_utc - timedelta(hours=window_hours)).strftime(TIMESTAMP_FORMAT)
+    changes = sum(1 for r in records if r["at"] >= cutoff)
+    return window_hours * 60 / changes if changes else None
+
+
+def refresh_minutes(lead: float | None, gap: float | None) -> int:
+    """Intervalo final: menor alvo, limitado aos extremos e arredondado para baixo num degrau."""
+    targets = [REFRESH_MAX_MINUTES]
+    if lead is not None:
+        targets.append(lead * REFRESH_LEAD_FRACTION)
+    if gap is not None:
+        targets.append(gap / 2)
+    target = min(REFRESH_MAX_MINUTES, max(REFRESH_MIN_MINUTES, min(targets)))
+    steps = [s for s in REFRESH_STEPS_MINUTES if REFRESH_MIN_MINUTES <= s <= target]
+    return max(steps) if steps else REFRESH_MIN_MINUTES
+
+
+def _duration(minutes: int) -> str:
+    hours, rest = divmod(minutes, 60)
+    return "PT" + (f"{hours}H" if hours else "") + (f"{rest}M" if rest or not hours else "")
+
+
+def set_refresh_hint(cal: Calendar, minutes: int) -> None:
+    """Grava exatamente um REFRESH-INTERVAL e um X-PUBLISHED-TTL (descarta copias anteriores)."""
+    cal.pop("refresh-interval", None)
+    cal.pop("x-published-ttl", None)
+    cal.add("x-published-ttl", _duration(minutes))
+    cal.add("refresh-interval", timedelta(minutes=minutes), parameters={"VALUE": "DURATION"})
+
+
+def apply_refresh_hint(
+    cal: Calendar,
+    starts: Iterable[datetime],
+    records: List[dict],
+    now_utc: datetime,
+    horizon_hours: int = None,
+) -> int:
+    """Calcula e grava a dica do feed. Retorna o intervalo em minutos."""
+    minutes = refresh_minutes(lead_minutes(starts, now_utc, horizon_hours), change_gap_minutes(records, now_utc))
+    set_refresh_hint(cal, minutes)
+    return minutes
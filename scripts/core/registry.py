@@ -0,0 +1,169 @@
+"""
+Registro declarativo de jogos (scripts/data/games.json).
+
+Define por jogo: base_path, prefixo, lookahead, politica de agenda, times e exclusoes
+(e, opcionalmente, paginas de time para a estrategia de busca por time e o alvo de frescor).
+O arquivo eh compilado uma vez em GameConfig/SchedulePolicy e mantido em cache
+ate que seu mtime/tamanho mude. Adicionar um jogo eh apenas adicionar uma entrada.
+
+A secao opcional "profiles" declara audiencias extras (times, exclusoes, prefixo e
+calendario proprios por jogo) servidas pelas mesmas paginas raspadas.
+"""
+
+import json
+import os
+from dataclasses import replace
+from typing import Dict, Tuple
+
+from config import (
+    CRAWL_STRATEGIES,
+    DEFAULT_PROFILE,
+    FRESHNESS_SLO_MINUTES,
+    PROFILES_DIR,
+    REGISTRY_FILE,
+    FilterProfile,
+    GameConfig,
+    SchedulePolicy,
+)
+
+# Cache: (caminho, mtime_ns, tamanho) -> jogos e perfis compilados
+_registry_cache: Dict[str, object] = {"key": None, "games": None, "profiles": None}
+
+
+class RegistryError(ValueError):
+    """Registro de jogos invalido (campo ausente, politica desconhecida, etc)."""
+
+
+def _compile_policy(raw: dict, where: str) -> SchedulePolicy:
+    mode = raw.get("mode")
+    if mode == "interval":
+        minutes = int(raw.get("minutes", 0))
+        if minutes <= 0:
+            raise RegistryError(f"{where}: 'minutes' deve ser positivo")
+        return SchedulePolicy(mode="interval", interval_minutes=minutes)
+    if mode == "hours":
+        hours = tuple(sorted({int(h) for h in raw.get("hours", [])}))
+        if not hours or any(h < 0 or h > 23 for h in hours):
+            raise RegistryError(f"{where}: 'hours' deve conter horas entre 0 e 23")
+        return SchedulePolicy(mode="hours", hours=hours)
+    raise RegistryError(f"{where}: modo de agenda desconhecido '{mode}'")
+
+
+def compile_registry(data: dict) -> Dict[str, GameConfig]:
+    """Compila o JSON do registro em GameConfig por jogo (ordem do arquivo preservada)."""
+    schedules = {
+        name: {provider: _compile_policy(raw, f"schedules.{name}.{provider}") for provider, raw in policies.items()}
+        for name, policies in data.get("schedules", {}).items()
+    }
+
+    games = {}
+    for key, raw in data.get("games", {}).items():
+        try:
+            schedule = raw["schedule"]
+            if isinstance(schedule, str):
+                if schedule not in schedules:
+                    raise RegistryError(f"games.{key}: agenda '{schedule}' nao definida")
+                game_schedules = schedules[schedule]
+            else:
+                game_schedules = {
+                    provider: _compile_policy(policy, f"games.{key}.schedule.{provider}")
+                    for provider, policy in schedule.items()
+                }
+
+            slo = int(raw.get("freshness_slo_minutes", FRESHNESS_SLO_MINUTES))
+            if slo <= 0:
+                raise RegistryError(f"games.{key}: 'freshness_slo_minutes' deve ser positivo")
+
+            crawl = raw.get("crawl", "auto")
+            if crawl not in CRAWL_STRATEGIES:
+                raise RegistryError(f"games.{key}: estrategia de busca desconhecida '{crawl}'")
+            if crawl == "team" and not raw.get("team_base_path"):
+                raise RegistryError(f"games.{key}: crawl 'team' exige 'team_base_path'")
+
+            games[key] = GameConfig(
+                key=key,
+                prefix=raw["prefix"],
+                base_path=raw["base_path"],
+                days_to_scrape=int(raw.get("lookahead_days", 1)),
+                schedules=game_schedules,
+                teams=set(raw.get("teams", [])),
+                exclusions=set(raw.get("exclusions", [])),
+                frontend_key=raw.get("frontend_key", key.lower()),
+                crawl=crawl,
+                team_base_path=raw.get("team_base_path", ""),
+                team_slugs=dict(raw.get("team_slugs", {})),
+                freshness_slo_minutes=slo,
+            )
+        except KeyError as e:
+            raise RegistryError(f"games.{key}: campo obrigatorio ausente {e}") from e
+
+    return games
+
+
+def compile_profiles(data: dict, games: Dict[str, GameConfig]) -> Dict[str, FilterProfile]:
+    """Compila a secao "profiles": cada jogo do perfil herda base_path/agenda do jogo do registro."""
+    profiles = {}
+    for key, raw in data.get("profiles", {}).items():
+        where = f"profiles.{key}"
+        if key == DEFAULT_PROFILE:
+            raise RegistryError(f"{where}: nome reservado para o calendario principal")
+
+        profile_games = {}
+        for game_key, filters in raw.get("games", {}).items():
+            if game_key not in games:
+                raise RegistryError(f"{where}.games: jogo desconhecido '{game_key}'")
+            base = games[game_key]
+            profile_games[game_key] = replace(
+                base,
+                prefix=filters.get("prefix", base.prefix),
+                teams=set(filters.get("teams", [])),
+                exclusions=set(filters.get("exclusions", [])),
+            )
+        if not profile_games:
+            raise RegistryError(f"{where}: perfil sem jogos")
+
+        profiles[key] = FilterProfile(
+            key=key,
+            name=raw.get("name", f"eSports Calendar ({key})"),
+            calendar=f"{PROFILES_DIR}/{raw.get('calendar', f'{key}.ics')}",
+            games=profile_games,
+        )
+    return profiles
+
+
+def _file_key(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def _load(path: str) -> None:
+    """Recompila jogos e perfis apenas se o arquivo mudou desde a ultima carga."""
+    key = _file_key(path)
+    if _registry_cache["key"] == key:
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    games = compile_registry(data)
+    profiles = compile_profiles(data, games)
+
+    _registry_cache["key"] = key
+    _registry_cache["games"] = games
+    _registry_cache["profiles"] = profiles
+
+
+def load_registry(path: str = REGISTRY_FILE) -> Dict[str, GameConfig]:
+    """Retorna jogos compilados. Recompila apenas se o arquivo mudou desde a ultima carga."""
+    _load(path)
+    return _registry_cache["games"]
+
+
+def load_profiles(path: str = REGISTRY_FILE) -> Dict[str, FilterProfile]:
+    """Retorna perfis de filtro extras compilados (vazio se o registro nao declara nenhum)."""
+    _load(path)
+    return _registry_cache["profiles"]
+
+
+def get_game(key: str, path: str = REGISTRY_FILE) -> GameConfig:
+    """Retorna configuracao de um jogo do registro. Levanta KeyError se inexistente."""
+    return load_registry(path)[key]
@@ -0,0 +1,111 @@
+"""
+Politica de retry das requisicoes aos provedores de scraping.
+
+- Backoff exponencial com jitter decorrelacionado: espera = min(teto, uniforme(base, espera
+  anterior * 3)). Retries de jobs paralelos nao se sincronizam e a espera cresce sem ser fixa.
+- Orcamento de tempo (deadline) por provedor: limita o tempo total gasto num provedor para
+  uma URL; o timeout de cada tentativa e o menor entre o da politica e o que resta dele.
+- Rastreador de latencia (janela deslizante por provedor) que define quando vale enviar
+  uma requisicao de hedge ao provedor secundario, e contadores do custo/ganho do hedge.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+LATENCY_WINDOW = 200  # Amostras mantidas por provedor
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Parametros de retry de um provedor."""
+    max_attempts: int
+    base_delay: float        # Espera minima entre tentativas (s)
+    max_delay: float         # Teto da espera entre tentativas (s)
+    attempt_timeout: float   # Timeout maximo de uma tentativa (s)
+    deadline: float          # Tempo total maximo no provedor por URL (s)
+
+    def next_delay(self, previous: float, rng: random.Random = None) -> float:
+        """Proxima espera com jitter decorrelacionado, a partir da espera anterior."""
+        rng = rng or random
+        return min(self.max_delay, rng.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class Deadline:
+    """Orcamento de tempo iniciado na criacao."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout_for(self, policy: RetryPolicy) -> float:
+        """Timeout da proxima tentativa: o da politica, limitado ao que resta do orcamento."""
+        return min(policy.attempt_timeout, self.remaining())
+
+
+class LatencyTracker:
+    """Latencias recentes por provedor (thread-safe) para calcular percentis."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def observe(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, provider: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Percentil (nearest-rank) das latencias do provedor. None se houver menos de min_samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+@dataclass
+class HedgeStats:
+    """Contadores do hedge na execucao: quanto de cauda cortou e quanta cota custou."""
+    sent: int = 0                 # Hedges disparados
+    won: int = 0                  # Hedge respondeu antes do primario
+    lost: int = 0                 # Primario respondeu antes do hedge
+    tail_saved_seconds: float = 0.0  # Soma de (latencia do primario - latencia do vencedor)
+    extra_requests: Dict[str, int] = field(default_factory=dict)  # Requisicoes de hedge por provedor
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_sent(self) -> None:
+        with self._lock:
+            self.sent += 1
+
+    def record_request(self, provider: str) -> None:
+        with self._lock:
+            self.extra_requests[provider] = self.extra_requests.get(provider, 0) + 1
+
+    def record_outcome(self, hedge_won: bool) -> None:
+        with self._lock:
+            if hedge_won:
+                self.won += 1
+            else:
+                self.lost += 1
+
+    def record_saved(self, seconds: float) -> None:
+        with self._lock:
+            self.tail_saved_seconds += max(0.0, seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "sent": self.sent,
+                "won": self.won,
+                "lost": self.lost,
+                "tail_saved_seconds": round(self.tail_saved_seconds, 3),
+                "extra_requests": dict(self.extra_requests),
+            }
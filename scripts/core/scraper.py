@@ -3,11 +3,17 @@ Web scraping de partidas via tips.gg com fallback automatico entre APIs.
 Primario: Bright Data (5k req/mes) | Fallback: Scrape.do (1k req/mes)
 """
 
+import contextvars
 import json
+import re
+import threading
 import time
-from datetime import datetime, date
-from typing import Optional, List, Tuple, Set
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from datetime import datetime, date, timedelta
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Tuple, Set
 from enum import Enum
+from urllib.parse import urlparse
 
 import pytz
 import requests
@@ -20,10 +26,21 @@ from config import (
     BRIGHT_DATA_URL,
     BRIGHT_DATA_ZONE,
     MAX_RETRIES,
-    RETRY_BACKOFF,
-    SOURCE_MARKER,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    PROVIDER_TIMEOUT_SECONDS,
+    PROVIDER_DEADLINE_SECONDS,
+    HEDGE_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_DEFAULT_DELAY_SECONDS,
+    HEDGE_MIN_DELAY_SECONDS,
+    SCRAPE_DO_RENDER_RECHECK_HOURS,
     BR_TZ_NAME,
+    TEAM_PAGE_HORIZON_DAYS,
+    NO_MATCHES_MARKERS,
     match_has_allowed_team,
+    normalize_team,
 )
 
 
@@ -31,16 +48,19 @@ class ScraperAPI(str, Enum):
     """APIs de scraping disponiveis."""
     BRIGHT_DATA = "brightdata"
     SCRAPE_DO = "scrapedo"
-from config import GameConfig, ScrapStats, ScrapedMatch, GameKey
-from calendar_manager import build_stable_uid, create_event
+from config import DEFAULT_PROFILE, GameConfig, ScrapStats, MatchRecord
+from calendar_manager import build_stable_uid, build_match_uid, extract_match_id
 from logger import setup_logger
+from retry_policy import Deadline, HedgeStats, LatencyTracker, RetryPolicy
+import fetch_trace
 
 BR_TZ = pytz.timezone(BR_TZ_NAME)
 logger = setup_logger("scraper")
 
 # Session reutilizavel para keep-alive
 _session = requests.Session()
-_last_request_time = 0.0
+_last_request_time = 0.0  # Horario reservado para o inicio da ultima requisicao
+_rate_lock = threading.Lock()
 MIN_REQUEST_INTERVAL = 1.0
 
 # API ativa (comeca com BrightData, faz fallback para Scrape.do se falhar)
@@ -48,6 +68,33 @@ _active_api: ScraperAPI = ScraperAPI.BRIGHT_DATA
 _brightdata_failed_count = 0
 _max_brightdata_failures = 3  # Apos 3 falhas consecutivas, usa Scrape.do
 
+# Decisao de render headless do Scrape.do por jogo/dominio (persistida em state['render'])
+_render_decisions: dict = {}
+
+# Metricas de requisicao da execucao atual (exportadas por metrics.py)
+_fetch_metrics = {
+    "requests": {},  # (provedor, status) -> quantidade
+    "latency": {},   # provedor -> [segundos, ...]
+}
+_metrics_lock = threading.Lock()  # backfill busca paginas em varias threads
+
+RETRY_POLICIES = {
+    api: RetryPolicy(
+        max_attempts=MAX_RETRIES,
+        base_delay=RETRY_BASE_DELAY,
+        max_delay=RETRY_MAX_DELAY,
+        attempt_timeout=PROVIDER_TIMEOUT_SECONDS[api.value],
+        deadline=PROVIDER_DEADLINE_SECONDS[api.value],
+    )
+    for api in ScraperAPI
+}
+
+# Hedging (ver retry_policy.py): latencias da execucao, contadores e pool das requisicoes em corrida
+_latency = LatencyTracker()
+_hedge_stats = HedgeStats()
+_hedge_context = threading.local()
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge")
+
 
 def get_active_api() -> ScraperAPI:
     """Retorna API ativa (com fallback automatico)."""
@@ -61,13 +108,47 @@ def set_active_api(api: ScraperAPI) -> None:
     logger.info(f"🔄 API ativa: {api.value.upper()}")
 
 
+def _record_request(api: ScraperAPI, url: str, status, started: float, response=None) -> None:
+    """Registra status e latencia de uma requisicao ao provedor (metricas e trace por requisicao)."""
+    duration = time.time() - started
+    fetch_trace.record(
+        api.value, url, status, duration,
+        size=len(response.content) if response is not None else 0,
+        usable=response is not None and has_sports_event_jsonld(response.text),
+    )
+    key = (api.value, str(status))
+    with _metrics_lock:
+        _fetch_metrics["requests"][key] = _fetch_metrics["requests"].get(key, 0) + 1
+        _fetch_metrics["latency"].setdefault(api.value, []).append(duration)
+    _latency.observe(api.value, duration)
+    if getattr(_hedge_context, "active", False):
+        _hedge_stats.record_request(api.value)
+    logger.debug(
+        f"{api.value} {status} {url} ({duration:.2f}s)",
+        extra={"provider": api.value, "url": url, "status": str(status), "duration": round(duration, 3)},
+    )
+
+
+def get_fetch_metrics() -> dict:
+    """Retorna contadores de requisicoes por (provedor, status), latencias por provedor e do hedge."""
+    return {**_fetch_metrics, "hedge": _hedge_stats.as_dict()}
+
+
+def get_requests_by_provider() -> dict:
+    """Retorna total de requisicoes feitas por provedor nesta execucao."""
+    totals = {}
+    for (provider, _), count in _fetch_metrics["requests"].items():
+        totals[provider] = totals.get(provider, 0) + count
+    return totals
+
+
 def build_url_for_day(base_path: str, target_date: date) -> str:
     """Monta URL da pagina de partidas para uma data especifica no formato DD-MM-YYYY."""
     date_str = target_date.strftime("%d-%m-%Y")
     return f"{base_path}{date_str}/"
 
 
-def _fetch_brightdata(url: str, timeout: int = 60) -> Optional[str]:
+def _fetch_brightdata(url: str, timeout: float = 60) -> Optional[str]:
     """Busca via Bright Data Web Unlocker API."""
     if not BRIGHT_DATA_API_KEY:
         logger.error("❌ Bright Data API key nao configurada")
@@ -84,8 +165,18 @@ def _fetch_brightdata(url: str, timeout: int = 60) -> Optional[str]:
         "format": "raw"
     }
 
+    started = time.time()
     try:
         response = _session.post(BRIGHT_DATA_URL, headers=headers, json=payload, timeout=timeout)
+    except requests.exceptions.Timeout:
+        _record_request(ScraperAPI.BRIGHT_DATA, url, "timeout", started)
+        raise
+    except requests.exceptions.RequestException:
+        _record_request(ScraperAPI.BRIGHT_DATA, url, "error", started)
+        raise
+    _record_request(ScraperAPI.BRIGHT_DATA, url, response.status_code, started, response)
+
+    try:
         response.raise_for_status()
         return response.text
     except requests.exceptions.HTTPError as e:
@@ -99,8 +190,82 @@ def _fetch_brightdata(url: str, timeout: int = 60) -> Optional[str]:
         raise
 
 
-def _fetch_scrapedo(url: str, timeout: int = 60) -> Optional[str]:
-    """Busca via Scrape.do."""
+def has_sports_event_jsonld(html: Optional[str]) -> bool:
+    """Checagem barata (sem parse) de que a pagina traz JSON-LD com SportsEvent."""
+    return bool(html) and "application/ld+json" in html and "SportsEvent" in html
+
+
+def has_no_matches_marker(html: Optional[str]) -> bool:
+    """True se a pagina diz explicitamente que o dia nao tem partidas (NO_MATCHES_MARKERS)."""
+    return bool(html) and any(marker in html for marker in NO_MATCHES_MARKERS)
+
+
+def _render_key(url: str) -> str:
+    """Chave da decisao de render: dominio + secao do jogo (ex: 'tips.gg/csgo')."""
+    parsed = urlparse(url)
+    section = parsed.path.strip("/").split("/")[0]
+    return f"{parsed.netloc}/{section}"
+
+
+def load_render_decisions(decisions: dict) -> None:
+    """Vincula cache de decisoes de render (normalmente state['render'], alterado in-place)."""
+    global _render_decisions
+    _render_decisions = decisions
+
+
+def _needs_render(key: str) -> bool:
+    """True se a ultima checagem exigiu render e ainda nao passou o intervalo de re-checagem."""
+    decision = _render_decisions.get(key)
+    if not decision or not decision.get("render"):
+        return False
+    try:
+        checked = datetime.fromisoformat(decision["checked"])
+    except (KeyError, ValueError, TypeError):
+        return False
+    return datetime.now(pytz.utc) - checked < timedelta(hours=SCRAPE_DO_RENDER_RECHECK_HOURS)
+
+
+def _set_render_decision(key: str, render: bool) -> None:
+    previous = _render_decisions.get(key, {}).get("render")
+    _render_decisions[key] = {"render": render, "checked": datetime.now(pytz.utc).isoformat()}
+    if previous != render:
+        logger.info(f"🖥️  Scrape.do {key}: render {'ativado' if render else 'desativado'}")
+
+
+def _fetch_scrapedo(url: str, timeout: float = 60) -> Optional[str]:
+    """
+    Busca via Scrape.do. Tenta sem render (sem navegador headless) e so renderiza
+    se a resposta nao tiver SportsEvent JSON-LD. Decisao lembrada por jogo/dominio.
+    Retorna None (sem gravar decisao) se nenhuma das respostas e uma listagem de dia.
+    """
+    key = _render_key(url)
+    if _needs_render(key):
+        return _fetch_scrapedo_once(url, timeout, render=True)
+
+    html = _fetch_scrapedo_once(url, timeout, render=False)
+    if html is None or has_sports_event_jsonld(html):
+        if html is not None:
+            _set_render_decision(key, False)
+        return html
+
+    rendered = _fetch_scrapedo_once(url, timeout, render=True)
+    if has_sports_event_jsonld(rendered):
+        _set_render_decision(key, True)
+        return rendered
+
+    # Nem renderizado trouxe partidas, mas a pagina diz que o dia esta vazio: render nao ajuda
+    for page in (rendered, html):
+        if has_no_matches_marker(page):
+            _set_render_decision(key, False)
+            return page
+
+    # Resposta ruim (captcha, bloqueio, erro): nao e dia vazio nem prova sobre o render
+    logger.warning(f"⚠️  Scrape.do sem SportsEvent nem aviso de dia vazio para {url}")
+    return None
+
+
+def _fetch_scrapedo_once(url: str, timeout: float, render: bool) -> Optional[str]:
+    """Uma requisicao ao Scrape.do, com ou sem render headless."""
     if not SCRAPE_DO_API_KEY:
         logger.error("❌ Scrape.do API key nao configurada")
         return None
@@ -108,77 +273,199 @@ def _fetch_scrapedo(url: str, timeout: int = 60) -> Optional[str]:
     params = {
         "token": SCRAPE_DO_API_KEY,
         "url": url,
-        "render": "true"
+        "render": "true" if render else "false"
     }
 
-    response = _session.get(SCRAPE_DO_URL, params=params, timeout=timeout)
+    started = time.time()
+    try:
+        response = _session.get(SCRAPE_DO_URL, params=params, timeout=timeout)
+    except requests.exceptions.Timeout:
+        _record_request(ScraperAPI.SCRAPE_DO, url, "timeout", started)
+        raise
+    except requests.exceptions.RequestException:
+        _record_request(ScraperAPI.SCRAPE_DO, url, "error", started)
+        raise
+    _record_request(ScraperAPI.SCRAPE_DO, url, response.status_code, started, response)
+
     response.raise_for_status()
     return response.text
 
 
+def _wait_for_slot() -> None:
+    """Rate limiting: espaca o inicio das requisicoes em MIN_REQUEST_INTERVAL (seguro entre threads)."""
+    global _last_request_time
+    with _rate_lock:
+        now = time.time()
+        slot = max(now, _last_request_time + MIN_REQUEST_INTERVAL)
+        _last_request_time = slot
+    fetch_trace.note_wait(slot - now)
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def hedge_delay() -> float:
+    """Espera antes do hedge: percentil HEDGE_PERCENTILE das latencias do Bright Data nesta execucao."""
+    observed = _latency.percentile(ScraperAPI.BRIGHT_DATA.value, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+    if observed is None:
+        return HEDGE_DEFAULT_DELAY_SECONDS
+    return max(HEDGE_MIN_DELAY_SECONDS, observed)
+
+
+def _fetch_scrapedo_as_hedge(url: str, timeout: float) -> Optional[str]:
+    _hedge_context.active = True  # _record_request conta as requisicoes como custo do hedge
+    try:
+        return _fetch_scrapedo(url, timeout)
+    finally:
+        _hedge_context.active = False
+
+
+def _fetch_brightdata_hedged(url: str, timeout: float, hedge_timeout: float) -> Tuple[Optional[str], bool, Optional[bool]]:
+    """
+    Bright Data com hedge: se nao responder em hedge_delay(), envia a mesma URL ao Scrape.do
+    e usa a primeira resposta com conteudo. A perdedora termina em segundo plano (ja foi
+    cobrada) e so alimenta os contadores.
+    Retorna (html, hedge enviado, sucesso do Bright Data ou None se ainda em voo).
+    Sem hedge, excecoes do Bright Data propagam como em _fetch_brightdata.
+    """
+    started = time.monotonic()
+    # Cada tarefa leva uma copia do contexto (jogo/dia/tentativa do trace)
+    primary = _hedge_pool.submit(contextvars.copy_context().run, _fetch_brightdata, url, timeout)
+    delay = hedge_delay()
+    try:
+        html = primary.result(timeout=delay)
+        return html, False, bool(html)
+    except FutureTimeout:
+        pass
+
+    logger.info(
+        f"\U0001fa83 Bright Data sem resposta em {delay:.1f}s - hedge no Scrape.do",
+        extra={"provider": ScraperAPI.SCRAPE_DO.value, "url": url},
+    )
+    _wait_for_slot()
+    _hedge_stats.record_sent()
+    hedge = _hedge_pool.submit(contextvars.copy_context().run, _fetch_scrapedo_as_hedge, url, hedge_timeout)
+
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                html = future.result()
+            except Exception as e:
+                provider = ScraperAPI.BRIGHT_DATA if future is primary else ScraperAPI.SCRAPE_DO
+                logger.warning(
+                    f"{provider.value} erro no hedge: {type(e).__name__}",
+                    extra={"provider": provider.value, "url": url},
+                )
+                html = None
+            if not html:
+                continue
+
+            won_at = time.monotonic() - started
+            if future is hedge:
+                _hedge_stats.record_outcome(hedge_won=True)
+                # Ganho real so se sabe quando o primario termina (se terminar com sucesso)
+                primary.add_done_callback(
+                    lambda f: _hedge_stats.record_saved(time.monotonic() - started - won_at)
+                    if not f.exception() and f.result() else None
+                )
+                return html, True, None
+            _hedge_stats.record_outcome(hedge_won=False)
+            return html, True, True
+
+    return None, True, False
+
+
+def _fetch_brightdata_with_fallback(url: str, deadlines: dict) -> Optional[str]:
+    """Bright Data (com hedge opcional) e fallback para Scrape.do; conta falhas consecutivas."""
+    global _brightdata_failed_count
+
+    timeout = deadlines[ScraperAPI.BRIGHT_DATA].timeout_for(RETRY_POLICIES[ScraperAPI.BRIGHT_DATA])
+    fallback_timeout = deadlines[ScraperAPI.SCRAPE_DO].timeout_for(RETRY_POLICIES[ScraperAPI.SCRAPE_DO])
+    try:
+        if HEDGE_ENABLED:
+            html, hedged, primary_ok = _fetch_brightdata_hedged(url, timeout, fallback_timeout)
+        else:
+            html = _fetch_brightdata(url, timeout)
+            hedged, primary_ok = False, bool(html)
+
+        if primary_ok:
+            _brightdata_failed_count = 0  # Reset contador de falhas
+        elif primary_ok is False:
+            # Bright Data retornou None (limite atingido)
+            _brightdata_failed_count += 1
+            if _brightdata_failed_count >= _max_brightdata_failures:
+                logger.warning(
+                    f"⚠️  Bright Data falhou {_brightdata_failed_count}x "
+                    f"- mudando para Scrape.do permanentemente"
+                )
+                set_active_api(ScraperAPI.SCRAPE_DO)
+        if html or hedged:
+            return html  # Com hedge o Scrape.do ja foi tentado
+
+        # Tenta Scrape.do como fallback
+        logger.info("🔄 Tentando Scrape.do como fallback...")
+        return _fetch_scrapedo(url, fallback_timeout)
+    except Exception as e:
+        logger.warning(
+            f"Bright Data erro: {type(e).__name__} - tentando Scrape.do",
+            extra={"provider": ScraperAPI.BRIGHT_DATA.value, "url": url},
+        )
+        _brightdata_failed_count += 1
+        return _fetch_scrapedo(url, fallback_timeout)
+
+
 def fetch_with_retry(url: str, max_retries: int = MAX_RETRIES) -> Optional[str]:
     """
     Busca pagina com retry e fallback automatico entre APIs.
-    Tenta Bright Data primeiro, faz fallback para Scrape.do se falhar.
+    Tenta Bright Data primeiro, faz fallback para Scrape.do se falhar. Cada provedor tem um
+    orcamento de tempo por URL (PROVIDER_DEADLINE_SECONDS); retries esperam com jitter decorrelacionado.
     """
-    global _last_request_time, _active_api, _brightdata_failed_count
+    deadlines = {api: Deadline(RETRY_POLICIES[api].deadline) for api in ScraperAPI}
+    delay = RETRY_BASE_DELAY
 
     for attempt in range(max_retries):
+        api = _active_api
+        fetch_trace.set_attempt(attempt + 1)
+        if deadlines[api].remaining() < 1.0:
+            logger.warning(
+                f"Orcamento de tempo do {api.value} esgotado para {url}",
+                extra={"provider": api.value, "url": url, "attempt": attempt + 1, "status": "deadline"},
+            )
+            break
         try:
-            # Rate limiting
-            elapsed = time.time() - _last_request_time
-            if elapsed < MIN_REQUEST_INTERVAL:
-                time.sleep(MIN_REQUEST_INTERVAL - elapsed)
-
-            timeout = 60 if attempt == 0 else 90
-
-            # Tenta API ativa
-            if _active_api == ScraperAPI.BRIGHT_DATA:
-                try:
-                    html = _fetch_brightdata(url, timeout)
-                    if html:
-                        _last_request_time = time.time()
-                        _brightdata_failed_count = 0  # Reset contador de falhas
-                        return html
-                    else:
-                        # Bright Data retornou None (limite atingido)
-                        _brightdata_failed_count += 1
-                        if _brightdata_failed_count >= _max_brightdata_failures:
-                            logger.warning(
-                                f"⚠️  Bright Data falhou {_brightdata_failed_count}x "
-                                f"- mudando para Scrape.do permanentemente"
-                            )
-                            set_active_api(ScraperAPI.SCRAPE_DO)
-                        # Tenta Scrape.do como fallback
-                        logger.info("🔄 Tentando Scrape.do como fallback...")
-                        html = _fetch_scrapedo(url, timeout)
-                except Exception as e:
-                    logger.warning(f"Bright Data erro: {type(e).__name__} - tentando Scrape.do")
-                    _brightdata_failed_count += 1
-                    html = _fetch_scrapedo(url, timeout)
+            _wait_for_slot()
+
+            if api == ScraperAPI.BRIGHT_DATA:
+                html = _fetch_brightdata_with_fallback(url, deadlines)
             else:
                 # Scrape.do como API principal
-                html = _fetch_scrapedo(url, timeout)
+                html = _fetch_scrapedo(url, deadlines[api].timeout_for(RETRY_POLICIES[api]))
 
             if html:
-                _last_request_time = time.time()
                 return html
 
         except requests.exceptions.HTTPError as e:
             logger.warning(
                 f"HTTP {e.response.status_code} ao buscar {url} "
-                f"(tentativa {attempt + 1}/{max_retries})"
+                f"(tentativa {attempt + 1}/{max_retries})",
+                extra={"url": url, "attempt": attempt + 1, "status": e.response.status_code},
             )
         except requests.exceptions.Timeout:
-            logger.warning(f"Timeout ao buscar {url} (tentativa {attempt + 1}/{max_retries})")
+            logger.warning(
+                f"Timeout ao buscar {url} (tentativa {attempt + 1}/{max_retries})",
+                extra={"url": url, "attempt": attempt + 1, "status": "timeout"},
+            )
         except (requests.exceptions.RequestException, ConnectionError) as e:
             logger.warning(
                 f"Erro ao buscar {url}: {type(e).__name__} "
-                f"(tentativa {attempt + 1}/{max_retries})"
+                f"(tentativa {attempt + 1}/{max_retries})",
+                extra={"url": url, "attempt": attempt + 1, "status": "error"},
             )
 
         if attempt < max_retries - 1:
-            wait_time = RETRY_BACKOFF**attempt
+            delay = RETRY_POLICIES[_active_api].next_delay(delay)
+            wait_time = min(delay, deadlines[_active_api].remaining())
             logger.info(f"Aguardando {wait_time:.1f}s antes de retry...")
             time.sleep(wait_time)
 
@@ -205,134 +492,348 @@ def clean_tournament_name(raw_name: str, team1: str, team2: str) -> str:
     return raw_name
 
 
-def scrape_days_for_game(
-    game_key: str,
-    cfg: GameConfig,
-    target_days: List[date],
-    existing_uids: Set[str],
-) -> Tuple[List, ScrapStats]:
-    """Scrapeia partidas para dias-alvo. Filtra por times permitidos, gera eventos ICS. Retorna (eventos, stats)."""
+@dataclass(slots=True)
+class SportsEventCandidate:
+    """SportsEvent extraido da pagina e ja validado (times, horario), antes do filtro de times."""
+    team1: str
+    team2: str
+    start_utc: datetime
+    match_id: Optional[str]
+    match_url: str
+    name: str
+    organizer: str
+
+
+def extract_sports_events(
+    target_day: date,
+    html: str,
+    now_utc: datetime | None = None,
+    include_past: bool = False,
+) -> Tuple[List[SportsEventCandidate], ScrapStats]:
+    """
+    Parseia o HTML de uma pagina de dia uma vez e extrai os SportsEvents validos, sem aplicar
+    filtro de times. Stats trazem contadores da pagina (scripts, TBD, passados, IDs listados).
+    O dia so entra em stats.scraped_days se a pagina e uma listagem de fato.
+    """
     stats = ScrapStats()
-    new_events = []
+    candidates = []
 
-    for target_day in target_days:
-        url = build_url_for_day(cfg.base_path, target_day)
-        html = fetch_with_retry(url)
+    try:
+        # Usa lxml parser (2-3x mais rapido que html.parser) com fallback
+        try:
+            soup = BeautifulSoup(html, "lxml")
+        except Exception:
+            soup = BeautifulSoup(html, "html.parser")
 
-        if not html:
-            continue
+        scripts = soup.find_all("script", {"type": "application/ld+json"})
+    except Exception as e:
+        logger.warning(
+            f"Erro ao parsear HTML de {target_day.strftime('%d/%m/%Y')}: "
+            f"{type(e).__name__}"
+        )
+        return candidates, stats
 
+    stats.days_scraped += 1
+    stats.scripts_total += len(scripts)
+
+    now_utc = now_utc or datetime.now(pytz.utc)
+
+    for script in scripts:
         try:
-            # Usa lxml parser (2-3x mais rapido que html.parser) com fallback
-            try:
-                soup = BeautifulSoup(html, "lxml")
-            except Exception:
-                soup = BeautifulSoup(html, "html.parser")
+            # Validar se script.string existe antes de parsear
+            if not script.string:
+                continue
+            data = json.loads(script.string)
+        except json.JSONDecodeError:
+            continue
 
-            scripts = soup.find_all("script", {"type": "application/ld+json"})
-        except Exception as e:
-            logger.warning(
-                f"Erro ao parsear HTML de {target_day.strftime('%d/%m/%Y')}: "
-                f"{type(e).__name__}"
-            )
+        if not isinstance(data, dict):
             continue
 
-        stats.days_scraped += 1
-        stats.scripts_total += len(scripts)
+        events = data.get("@graph", []) or [data]
 
-        now_utc = datetime.now(pytz.utc)
+        for event in events:
+            if event.get("@type") != "SportsEvent":
+                continue
 
-        for script in scripts:
-            try:
-                # Validar se script.string existe antes de parsear
-                if not script.string:
-                    continue
-                data = json.loads(script.string)
-            except json.JSONDecodeError:
+            stats.sports_events += 1
+
+            match_url = event.get("url", "")
+            if match_url and not match_url.startswith("http"):
+                match_url = f"https://tips.gg{match_url}"
+            match_id = extract_match_id(match_url)
+            if match_id:
+                stats.listed_ids.add(match_id)
+
+            competitors = event.get("competitor", [])
+
+            # Validar competitors antes de acessar
+            if not isinstance(competitors, list) or len(competitors) < 2:
                 continue
 
-            if not isinstance(data, dict):
+            team1_raw = competitors[0].get("name", "")
+            team2_raw = competitors[1].get("name", "")
+
+            if not team1_raw or not team2_raw:
                 continue
 
-            events = data.get("@graph", []) or [data]
+            if "TBD" in team1_raw or "TBD" in team2_raw:
+                stats.skipped_tbd += 1
+                continue
 
-            for event in events:
-                if event.get("@type") != "SportsEvent":
-                    continue
+            match_time_utc = parse_event_time(event.get("startDate", ""))
+            if not match_time_utc:
+                continue
 
-                competitors = event.get("competitor", [])
+            if match_time_utc < now_utc and not include_past:
+                stats.skipped_past += 1
+                continue
 
-                # Validar competitors antes de acessar
-                if not isinstance(competitors, list) or len(competitors) < 2:
-                    continue
+            candidates.append(SportsEventCandidate(
+                team1=team1_raw,
+                team2=team2_raw,
+                start_utc=match_time_utc,
+                match_id=match_id,
+                match_url=match_url,
+                name=event.get("name", ""),
+                organizer=event.get("organizer", {}).get("name", ""),
+            ))
+
+    # So uma listagem real (com SportsEvent ou aviso de dia vazio) autoriza remover partidas do dia
+    if stats.sports_events or has_no_matches_marker(html):
+        stats.scraped_days.append(target_day)
+    else:
+        logger.warning(
+            f"⚠️  Pagina de {target_day.strftime('%d/%m/%Y')} sem SportsEvent nem aviso de dia vazio "
+            f"- remocoes do dia ignoradas"
+        )
+
+    return candidates, stats
+
+
+def match_candidates(
+    game_key: str,
+    cfg: GameConfig,
+    target_day: date,
+    candidates: List[SportsEventCandidate],
+    page_stats: ScrapStats,
+) -> Tuple[List[MatchRecord], ScrapStats]:
+    """Aplica o filtro de times de cfg (um perfil) aos SportsEvents extraidos de uma pagina."""
+    stats = ScrapStats()
+    stats.merge(page_stats)
+    records = []
 
-                team1_raw = competitors[0].get("name", "")
-                team2_raw = competitors[1].get("name", "")
+    for candidate in candidates:
+        if not match_has_allowed_team(candidate.team1, candidate.team2, cfg):
+            stats.skipped_not_allowed += 1
+            continue
 
-                if not team1_raw or not team2_raw:
-                    continue
+        event_summary = f"{cfg.prefix}{candidate.team1} vs {candidate.team2}"
+        description = clean_tournament_name(candidate.name, candidate.team1, candidate.team2)
+
+        if candidate.match_id:
+            event_uid = build_match_uid(game_key, candidate.match_id)
+        else:
+            event_uid = build_stable_uid(
+                game_key=game_key,
+                event_summary=event_summary,
+                match_time_utc=candidate.start_utc,
+                tournament_desc=description,
+                organizer_name=candidate.organizer,
+                match_url=candidate.match_url,
+            )
 
-                if "TBD" in team1_raw or "TBD" in team2_raw:
-                    stats.skipped_tbd += 1
-                    continue
+        records.append(
+            MatchRecord(
+                game=game_key,
+                uid=event_uid,
+                match_id=candidate.match_id,
+                team1=candidate.team1,
+                team2=candidate.team2,
+                summary=event_summary,
+                start_utc=candidate.start_utc,
+                tournament=description,
+                url=candidate.match_url,
+                day=target_day,
+                organizer=candidate.organizer,
+            )
+        )
+        stats.matched += 1
 
-                match_time_utc = parse_event_time(event.get("startDate", ""))
-                if not match_time_utc:
-                    continue
+    return records, stats
 
-                if match_time_utc < now_utc:
-                    stats.skipped_past += 1
-                    continue
 
-                if not match_has_allowed_team(team1_raw, team2_raw, cfg):
-                    stats.skipped_not_allowed += 1
-                    continue
+def parse_day_page(
+    game_key: str,
+    cfg: GameConfig,
+    target_day: date,
+    html: str,
+    now_utc: datetime | None = None,
+    include_past: bool = False,
+) -> Tuple[List[MatchRecord], ScrapStats]:
+    """
+    Extrai partidas permitidas do HTML de uma pagina de dia. Funcao pura (sem rede nem
+    estado global), podendo rodar em outro processo. include_past mantem partidas ja
+    iniciadas (backfill). Retorna (registros, stats); HTML invalido retorna stats vazios.
+    """
+    candidates, page_stats = extract_sports_events(target_day, html, now_utc, include_past)
+    return match_candidates(game_key, cfg, target_day, candidates, page_stats)
 
-                event_summary = f"{cfg.prefix}{team1_raw} vs {team2_raw}"
-                description = clean_tournament_name(event.get("name", ""), team1_raw, team2_raw)
-                organizer_name = event.get("organizer", {}).get("name", "")
-                match_url = event.get("url", "")
 
-                if match_url and not match_url.startswith("http"):
-                    match_url = f"https://tips.gg{match_url}"
+def scrape_days_for_game(
+    game_key: str,
+    cfg: GameConfig,
+    target_days: List[date],
+) -> Tuple[List[MatchRecord], ScrapStats]:
+    """
+    Scrapeia partidas para dias-alvo e filtra por times permitidos. Retorna (registros, stats).
+    Nao monta eventos ICS: a reconciliacao decide o que eh novo ou atualizado e so entao cria o VEVENT.
+    stats.listed_ids guarda o ID de toda partida listada nas paginas (inclusive filtradas).
+    """
+    return scrape_days_for_profiles(game_key, {DEFAULT_PROFILE: cfg}, target_days)[DEFAULT_PROFILE]
 
-                event_uid = build_stable_uid(
-                    game_key=game_key,
-                    event_summary=event_summary,
-                    match_time_utc=match_time_utc,
-                    tournament_desc=description,
-                    organizer_name=organizer_name,
-                    match_url=match_url,
-                )
 
-                if event_uid in existing_uids:
-                    continue
-
-                match_time_br = match_time_utc.astimezone(BR_TZ)
-                stats.matches.append(
-                    ScrapedMatch(
-                        teams=f"{team1_raw} x {team2_raw}",
-                        time=match_time_br.strftime("%H:%M"),
-                        date=target_day.strftime("%d/%m"),
-                        game=game_key,
-                    )
-                )
+# ==================== ESTRATEGIA DE BUSCA ====================
 
-                event_description = (
-                    f"\U0001f3c6 {description}\n"
-                    f"\U0001f310 {match_url}\n"
-                    f"{SOURCE_MARKER}"
-                )
+def _team_slug(team: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", normalize_team(team)).strip("-")
+
+
+def crawl_teams(profiles: Dict[str, GameConfig]) -> List[str]:
+    """Times permitidos (uniao dos perfis, sem exclusoes) cujas paginas cobririam o jogo."""
+    teams = {
+        team
+        for cfg in profiles.values()
+        for team in cfg.teams
+        if normalize_team(team) not in cfg.exclusions_norm
+    }
+    return sorted(teams)
 
-                cal_event = create_event(
-                    summary=event_summary,
-                    start_utc=match_time_utc,
-                    description=event_description,
-                    uid=event_uid,
-                )
 
-                new_events.append(cal_event)
-                existing_uids.add(event_uid)
-                stats.added += 1
+def team_page_urls(cfg: GameConfig, teams: List[str]) -> List[str]:
+    """URLs das paginas de time (aliases com o mesmo slug viram uma unica pagina)."""
+    urls = []
+    for team in teams:
+        url = f"{cfg.team_base_path}{cfg.team_slugs.get(team) or _team_slug(team)}/"
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def crawl_costs(cfg: GameConfig, teams: List[str], target_days: List[date]) -> Dict[str, int]:
+    """
+    Requisicoes por estrategia: uma pagina por dia-alvo, ou uma por time (so se o jogo tem
+    paginas de time e os dias-alvo cabem no horizonte de proximas partidas da pagina).
+    """
+    costs = {"day": len(target_days)}
+    span = (max(target_days) - min(target_days)).days + 1 if target_days else 0
+    if cfg.team_base_path and span <= TEAM_PAGE_HORIZON_DAYS:
+        costs["team"] = len(team_page_urls(cfg, teams))
+    return costs
 
-    return new_events, stats
+
+def choose_strategy(cfg: GameConfig, teams: List[str], target_days: List[date]) -> str:
+    """
+    Estrategia do jogo: a forcada no registro ou, em "auto", paginas de time so se custam menos
+    que as paginas de dia da execucao normal do jogo (days_to_scrape do registro). Uma janela
+    maior que a de costume nao torna as paginas de time mais baratas; empate fica com "day".
+    """
+    costs = crawl_costs(cfg, teams, target_days)
+    if cfg.crawl in costs:
+        return cfg.crawl
+    baseline = min(costs["day"], cfg.days_to_scrape)
+    return "team" if "team" in costs and costs["team"] < baseline else "day"
+
+
+def plan_urls(cfg: GameConfig, teams: List[str], target_days: List[date]) -> List[str]:
+    """URLs que a estrategia escolhida buscaria (modo --plan)."""
+    if choose_strategy(cfg, teams, target_days) == "team":
+        return team_page_urls(cfg, teams)
+    return [build_url_for_day(cfg.base_path, day) for day in target_days]
+
+
+def scrape_days_for_profiles(
+    game_key: str,
+    profiles: Dict[str, GameConfig],
+    target_days: List[date],
+    strategy: str | None = None,
+) -> Dict[str, Tuple[List[MatchRecord], ScrapStats]]:
+    """
+    Como scrape_days_for_game, para varios perfis ({perfil: GameConfig com filtro proprio}):
+    busca e parseia cada pagina uma unica vez e roda o filtro de cada perfil sobre os mesmos
+    SportsEvents extraidos. Custo de cota e de parse independe do numero de perfis.
+    strategy ("day"/"team") padrao: choose_strategy. Retorna {perfil: (registros, stats)}.
+    Se alguma pagina de time falhar (ou nao for listagem), refaz a busca pelas paginas de dia.
+    """
+    cfg = next(iter(profiles.values()))
+    teams = crawl_teams(profiles)
+    if (strategy or choose_strategy(cfg, teams, target_days)) == "team":
+        results = scrape_team_pages(game_key, profiles, target_days, teams)
+        if results[next(iter(profiles))][1].scraped_days:
+            return results
+        logger.warning(f"⚠️  {game_key}: paginas de time incompletas - usando paginas de dia")
+
+    results = {key: ([], ScrapStats()) for key in profiles}
+    for target_day in target_days:
+        with fetch_trace.trace_context(game_key, target_day):
+            html = fetch_with_retry(build_url_for_day(cfg.base_path, target_day))
+        if not html:
+            continue
+        candidates, page_stats = extract_sports_events(target_day, html)
+        for key, profile_cfg in profiles.items():
+            day_records, day_stats = match_candidates(game_key, profile_cfg, target_day, candidates, page_stats)
+            results[key][0].extend(day_records)
+            results[key][1].merge(day_stats)
+
+    return results
+
+
+def scrape_team_pages(
+    game_key: str,
+    profiles: Dict[str, GameConfig],
+    target_days: List[date],
+    teams: List[str],
+) -> Dict[str, Tuple[List[MatchRecord], ScrapStats]]:
+    """
+    Estrategia por time: uma pagina por time permitido, mesma extracao de JSON-LD e mesmos UIDs
+    das paginas de dia. Mantem so partidas dos dias-alvo (BRT) e deduplica confrontos entre dois
+    times seguidos. Os dias so contam como raspados (remocao de partidas nao listadas) se todas
+    as paginas vieram e sao listagens de fato.
+    """
+    cfg = next(iter(profiles.values()))
+    days = set(target_days)
+    results = {key: ([], ScrapStats()) for key in profiles}
+    seen = set()
+    complete = True
+
+    for url in team_page_urls(cfg, teams):
+        with fetch_trace.trace_context(game_key, None):
+            html = fetch_with_retry(url)
+        if not html:
+            complete = False
+            continue
+        candidates, page_stats = extract_sports_events(target_days[0], html)
+        if not page_stats.scraped_days:
+            complete = False
+        page_stats.scraped_days = []
+
+        by_day: Dict[date, List[SportsEventCandidate]] = {}
+        for candidate in candidates:
+            day = candidate.start_utc.astimezone(BR_TZ).date()
+            key = candidate.match_id or (candidate.team1, candidate.team2, candidate.start_utc)
+            if day not in days or key in seen:
+                continue
+            seen.add(key)
+            by_day.setdefault(day, []).append(candidate)
+
+        for profile_key, profile_cfg in profiles.items():
+            results[profile_key][1].merge(page_stats)
+            for day, day_candidates in sorted(by_day.items()):
+                day_records, day_stats = match_candidates(game_key, profile_cfg, day, day_candidates, ScrapStats())
+                results[profile_key][0].extend(day_records)
+                results[profile_key][1].merge(day_stats)
+
+    if complete:
+        for _, stats in results.values():
+            stats.scraped_days.extend(target_days)
+    return results
@@ -0,0 +1,88 @@
+"""
+Testes da deteccao de mudanca dos artefatos: hash sem campos volateis e regravacao so
+quando o conteudo significativo muda.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import json
+
+import pytest
+
+import artifacts
+from artifacts import content_hash, write_artifact
+from config import CALENDAR_FILENAME, EVENTS_FEED_FILE, HEALTHCHECK_FILE, MANIFEST_FILE
+
+
+def _json(data: dict) -> bytes:
+    return json.dumps(data).encode("utf-8")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Diretorio de trabalho vazio (artefatos e manifest relativos a ele) e estado do modulo limpo."""
+    (tmp_path / "scripts" / "data").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(artifacts, "_manifest_cache", None)
+    monkeypatch.setattr(artifacts, "_changed", set())
+    return tmp_path
+
+
+# ==================== HASH ====================
+
+def test_hash_ignores_volatile_fields():
+    a = _json({"generated_at": "2099-03-10T10:00:00", "matches": [1, 2]})
+    b = _json({"matches": [1, 2], "generated_at": "2099-03-10T11:00:00"})
+    assert content_hash(EVENTS_FEED_FILE, a) == content_hash(EVENTS_FEED_FILE, b)
+    assert content_hash(EVENTS_FEED_FILE, a) != content_hash(EVENTS_FEED_FILE, _json({"matches": [1]}))
+
+
+def test_hash_keeps_meaningful_healthcheck_fields():
+    base = {"success": True, "errors": [], "timestamp": "t1", "stats": {"added": 1}, "games": {}}
+    same = {**base, "timestamp": "t2", "stats": {"added": 9}, "freshness": {"p50": 3}}
+    failed = {**base, "success": False}
+    assert content_hash(HEALTHCHECK_FILE, _json(base)) == content_hash(HEALTHCHECK_FILE, _json(same))
+    assert content_hash(HEALTHCHECK_FILE, _json(base)) != content_hash(HEALTHCHECK_FILE, _json(failed))
+
+
+def test_hash_of_untracked_or_invalid_json_is_raw_content():
+    raw = b'{"generated_at": 1}'
+    assert content_hash(CALENDAR_FILENAME, raw) != content_hash(CALENDAR_FILENAME, b'{"generated_at": 2}')
+    assert content_hash(EVENTS_FEED_FILE, b"not json") == content_hash(CALENDAR_FILENAME, b"not json")
+
+
+def test_drop_field_follows_dotted_path():
+    data = {"a": {"b": 1, "c": 2}, "d": 3}
+    artifacts._drop_field(data, "a.b")
+    artifacts._drop_field(data, "d.x")  # pai nao e dict: ignora
+    assert data == {"a": {"c": 2}, "d": 3}
+
+
+# ==================== GRAVACAO ====================
+
+def test_write_skips_volatile_only_change(workdir):
+    assert write_artifact(EVENTS_FEED_FILE, _json({"generated_at": "t1", "matches": [1]}))
+    manifest = json.loads((workdir / MANIFEST_FILE).read_text())
+    assert EVENTS_FEED_FILE in manifest
+
+    artifacts._changed.clear()
+    assert not write_artifact(EVENTS_FEED_FILE, _json({"generated_at": "t2", "matches": [1]}))
+    assert json.loads((workdir / EVENTS_FEED_FILE).read_text())["generated_at"] == "t1"
+    assert artifacts.changed_artifacts() == set()
+
+
+def test_volatile_change_rides_along_with_other_change(workdir):
+    write_artifact(EVENTS_FEED_FILE, _json({"generated_at": "t1", "matches": [1]}))
+    artifacts._changed.clear()
+
+    assert write_artifact(CALENDAR_FILENAME, b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n")
+    assert write_artifact(EVENTS_FEED_FILE, _json({"generated_at": "t2", "matches": [1]}))
+    assert json.loads((workdir / EVENTS_FEED_FILE).read_text())["generated_at"] == "t2"
+    assert artifacts.changed_artifacts() == {CALENDAR_FILENAME}
+
+
+def test_untracked_path_is_always_written(workdir):
+    assert write_artifact("other.txt", b"x")
+    assert write_artifact("other.txt", b"x")
+    assert artifacts.changed_artifacts() == set()
@@ -0,0 +1,106 @@
+"""
+Testes do backfill: retomada pelo checkpoint em state["backfill"] e paginas que nao sao
+listagem de dia (captcha, bloqueio) ficando pendentes.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import date
+
+import pytest
+
+import backfill
+from registry import load_registry
+
+DAY_FROM = date(2099, 3, 10)
+DAY_TO = date(2099, 3, 12)
+EMPTY_DAY = "<html><body><p>No matches found</p></body></html>"
+CAPTCHA = "<html><body><h1>Just a moment...</h1><div class='captcha'></div></body></html>"
+
+
+def _job(day_to: date = DAY_TO) -> dict:
+    pages = backfill.plan_pages(["CS2"], DAY_FROM, day_to)
+    return {"games": ["CS2"], "from": DAY_FROM.isoformat(), "to": day_to.isoformat(), "pages": len(pages)}
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Backfill sem rede nem disco: paginas por dia em pages, spool em memoria."""
+    pages, spool, cleared = {}, [], []
+    monkeypatch.setattr(backfill, "_fetch_page", lambda game_key, day, url: pages.get(day))
+    monkeypatch.setattr(backfill, "_requests_made", lambda: 0)
+    monkeypatch.setattr(backfill, "save_state", lambda state: None)
+    monkeypatch.setattr(backfill, "_append_spool", spool.extend)
+    monkeypatch.setattr(backfill, "_clear_spool", lambda: cleared.append(True))
+    return {"pages": pages, "spool": spool, "cleared": cleared}
+
+
+def _run(pages, checkpoint, state, budget=100):
+    return backfill.fetch_and_parse(
+        pages, load_registry(), checkpoint, state, concurrency=2, workers=1, budget=budget,
+    )
+
+
+# ==================== CHECKPOINT ====================
+
+def test_plan_pages_orders_by_day_then_game():
+    assert backfill.plan_pages(["CS2", "VAL"], DAY_FROM, date(2099, 3, 11)) == [
+        ("CS2", date(2099, 3, 10)), ("VAL", date(2099, 3, 10)),
+        ("CS2", date(2099, 3, 11)), ("VAL", date(2099, 3, 11)),
+    ]
+
+
+def test_checkpoint_resumes_same_job(offline):
+    state = {"backfill": {"job": _job(), "done": ["CS2:2099-03-10"], "started_at": "x"}}
+    checkpoint = backfill.load_checkpoint(state, _job(), restart=False)
+    assert checkpoint["done"] == ["CS2:2099-03-10"]
+    assert offline["cleared"] == []
+
+
+@pytest.mark.parametrize("job, restart", [(_job(date(2099, 3, 20)), False), (_job(), True)])
+def test_checkpoint_resets_on_new_job_or_restart(offline, job, restart):
+    state = {"backfill": {"job": _job(), "done": ["CS2:2099-03-10"], "started_at": "x"}}
+    checkpoint = backfill.load_checkpoint(state, job, restart=restart)
+    assert checkpoint["done"] == []
+    assert checkpoint["job"] == job
+    assert state["backfill"] is checkpoint
+    assert offline["cleared"] == [True]
+
+
+# ==================== BUSCA E PARSE ====================
+
+def test_blocked_page_stays_pending(offline):
+    offline["pages"].update({DAY_FROM: EMPTY_DAY, date(2099, 3, 11): CAPTCHA})  # dia 12: falha de rede
+    state = {}
+    checkpoint = backfill.load_checkpoint(state, _job(), restart=False)
+
+    completed, failed = _run(backfill.plan_pages(["CS2"], DAY_FROM, DAY_TO), checkpoint, state)
+    assert (completed, failed) == (1, 2)
+    assert checkpoint["done"] == ["CS2:2099-03-10"]
+
+
+def test_resume_fetches_only_pending_pages(offline, monkeypatch):
+    offline["pages"].update({d: EMPTY_DAY for d in (DAY_FROM, date(2099, 3, 11), DAY_TO)})
+    fetched = []
+    pages = offline["pages"]
+    monkeypatch.setattr(backfill, "_fetch_page", lambda game_key, day, url: fetched.append(day) or pages.get(day))
+
+    state = {"backfill": {"job": _job(), "done": ["CS2:2099-03-10"], "started_at": "x"}}
+    checkpoint = backfill.load_checkpoint(state, _job(), restart=False)
+    pending = [p for p in backfill.plan_pages(["CS2"], DAY_FROM, DAY_TO)
+               if backfill._page_key(*p) not in set(checkpoint["done"])]
+
+    assert _run(pending, checkpoint, state) == (2, 0)
+    assert sorted(fetched) == [date(2099, 3, 11), DAY_TO]
+    assert checkpoint["done"] == ["CS2:2099-03-10", "CS2:2099-03-11", "CS2:2099-03-12"]
+
+
+def test_budget_reserves_requests_per_page_in_flight(offline):
+    offline["pages"][DAY_FROM] = EMPTY_DAY
+    state = {}
+    checkpoint = backfill.load_checkpoint(state, _job(), restart=False)
+    pages = backfill.plan_pages(["CS2"], DAY_FROM, DAY_TO)
+
+    assert _run(pages, checkpoint, state, budget=backfill.PAGE_REQUEST_RESERVE - 1) == (0, 0)
+    assert _run(pages[:1], checkpoint, state, budget=backfill.PAGE_REQUEST_RESERVE) == (1, 0)
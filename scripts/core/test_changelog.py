@@ -0,0 +1,107 @@
+"""
+Testes do changelog versionado: diff por UID, compactacao por retencao e delta colapsado
+de changes_since.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+
+from changelog import TIMESTAMP_FORMAT, changes_since, compact, diff_entries, read_changelog, record_changes
+
+NOW = datetime(2099, 3, 10, 12, 0, tzinfo=pytz.utc)
+
+
+def _entry(uid: str, start: str = "2099-03-11T18:00:00Z", summary: str = "FURIA vs NAVI") -> dict:
+    return {"uid": uid, "start": start, "summary": summary}
+
+
+def _record(version: int, days_ago: int = 0, added=(), updated=(), removed=()) -> dict:
+    return {
+        "version": version,
+        "at": (NOW - timedelta(days=days_ago)).strftime(TIMESTAMP_FORMAT),
+        "added": list(added),
+        "updated": list(updated),
+        "removed": list(removed),
+    }
+
+
+# ==================== DIFF ====================
+
+def test_diff_entries_classifies_by_uid():
+    previous = {"a": _entry("a"), "b": _entry("b"), "c": _entry("c")}
+    current = {
+        "a": _entry("a"),
+        "b": _entry("b", start="2099-03-11T20:00:00Z"),
+        "d": _entry("d", start="2099-03-11T10:00:00Z"),
+        "e": _entry("e", start="2099-03-11T09:00:00Z"),
+    }
+    added, updated, removed = diff_entries(previous, current)
+    assert [e["uid"] for e in added] == ["e", "d"]  # por horario de inicio
+    assert [e["uid"] for e in updated] == ["b"]
+    assert removed == ["c"]
+
+
+# ==================== COMPACTACAO ====================
+
+def test_compact_drops_old_records_but_keeps_latest():
+    records = [_record(1, days_ago=30), _record(2, days_ago=20), _record(3, days_ago=2)]
+    assert [r["version"] for r in compact(records, NOW, retention_days=14)] == [3]
+    assert [r["version"] for r in compact(records, NOW, retention_days=25)] == [2, 3]
+
+    stale = [_record(1, days_ago=40), _record(2, days_ago=30)]
+    assert [r["version"] for r in compact(stale, NOW, retention_days=14)] == [2]
+    assert compact([], NOW) == []
+
+
+def test_record_changes_bumps_version_only_on_change(tmp_path):
+    path = str(tmp_path / "changelog.jsonl")
+    previous = {"a": _entry("a")}
+
+    assert record_changes({}, previous, NOW, path) == 1
+    assert record_changes(previous, previous, NOW, path) == 1
+    assert record_changes(previous, {}, NOW + timedelta(hours=1), path) == 2
+    assert [(r["version"], r["removed"]) for r in read_changelog(path)] == [(1, []), (2, ["a"])]
+
+
+def test_record_changes_compacts_on_write(tmp_path):
+    path = str(tmp_path / "changelog.jsonl")
+    record_changes({}, {"a": _entry("a")}, NOW - timedelta(days=30), path)
+    record_changes({"a": _entry("a")}, {}, NOW, path)
+    assert [r["version"] for r in read_changelog(path)] == [1, 2]  # era o ultimo ao compactar
+    record_changes({}, {"b": _entry("b")}, NOW + timedelta(hours=1), path)
+    assert [r["version"] for r in read_changelog(path)] == [2, 3]
+
+
+# ==================== DELTA ====================
+
+def test_changes_since_collapses_history_per_uid():
+    records = [
+        _record(1, added=[_entry("old")]),
+        _record(2, added=[_entry("new")], updated=[_entry("old", summary="v2")]),
+        _record(3, updated=[_entry("new", summary="v3")], removed=["old"]),
+        _record(4, added=[_entry("ghost")]),
+        _record(5, removed=["ghost"]),
+    ]
+    doc = changes_since(1, records)
+    assert (doc["since"], doc["version"], doc["resync"]) == (1, 5, False)
+    assert doc["added"] == [_entry("new", summary="v3")]  # adicionado e depois atualizado
+    assert doc["updated"] == []
+    assert doc["removed"] == ["old"]  # ghost nasceu e morreu dentro do intervalo
+
+
+def test_changes_since_current_version_is_empty():
+    records = [_record(1, added=[_entry("a")])]
+    assert changes_since(1, records) == {
+        "since": 1, "version": 1, "resync": False, "added": [], "updated": [], "removed": [],
+    }
+
+
+def test_changes_since_outside_window_requests_resync():
+    records = [_record(5), _record(6), _record(7)]  # versoes ate 4 compactadas
+    assert not changes_since(4, records)["resync"]
+    for since in (0, 3, 8):
+        assert changes_since(since, records)["resync"]
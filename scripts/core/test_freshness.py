@@ -0,0 +1,122 @@
+"""
+Testes do frescor: registro das medicoes por raspagem, percentis e cumprimento do alvo,
+partidas sem raspagem anterior e poda da janela.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytz
+
+from config import FRESHNESS_SLO_TARGET_PCT, GameConfig, MatchRecord
+from freshness import _percentile, mark_published, note_scrape, prune, summarize
+from reconcile import ReconcileResult
+
+DAY = date(2099, 3, 10)
+T0 = datetime(2099, 3, 10, 9, 0, tzinfo=pytz.utc)
+GAMES = {
+    "CS2": GameConfig(
+        key="CS2", prefix="[CS2] ", base_path="", days_to_scrape=1, schedules={},
+        teams=set(), exclusions=set(), freshness_slo_minutes=60,
+    ),
+}
+
+
+def _record(uid: str, start: datetime = T0 + timedelta(days=1)) -> MatchRecord:
+    return MatchRecord(
+        game="CS2", uid=uid, match_id=uid, team1="FURIA", team2="NAVI", summary="[CS2] FURIA vs NAVI",
+        start_utc=start, tournament="Major", url=f"https://tips.gg/matches/{uid}/", day=DAY,
+    )
+
+
+def _ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _state_with_latencies(minutes) -> dict:
+    """Partidas ja publicadas com frescor (published - listed_after) em minutos."""
+    return {"freshness": {"pages": {}, "reschedules": {}, "matches": {
+        f"m{i}": {"game": "CS2", "listed_after": _ts(T0), "first_seen": _ts(T0),
+                  "published": _ts(T0 + timedelta(minutes=m))}
+        for i, m in enumerate(minutes)
+    }}}
+
+
+# ==================== PERCENTIS ====================
+
+def test_percentile_rounds_to_closest_sorted_position():
+    values = [50, 10, 40, 20, 30]
+    assert (_percentile(values, 50), _percentile(values, 90), _percentile(values, 95)) == (30, 50, 50)
+    assert _percentile([10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110], 90) == 100
+    assert _percentile([7.26], 95) == 7.3
+    assert _percentile([], 50) is None
+
+
+def test_slo_met_pct_and_ok_flag():
+    ok = summarize(_state_with_latencies([10] * 19 + [120]), GAMES)["CS2"]
+    assert (ok["new_matches"], ok["slo_minutes"], ok["slo_met_pct"]) == (20, 60, 95.0)
+    assert ok["slo_ok"] == (95.0 >= FRESHNESS_SLO_TARGET_PCT)
+
+    late = summarize(_state_with_latencies([10] * 9 + [120]), GAMES)["CS2"]
+    assert late["slo_met_pct"] == 90.0
+    assert not late["slo_ok"]
+    assert late["p50_minutes"] == 10
+    assert late["p95_minutes"] == 120
+
+
+# ==================== MEDICOES ====================
+
+def test_first_scrape_of_day_is_unbounded():
+    state = {}
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("a")]), [DAY], T0)
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("b")]), [DAY], T0 + timedelta(minutes=30))
+    assert mark_published(state, T0 + timedelta(minutes=40)) == 2
+
+    row = summarize(state, GAMES)["CS2"]
+    assert (row["new_matches"], row["without_previous_scrape"]) == (2, 1)
+    assert row["p50_minutes"] == 40.0  # b: listada depois da raspagem de T0
+    assert row["slo_met_pct"] == 100.0
+
+
+def test_only_unbounded_matches_leave_percentiles_empty():
+    state = {}
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("a")]), [DAY], T0)
+    mark_published(state, T0)
+    row = summarize(state, GAMES)["CS2"]
+    assert (row["p50_minutes"], row["slo_met_pct"], row["slo_ok"]) == (None, None, True)
+
+
+def test_reschedule_delay_and_lead():
+    state = {}
+    old_start = T0 + timedelta(hours=10)
+    note_scrape(state, "CS2", ReconcileResult(), [DAY], T0)
+    moved = ReconcileResult(rescheduled=[(_record("a", start=old_start + timedelta(hours=2)), old_start)])
+    note_scrape(state, "CS2", moved, [DAY], T0 + timedelta(hours=1))
+    mark_published(state, T0 + timedelta(hours=1, minutes=5))
+
+    row = summarize(state, GAMES)["CS2"]
+    assert row["reschedules"] == 1
+    assert row["reschedule_p50_minutes"] == 65.0
+    assert row["reschedule_lead_p50_hours"] == 9.0
+
+
+def test_unpublished_matches_are_not_summarized():
+    state = {}
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("a")]), [DAY], T0)
+    assert summarize(state, GAMES) == {}
+
+
+def test_prune_drops_measurements_and_pages_outside_window():
+    state = {}
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("old")]), [DAY], T0)
+    mark_published(state, T0)
+    later = T0 + timedelta(days=20)
+    note_scrape(state, "CS2", ReconcileResult(new=[_record("new")]), [DAY + timedelta(days=20)], later)
+    mark_published(state, later)
+
+    prune(state, later, window_days=14)
+    fresh = state["freshness"]
+    assert set(fresh["matches"]) == {"new"}
+    assert set(fresh["pages"]["CS2"]) == {(DAY + timedelta(days=20)).isoformat()}
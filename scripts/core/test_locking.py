@@ -0,0 +1,61 @@
+"""
+Testes do lock consultivo: reentrancia por arquivo e lock de execucao por jogo sem espera.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import multiprocessing
+
+import pytest
+
+from locking import LockTimeout, file_lock, try_file_lock
+
+fcntl = pytest.importorskip("fcntl")
+
+
+def _hold(path: str, ready, release) -> None:
+    with file_lock(path):
+        ready.set()
+        release.wait(10)
+
+
+@pytest.fixture
+def held_by_other_process(tmp_path):
+    """Caminho de lock mantido por outro processo enquanto o teste roda."""
+    path = str(tmp_path / "game.lock")
+    ctx = multiprocessing.get_context("fork")
+    ready, release = ctx.Event(), ctx.Event()
+    proc = ctx.Process(target=_hold, args=(path, ready, release))
+    proc.start()
+    assert ready.wait(10)
+    yield path
+    release.set()
+    proc.join(10)
+
+
+def test_try_file_lock_skips_when_other_process_holds_it(held_by_other_process):
+    with try_file_lock(held_by_other_process) as claimed:
+        assert claimed is False
+    with pytest.raises(LockTimeout):
+        with file_lock(held_by_other_process, timeout=0):
+            pass
+
+
+def test_nested_locks_on_different_paths_each_take_the_file(tmp_path, held_by_other_process):
+    outer = str(tmp_path / "outer.lock")
+    with try_file_lock(outer) as claimed:
+        assert claimed
+        with file_lock(outer, timeout=0):  # reentrante no mesmo arquivo
+            pass
+        # Outro arquivo nao herda a profundidade do externo: ainda disputa o flock
+        with try_file_lock(held_by_other_process) as inner:
+            assert inner is False
+
+
+def test_try_file_lock_is_free_after_release(tmp_path):
+    path = str(tmp_path / "game.lock")
+    with try_file_lock(path) as first:
+        assert first
+    with try_file_lock(path) as second:
+        assert second
@@ -0,0 +1,43 @@
+"""
+Testes do backend de logging em processos filhos (fork do ProcessPoolExecutor do backfill).
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import logger
+
+
+def _log_from_child(message: str) -> int:
+    logger.setup_logger("test_child").warning(message)
+    return os.getpid()
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "out.log"
+    logger.shutdown_logging()
+    logger.configure_logging(fmt="text", level="INFO")
+    with open(path, "w", encoding="utf-8") as stream:
+        logger._console.setStream(stream)
+        yield path
+        logger.shutdown_logging()
+
+
+def test_forked_child_records_reach_output(log_file):
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        child_pid = pool.submit(_log_from_child, "registro do filho").result()
+    logger.setup_logger("test_parent").warning("registro do pai")
+    logger.shutdown_logging()
+
+    output = log_file.read_text(encoding="utf-8")
+    assert child_pid != os.getpid()
+    assert "registro do filho" in output
+    assert "registro do pai" in output
@@ -0,0 +1,137 @@
+"""
+Testes da tabela colunar de partidas: codificacao por dicionario, upsert com contagem de
+remarcacoes, formato binario e filtros/relatorios com e sem NumPy.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import datetime
+
+import pytest
+import pytz
+
+import match_table
+from match_table import MatchTable, filter_rows, hour_of_day, report_hours, report_reschedules, sync_table, week_index
+
+NOW = int(datetime(2099, 3, 10, 12, 0, tzinfo=pytz.utc).timestamp())
+
+
+def _entry(uid: str, team1: str = "FURIA", team2: str = "NAVI", start: str = "2099-03-11T18:00:00Z",
+           game: str = "CS2", tournament: str = "Major") -> dict:
+    return {"uid": uid, "game": game, "team1": team1, "team2": team2, "start": start,
+            "tournament": tournament, "url": f"https://tips.gg/matches/{uid}/"}
+
+
+def _table(*entries) -> MatchTable:
+    table = MatchTable()
+    for entry in entries:
+        table.upsert(entry, "ESL", NOW)
+    return table
+
+
+@pytest.fixture(params=["array", "numpy"])
+def backend(request, monkeypatch):
+    """Roda o teste com as colunas puras (array) e, se instalado, com NumPy."""
+    if request.param == "numpy":
+        monkeypatch.setattr(match_table, "_np", pytest.importorskip("numpy"))
+    else:
+        monkeypatch.setattr(match_table, "_np", None)
+    return request.param
+
+
+def _rows(rows) -> list:
+    return [int(i) for i in rows]
+
+
+# ==================== CODIFICACAO E UPSERT ====================
+
+def test_encode_reuses_codes_per_vocabulary():
+    table = MatchTable()
+    assert [table.encode("team", t) for t in ("FURIA", "NAVI", "FURIA")] == [0, 1, 0]
+    assert table.encode("tournament", "FURIA") == 0  # vocabularios independentes
+    assert table.vocab["team"] == ["FURIA", "NAVI"]
+
+
+def test_upsert_counts_reschedules_and_keeps_organizer():
+    table = MatchTable()
+    assert table.upsert(_entry("a"), "ESL", NOW) == "added"
+    assert table.upsert(_entry("a"), "", NOW + 60) == "unchanged"
+    assert table.upsert(_entry("a", start="2099-03-11T20:00:00Z"), "", NOW + 120) == "updated"
+    assert table.upsert(_entry("a", start="2099-03-11T20:00:00Z", tournament="Major Playoffs"), "", NOW + 180) == "updated"
+
+    cols = table.columns
+    assert cols["reschedules"][0] == 1  # so a mudanca de horario conta
+    assert (cols["first_seen"][0], cols["last_updated"][0]) == (NOW, NOW + 180)
+    assert table.vocab["organizer"][cols["organizer"][0]] == "ESL"
+
+
+def test_binary_roundtrip_preserves_columns_and_vocab():
+    table = _table(_entry("a"), _entry("b", "LOUD", "paiN Gaming", game="VAL", tournament="Champions"))
+    table.upsert(_entry("a", start="2099-03-12T18:00:00Z"), "", NOW + 60)
+
+    loaded = MatchTable.from_bytes(table.to_bytes())
+    assert loaded.uids == table.uids
+    assert loaded.vocab == table.vocab
+    assert {name: list(col) for name, col in loaded.columns.items()} == \
+        {name: list(col) for name, col in table.columns.items()}
+    assert loaded.upsert(_entry("b", "LOUD", "paiN Gaming", game="VAL", tournament="Champions"), "", NOW) == "unchanged"
+
+
+def test_from_bytes_rejects_other_files():
+    with pytest.raises(ValueError):
+        MatchTable.from_bytes(b"BEGIN:VCALENDAR\r\n")
+
+
+def test_delete_rebuilds_row_index():
+    table = _table(_entry("a"), _entry("b"), _entry("c"))
+    assert table.delete(["b", "missing"]) == 1
+    assert table.uids == ["a", "c"]
+    assert table.upsert(_entry("c"), "", NOW) == "unchanged"
+
+
+def test_sync_removes_cancelled_future_matches_only():
+    past = _entry("past", start="2099-03-01T18:00:00Z")
+    gone = _entry("gone")
+    kept = _entry("kept", "LOUD", "G2")
+    table = _table(past, gone, kept)
+
+    counts = sync_table(table, {"kept": kept}, {}, NOW)
+    assert counts == {"unchanged": 1, "removed": 1}
+    assert table.uids == ["past", "kept"]
+
+
+# ==================== FILTROS E RELATORIOS ====================
+
+def test_filter_rows_by_game_team_and_range(backend):
+    table = _table(
+        _entry("a", "FURIA", "NAVI"),
+        _entry("b", "LOUD", "furia", game="VAL"),
+        _entry("c", "MIBR", "G2", start="2099-03-20T18:00:00Z"),
+    )
+    assert _rows(filter_rows(table, team="Furia")) == [0, 1]
+    assert _rows(filter_rows(table, game="cs2")) == [0, 2]
+    assert _rows(filter_rows(table, start_from=datetime(2099, 3, 15, tzinfo=pytz.utc))) == [2]
+    assert _rows(filter_rows(table, game="CS2", start_to=datetime(2099, 3, 15, tzinfo=pytz.utc))) == [0]
+
+
+def test_week_and_hour_use_brt(backend):
+    # 2099-03-09 e segunda; 02:30 UTC de segunda ainda e domingo 23:30 em BRT
+    starts = [int(datetime(2099, 3, 9, 2, 30, tzinfo=pytz.utc).timestamp()),
+              int(datetime(2099, 3, 9, 3, 0, tzinfo=pytz.utc).timestamp())]
+    weeks = [int(w) for w in week_index(starts)]
+    assert weeks[1] == weeks[0] + 1
+    assert [int(h) for h in hour_of_day(starts)] == [23, 0]
+
+
+def test_reports_agree_between_backends(backend):
+    table = _table(_entry("a"), _entry("b", "LOUD", "G2"), _entry("c", game="VAL"))
+    table.upsert(_entry("a", start="2099-03-11T21:00:00Z"), "", NOW + 60)
+    rows = filter_rows(table)
+
+    hours = report_hours(table, rows)
+    assert (hours[15], hours[18], sum(hours.values())) == (2, 1, 3)
+    assert report_reschedules(table, rows) == [
+        {"game": "CS2", "matches": 2, "rescheduled": 1, "rescheduled_pct": 50.0, "reschedules": 1},
+        {"game": "VAL", "matches": 1, "rescheduled": 0, "rescheduled_pct": 0.0, "reschedules": 0},
+    ]
@@ -0,0 +1,125 @@
+"""
+Testes do merge de tres vias por UID (merge_calendars) e da gravacao concorrente do calendario.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+from icalendar import Calendar
+
+from calendar_manager import (
+    build_event_description,
+    build_match_uid,
+    create_event,
+    load_calendar,
+    save_calendar_merged,
+    _get_event_start,
+)
+from merge import merge_calendars
+
+START = datetime(2099, 3, 10, 18, 0, tzinfo=pytz.utc)
+
+
+def _uid(team1: str, team2: str) -> str:
+    return build_match_uid("cs2", f"counter-strike/10-03-2099/{team1}-vs-{team2}/18-00".lower())
+
+
+def _event_for(team1: str, team2: str, start: datetime = START):
+    return create_event(
+        summary=f"[CS2] {team1} vs {team2}",
+        start_utc=start,
+        description=build_event_description("Major", f"https://tips.gg/matches/{team1}-vs-{team2}/"),
+        uid=_uid(team1, team2),
+    )
+
+
+def _calendar(*matchups) -> Calendar:
+    cal = Calendar()
+    for team1, team2 in matchups:
+        cal.add_component(_event_for(team1, team2))
+    return cal
+
+
+def _uids(cal: Calendar) -> set:
+    return {str(c.get("uid")) for c in cal.walk("VEVENT")}
+
+
+def _event(cal: Calendar, uid: str):
+    return next(c for c in cal.walk("VEVENT") if str(c.get("uid")) == uid)
+
+
+def _copy(cal: Calendar) -> Calendar:
+    return Calendar.from_ical(cal.to_ical())
+
+
+def _reschedule(cal: Calendar, uid: str, hours: int) -> None:
+    """Remarca como upsert_records: novo horario, SEQUENCE+1 e DTSTAMP atual."""
+    event = _event(cal, uid)
+    new_start = START + timedelta(hours=hours)
+    for name, value in (
+        ("dtstart", new_start),
+        ("dtend", new_start + timedelta(hours=2)),
+        ("dtstamp", datetime.now(pytz.utc)),
+        ("sequence", int(event.get("sequence", 0)) + 1),
+    ):
+        event.pop(name, None)
+        event.add(name, value)
+
+
+def test_merge_keeps_changes_from_each_side():
+    base = _calendar(("FURIA", "NAVI"), ("MIBR", "G2"))
+    ours, theirs = _copy(base), _copy(base)
+    _reschedule(ours, _uid("FURIA", "NAVI"), 1)
+    theirs.add_component(_event_for("LOUD", "G2"))
+
+    merged, conflicts = merge_calendars(base, ours, theirs)
+    assert conflicts == 0
+    assert _uids(merged) == _uids(ours) | _uids(theirs)
+    assert _get_event_start(_event(merged, _uid("FURIA", "NAVI"))) == START + timedelta(hours=1)
+
+
+def test_merge_conflict_picks_higher_sequence():
+    uid = _uid("FURIA", "NAVI")
+    base = _calendar(("FURIA", "NAVI"))
+    ours, theirs = _copy(base), _copy(base)
+    _reschedule(ours, uid, 1)
+    _reschedule(theirs, uid, 2)
+    _reschedule(theirs, uid, 3)
+
+    merged, conflicts = merge_calendars(base, ours, theirs)
+    assert conflicts == 1
+    assert _get_event_start(_event(merged, uid)) == START + timedelta(hours=3)
+
+
+def test_merge_removal_wins_only_over_untouched_event():
+    base = _calendar(("FURIA", "NAVI"), ("MIBR", "G2"))
+    ours, theirs = _copy(base), _copy(base)
+    theirs.subcomponents = []
+    _reschedule(ours, _uid("MIBR", "G2"), 1)
+
+    merged, _ = merge_calendars(base, ours, theirs)
+    assert _uids(merged) == {_uid("MIBR", "G2")}
+
+
+def test_save_merges_concurrent_write(tmp_path):
+    path = str(tmp_path / "calendar.ics")
+    a, b = _uid("FURIA", "NAVI"), _uid("MIBR", "G2")
+    with open(path, "wb") as f:
+        f.write(_calendar(("FURIA", "NAVI")).to_ical())
+
+    ours = load_calendar(path)
+    ours.add_component(_event_for("MIBR", "G2"))
+    theirs = _copy(ours)
+    theirs.subcomponents = [c for c in theirs.subcomponents if str(c.get("uid")) != b]
+    _reschedule(theirs, a, 1)
+    with open(path, "wb") as f:
+        f.write(theirs.to_ical())
+
+    saved, conflicts = save_calendar_merged(ours, path)
+    assert conflicts == 0
+    on_disk = load_calendar(path)
+    assert _uids(on_disk) == {a, b}
+    assert _get_event_start(_event(on_disk, a)) == START + timedelta(hours=1)
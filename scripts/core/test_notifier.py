@@ -0,0 +1,147 @@
+"""
+Testes dos avisos: colapso de avisos pendentes da mesma partida, regras de descarte e
+pausa do destino, e o outbox gravado ao encerrar.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import json
+
+import pytest
+
+import notifier
+from config import NOTIFY_MAX_ATTEMPTS, NOTIFY_RUN_ATTEMPTS
+from notifier import Dispatcher, coalesce, read_outbox
+
+FUTURE = "2099-03-11T18:00:00Z"
+
+
+def _event(uid: str = "a", kind: str = "added", start: str = FUTURE, previous_start: str = None,
+           detected_at: int = 100, attempts: int = 0) -> dict:
+    return {
+        "kind": kind, "uid": uid, "game": "CS2", "team1": "FURIA", "team2": "NAVI",
+        "start": start, "previous_start": previous_start, "tournament": "Major",
+        "url": f"https://tips.gg/matches/{uid}/", "detected_at": detected_at, "attempts": attempts,
+    }
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    """Destino em memoria (lotes de 2); sink["fail"] faz as entregas levantarem erro."""
+    state = {"batches": [], "fail": False}
+
+    def send(target, events):
+        if state["fail"]:
+            raise ConnectionError("fora do ar")
+        state["batches"].append([e["uid"] for e in events])
+
+    monkeypatch.setitem(notifier.SINKS, "mem", (send, 2))
+    return state
+
+
+@pytest.fixture
+def dispatcher(sink, tmp_path):
+    return Dispatcher(sinks={"mem": "target", "unknown": "x"}, path=str(tmp_path / "outbox.json"))
+
+
+# ==================== COLAPSO ====================
+
+def test_coalesce_first_event_passes_through():
+    event = _event()
+    assert coalesce(None, event) is event
+
+
+def test_coalesce_added_then_rescheduled_stays_added():
+    merged = coalesce(
+        _event(detected_at=100, attempts=2),
+        _event(kind="rescheduled", start="2099-03-11T20:00:00Z", previous_start=FUTURE, detected_at=200),
+    )
+    assert (merged["kind"], merged["start"], merged["previous_start"]) == ("added", "2099-03-11T20:00:00Z", None)
+    assert (merged["detected_at"], merged["attempts"]) == (100, 2)
+
+
+def test_coalesce_reschedules_keep_first_previous_start():
+    first = _event(kind="rescheduled", start="2099-03-11T20:00:00Z", previous_start=FUTURE)
+    second = _event(kind="rescheduled", start="2099-03-11T22:00:00Z", previous_start="2099-03-11T20:00:00Z")
+    merged = coalesce(first, second)
+    assert (merged["kind"], merged["previous_start"], merged["start"]) == ("rescheduled", FUTURE, "2099-03-11T22:00:00Z")
+
+
+def test_coalesce_reschedule_back_to_original_cancels():
+    first = _event(kind="rescheduled", start="2099-03-11T20:00:00Z", previous_start=FUTURE)
+    back = _event(kind="rescheduled", start=FUTURE, previous_start="2099-03-11T20:00:00Z")
+    assert coalesce(first, back) is None
+
+
+def test_enqueue_coalesces_per_match(dispatcher):
+    assert list(dispatcher.sinks) == ["mem"]  # destino sem funcao registrada fica de fora
+    dispatcher.enqueue([_event("a"), _event("b")])
+    dispatcher.enqueue([_event("a", kind="rescheduled", start="2099-03-11T20:00:00Z", previous_start=FUTURE)])
+    assert dispatcher.backlog() == {"mem": 2}
+    assert dispatcher._pending["mem"]["a"]["kind"] == "added"
+
+
+# ==================== ENTREGA E DESCARTE ====================
+
+def test_batches_are_delivered_in_detection_order(dispatcher, sink):
+    dispatcher.enqueue([_event("c", detected_at=300), _event("a", detected_at=100), _event("b", detected_at=200)])
+    while dispatcher.backlog()["mem"]:
+        dispatcher._deliver("mem", dispatcher._next_batch("mem"))
+    assert sink["batches"] == [["a", "b"], ["c"]]
+    assert dispatcher.report()["mem"]["delivered"] == 3
+
+
+def test_failed_event_dropped_after_max_attempts(dispatcher):
+    dispatcher.enqueue([_event("a", attempts=NOTIFY_MAX_ATTEMPTS - 2), _event("b")])
+    batch = [dict(e) for e in dispatcher._pending["mem"].values()]
+
+    dispatcher._failed("mem", batch, "HTTP 500")
+    assert dispatcher.backlog() == {"mem": 2}
+    dispatcher._failed("mem", batch, "HTTP 500")
+    assert set(dispatcher._pending["mem"]) == {"b"}
+    assert dispatcher._pending["mem"]["b"]["attempts"] == 2
+    assert dispatcher.report()["mem"]["dropped"] == 1
+
+
+def test_failed_event_dropped_once_match_started(dispatcher):
+    dispatcher.enqueue([_event("past", start="2000-01-01T00:00:00Z")])
+    dispatcher._failed("mem", [_event("past")], "timeout")
+    assert dispatcher.backlog() == {"mem": 0}
+
+
+def test_sink_paused_after_run_attempts(dispatcher):
+    dispatcher.enqueue([_event("a")])
+    for _ in range(NOTIFY_RUN_ATTEMPTS - 1):
+        dispatcher._failed("mem", [_event("a")], "timeout")
+        assert dispatcher._next_attempt["mem"] != float("inf")
+    dispatcher._failed("mem", [_event("a")], "timeout")
+    assert dispatcher._next_attempt["mem"] == float("inf")
+    assert dispatcher._next_batch("mem") == []
+
+
+# ==================== OUTBOX ====================
+
+def test_close_keeps_undelivered_events_in_outbox(dispatcher, sink):
+    sink["fail"] = True
+    dispatcher.start()
+    dispatcher.enqueue([_event("a")])
+    report = dispatcher.close(timeout=0.5)
+
+    outbox = read_outbox(dispatcher.path)
+    assert [e["uid"] for e in outbox["pending"]["mem"]] == ["a"]
+    assert outbox["pending"]["mem"][0]["attempts"] >= 1
+    assert report["mem"]["backlog"] == 1
+    assert report["mem"]["last_error"].startswith("ConnectionError")
+
+
+def test_backlog_from_outbox_is_delivered_next_run(sink, tmp_path):
+    path = tmp_path / "outbox.json"
+    path.write_text(json.dumps({"pending": {"mem": [_event("a")]}, "totals": {}}))
+
+    report = Dispatcher(sinks={"mem": "target"}, path=str(path)).start().close(timeout=2.0)
+    assert sink["batches"] == [["a"]]
+    assert report["mem"]["backlog"] == 0
+    outbox = read_outbox(str(path))
+    assert outbox["pending"]["mem"] == []
+    assert outbox["totals"]["mem"] == {"delivered": 1, "dropped": 0}
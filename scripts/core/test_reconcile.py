@@ -0,0 +1,231 @@
+"""
+Testes da reconciliacao por ID de partida (upsert, remocao por dia raspado).
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+import pytz
+from icalendar import Calendar
+
+from calendar_manager import (
+    build_event_description,
+    build_match_uid,
+    create_event,
+    _get_event_start,
+)
+from config import MatchRecord
+from reconcile import index_by_match_id, reconcile_game, remove_unlisted, upsert_records
+from scraper import extract_sports_events
+
+PREFIX = "[CS2] "
+DAY = date(2099, 3, 10)
+START = datetime(2099, 3, 10, 18, 0, tzinfo=pytz.utc)
+
+
+def _match_id(team1: str, team2: str, day: date = DAY, time: str = "18-00") -> str:
+    return f"counter-strike/{day.strftime('%d-%m-%Y')}/{team1}-vs-{team2}/{time}".lower()
+
+
+def _record(
+    team1: str, team2: str, start: datetime = START, day: date = DAY, time: str = "18-00", tournament: str = "Major"
+) -> MatchRecord:
+    match_id = _match_id(team1, team2, day, time)
+    return MatchRecord(
+        game="cs2",
+        uid=build_match_uid("cs2", match_id),
+        match_id=match_id,
+        team1=team1,
+        team2=team2,
+        summary=f"{PREFIX}{team1} vs {team2}",
+        start_utc=start,
+        tournament=tournament,
+        url=f"https://tips.gg/matches/{match_id}/",
+        day=day,
+    )
+
+
+def _calendar(*records: MatchRecord) -> Calendar:
+    cal = Calendar()
+    for record in records:
+        cal.add_component(create_event(
+            summary=record.summary,
+            start_utc=record.start_utc,
+            description=build_event_description(record.tournament, record.url),
+            uid=record.uid,
+        ))
+    return cal
+
+
+def _uids(cal: Calendar) -> set:
+    return {str(c.get("uid")) for c in cal.walk("VEVENT")}
+
+
+def _event(cal: Calendar, uid: str):
+    return next(c for c in cal.walk("VEVENT") if str(c.get("uid")) == uid)
+
+
+def _day_page(*records: MatchRecord) -> str:
+    graph = [
+        {
+            "@type": "SportsEvent",
+            "name": f"{r.team1} vs {r.team2}, {r.tournament}",
+            "url": f"/matches/{r.match_id}/",
+            "startDate": r.start_utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "competitor": [{"name": r.team1}, {"name": r.team2}],
+            "organizer": {"name": "ESL"},
+        }
+        for r in records
+    ]
+    script = f'<script type="application/ld+json">{json.dumps({"@graph": graph})}</script>' if graph else ""
+    return f"<html><body>{script}</body></html>"
+
+
+def _reconcile_page(cal: Calendar, html: str):
+    candidates, stats = extract_sports_events(DAY, html, now_utc=START - timedelta(days=1))
+    index, _ = index_by_match_id(cal)
+    records = [_record(c.team1, c.team2, c.start_utc) for c in candidates]
+    return reconcile_game(cal, index, PREFIX, records, stats.scraped_days, stats.listed_ids)
+
+
+# ==================== PAGINAS VAZIAS / BLOQUEADAS ====================
+
+def test_blocked_page_removes_nothing():
+    cal = _calendar(_record("FURIA", "NAVI"), _record("MIBR", "G2"))
+    for html in (
+        "<html><body><h1>Just a moment...</h1><div class='captcha'></div></body></html>",
+        "<html><body>502 Bad Gateway</body></html>",
+        "",
+        "<html><body><script type=\"application/ld+json\">{\"@type\": \"WebSite\"}</script>",
+    ):
+        result = _reconcile_page(cal, html)
+        assert result.removed == 0
+        assert len(_uids(cal)) == 2
+
+
+def test_blocked_page_is_not_a_scraped_day():
+    _, stats = extract_sports_events(DAY, "<html><body>Access denied</body></html>")
+    assert stats.scraped_days == []
+
+
+def test_empty_day_marker_removes_listed_day():
+    cal = _calendar(_record("FURIA", "NAVI"))
+    result = _reconcile_page(cal, "<html><body><p>No matches found</p></body></html>")
+    assert result.removed == 1
+    assert _uids(cal) == set()
+
+
+def test_partial_listing_removes_only_unlisted():
+    kept, gone = _record("FURIA", "NAVI"), _record("MIBR", "G2")
+    cal = _calendar(kept, gone)
+    result = _reconcile_page(cal, _day_page(kept))
+    assert result.removed == 1
+    assert _uids(cal) == {kept.uid}
+
+
+# ==================== UPSERT ====================
+
+def test_upsert_adds_new_match_once():
+    cal = Calendar()
+    index, _ = index_by_match_id(cal)
+    record = _record("FURIA", "NAVI")
+
+    result = upsert_records(cal, index, [record])
+    assert (result.added, result.updated) == (1, 0)
+    assert [r.uid for r in result.new] == [record.uid]
+
+    again = upsert_records(cal, index, [record])
+    assert (again.added, again.updated, again.unchanged) == (0, 0, 1)
+    assert _uids(cal) == {record.uid}
+
+
+def test_upsert_reschedule_keeps_uid_and_bumps_sequence():
+    record = _record("FURIA", "NAVI")
+    cal = _calendar(record)
+    index, _ = index_by_match_id(cal)
+    moved = _record("FURIA", "NAVI", start=START + timedelta(hours=2))
+
+    result = upsert_records(cal, index, [moved])
+    event = _event(cal, record.uid)
+    assert (result.added, result.updated) == (0, 1)
+    assert result.new == []
+    assert result.rescheduled == [(moved, START)]
+    assert _get_event_start(event) == moved.start_utc
+    assert int(event.get("sequence")) == 1
+    assert len(_uids(cal)) == 1
+
+
+def test_upsert_reschedule_with_new_url_keeps_uid():
+    record = _record("FURIA", "NAVI")
+    cal = _calendar(record)
+    index, _ = index_by_match_id(cal)
+    next_day = DAY + timedelta(days=1)
+    moved = _record("FURIA", "NAVI", start=START + timedelta(days=1, hours=2), day=next_day, time="20-00")
+
+    result = upsert_records(cal, index, [moved])
+    event = _event(cal, record.uid)
+    assert (result.added, result.updated) == (0, 1)
+    assert result.rescheduled == [(moved, START)]
+    assert _uids(cal) == {record.uid}
+    assert list(index) == [moved.match_id]
+    assert moved.url in str(event.get("description"))
+
+    reindexed, _ = index_by_match_id(cal)
+    assert str(reindexed[moved.match_id].get("uid")) == record.uid
+
+
+def test_upsert_new_url_is_new_match_when_listed_or_other_tournament():
+    record = _record("FURIA", "NAVI")
+    cal = _calendar(record)
+    index, _ = index_by_match_id(cal)
+    rematch = _record("FURIA", "NAVI", start=START + timedelta(hours=3), time="21-00")
+    other = _record("FURIA", "NAVI", start=START + timedelta(hours=5), time="23-00", tournament="Qualifier")
+
+    result = upsert_records(cal, index, [record, rematch, other])
+    assert (result.added, result.updated, result.unchanged) == (2, 0, 1)
+    assert len(_uids(cal)) == 3
+
+
+def test_index_collapses_legacy_duplicates():
+    record = _record("FURIA", "NAVI")
+    cal = _calendar(record)
+    legacy = create_event(
+        summary=record.summary,
+        start_utc=START - timedelta(hours=1),
+        description=build_event_description(record.tournament, record.url),
+        uid="legacy-uid",
+    )
+    cal.add_component(legacy)
+
+    index, removed = index_by_match_id(cal)
+    assert removed == 1
+    assert _uids(cal) == {record.uid}
+    assert str(index[record.match_id].get("uid")) == record.uid
+
+
+# ==================== REMOCAO ====================
+
+def test_remove_unlisted_only_future_events_of_scraped_days_and_game():
+    listed = _record("FURIA", "NAVI")
+    gone = _record("MIBR", "G2")
+    other_day = _record("LOUD", "G2", start=START + timedelta(days=1), day=DAY + timedelta(days=1))
+    other_game = _record("LOUD", "Sentinels")
+    other_game.summary = f"[VAL] {other_game.team1} vs {other_game.team2}"
+    cal = _calendar(listed, gone, other_day, other_game)
+    index, _ = index_by_match_id(cal)
+
+    removed = remove_unlisted(cal, index, PREFIX, [DAY], {listed.match_id}, START - timedelta(hours=1))
+    assert removed == 1
+    assert _uids(cal) == {listed.uid, other_day.uid, other_game.uid}
+    assert gone.match_id not in index
+
+
+def test_remove_unlisted_keeps_started_matches():
+    record = _record("FURIA", "NAVI")
+    cal = _calendar(record)
+    index, _ = index_by_match_id(cal)
+    assert remove_unlisted(cal, index, PREFIX, [DAY], set(), START + timedelta(minutes=5)) == 0
+    assert _uids(cal) == {record.uid}
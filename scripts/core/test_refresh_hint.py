@@ -0,0 +1,101 @@
+"""
+Testes da dica de atualizacao: proximidade da proxima partida (inclusive em feed de janela),
+frequencia de mudancas, limites e degraus do intervalo e o cabecalho gravado.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from icalendar import Calendar
+
+from config import REFRESH_MAX_MINUTES, REFRESH_MIN_MINUTES, REFRESH_STEPS_MINUTES
+from refresh_hint import (
+    TIMESTAMP_FORMAT,
+    _duration,
+    apply_refresh_hint,
+    change_gap_minutes,
+    lead_minutes,
+    refresh_minutes,
+    set_refresh_hint,
+)
+
+NOW = datetime(2099, 3, 10, 12, 0, tzinfo=pytz.utc)
+
+
+def _in(minutes: float) -> datetime:
+    return NOW + timedelta(minutes=minutes)
+
+
+def _changes(*minutes_ago) -> list:
+    return [{"at": (NOW - timedelta(minutes=m)).strftime(TIMESTAMP_FORMAT)} for m in minutes_ago]
+
+
+# ==================== PROXIMIDADE ====================
+
+def test_lead_is_time_to_next_match():
+    assert lead_minutes([_in(300), _in(90)], NOW) == 90
+    assert lead_minutes([_in(-60)], NOW) == 0.0  # em andamento
+    assert lead_minutes([_in(-600)], NOW) is None  # ja terminou
+    assert lead_minutes([], NOW) is None
+
+
+def test_window_feed_counts_next_match_entering_window():
+    starts = [_in(600), _in(24 * 60 + 120)]
+    assert lead_minutes(starts, NOW, horizon_hours=24) == 120  # entra na janela antes da de dentro comecar
+    assert lead_minutes([_in(24 * 60 + 30)], NOW, horizon_hours=24) == 30
+    assert lead_minutes([_in(60)], NOW, horizon_hours=24) == 60
+
+
+# ==================== FREQUENCIA DE MUDANCAS ====================
+
+def test_change_gap_is_window_over_changes():
+    assert change_gap_minutes(_changes(30, 300, 600, 2000), NOW, window_hours=24) == 24 * 60 / 3
+    assert change_gap_minutes(_changes(2000), NOW, window_hours=24) is None
+
+
+# ==================== LIMITES E DEGRAUS ====================
+
+@pytest.mark.parametrize("lead, gap, expected", [
+    (None, None, REFRESH_MAX_MINUTES),      # nada previsto: intervalo maximo
+    (0.0, None, REFRESH_MIN_MINUTES),       # partida em andamento: minimo, nunca abaixo
+    (10_000.0, None, REFRESH_MAX_MINUTES),  # partida distante: teto
+    (400.0, None, 60),                      # 100 min cai no degrau de 60
+    (None, 100.0, 30),                      # metade do intervalo entre mudancas (50) -> 30
+    (2000.0, 250.0, 120),                   # menor dos dois alvos (500 x 125)
+])
+def test_refresh_minutes_clamps_and_steps_down(lead, gap, expected):
+    assert refresh_minutes(lead, gap) == expected
+
+
+def test_refresh_minutes_always_a_step():
+    for lead in range(0, 5000, 37):
+        assert refresh_minutes(float(lead), None) in REFRESH_STEPS_MINUTES
+
+
+# ==================== CABECALHO ====================
+
+@pytest.mark.parametrize("minutes, text", [(15, "PT15M"), (60, "PT1H"), (90, "PT1H30M"), (720, "PT12H")])
+def test_duration_text(minutes, text):
+    assert _duration(minutes) == text
+
+
+def test_set_refresh_hint_replaces_previous_values():
+    cal = Calendar()
+    cal.add("x-published-ttl", "PT1H")
+    cal.add("refresh-interval", timedelta(hours=1), parameters={"VALUE": "DURATION"})
+    set_refresh_hint(cal, 30)
+    set_refresh_hint(cal, 120)
+
+    ical = cal.to_ical().decode()
+    assert ical.count("X-PUBLISHED-TTL") == 1 and "X-PUBLISHED-TTL:PT2H" in ical
+    assert ical.count("REFRESH-INTERVAL") == 1 and "REFRESH-INTERVAL;VALUE=DURATION:PT2H" in ical
+
+
+def test_apply_refresh_hint_returns_written_interval():
+    cal = Calendar()
+    assert apply_refresh_hint(cal, [_in(130)], [], NOW) == 30
+    assert str(cal.get("x-published-ttl")) == "PT30M"
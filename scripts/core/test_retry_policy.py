@@ -0,0 +1,103 @@
+"""
+Testes da politica de retry: limites do jitter decorrelacionado, orcamento de tempo por URL,
+percentil de latencia e contadores do hedge.
+
+Uso (na raiz do repositorio):
+    python -m pytest scripts/core
+"""
+
+import random
+
+import pytest
+
+import retry_policy
+from retry_policy import Deadline, HedgeStats, LatencyTracker, RetryPolicy
+
+POLICY = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=10.0, attempt_timeout=30.0, deadline=45.0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic controlado: o teste avanca clock["now"]."""
+    state = {"now": 1000.0}
+    monkeypatch.setattr(retry_policy.time, "monotonic", lambda: state["now"])
+    return state
+
+
+# ==================== NEXT_DELAY ====================
+
+@pytest.mark.parametrize("previous", [0.0, 0.5, 1.0, 2.0, 3.0, 9.0, 50.0])
+def test_next_delay_stays_between_base_and_cap(previous):
+    rng = random.Random(42)
+    for _ in range(200):
+        delay = POLICY.next_delay(previous, rng)
+        assert POLICY.base_delay <= delay <= min(POLICY.max_delay, max(POLICY.base_delay, previous * 3))
+
+
+def test_next_delay_below_base_waits_base():
+    assert POLICY.next_delay(0.1, random.Random(1)) == POLICY.base_delay
+
+
+def test_next_delay_grows_and_hits_cap():
+    rng = random.Random(7)
+    delay, delays = POLICY.base_delay, []
+    for _ in range(50):
+        delay = POLICY.next_delay(delay, rng)
+        delays.append(delay)
+    assert max(delays) == POLICY.max_delay
+    assert len(set(delays)) > 1  # jitter: esperas nao sao fixas
+
+
+# ==================== DEADLINE ====================
+
+def test_deadline_remaining_counts_down_to_zero(clock):
+    deadline = Deadline(45.0)
+    assert deadline.remaining() == 45.0
+    clock["now"] += 20.0
+    assert deadline.remaining() == 25.0
+    clock["now"] += 60.0
+    assert deadline.remaining() == 0.0
+
+
+def test_deadline_caps_attempt_timeout(clock):
+    deadline = Deadline(POLICY.deadline)
+    assert deadline.timeout_for(POLICY) == POLICY.attempt_timeout
+    clock["now"] += 40.0
+    assert deadline.timeout_for(POLICY) == 5.0
+
+
+# ==================== LATENCIA / HEDGE ====================
+
+def test_latency_percentile_needs_min_samples():
+    tracker = LatencyTracker(window=10)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        tracker.observe("brightdata", seconds)
+    assert tracker.percentile("brightdata", 95, min_samples=5) is None
+    tracker.observe("brightdata", 20.0)
+    assert tracker.percentile("brightdata", 95, min_samples=5) == 20.0
+    assert tracker.percentile("brightdata", 50) == 3.0
+    assert tracker.percentile("scrapedo", 50) is None
+
+
+def test_latency_window_drops_old_samples():
+    tracker = LatencyTracker(window=3)
+    for seconds in (50.0, 1.0, 2.0, 3.0):
+        tracker.observe("brightdata", seconds)
+    assert tracker.percentile("brightdata", 100) == 3.0
+
+
+def test_hedge_stats_counts_outcomes_and_cost():
+    stats = HedgeStats()
+    for hedge_won, saved in ((True, 4.25), (False, -1.0), (True, 0.5)):
+        stats.record_sent()
+        stats.record_request("scrapedo")
+        stats.record_outcome(hedge_won)
+        stats.record_saved(saved)
+
+    assert stats.as_dict() == {
+        "sent": 3,
+        "won": 2,
+        "lost": 1,
+        "tail_saved_seconds": 4.75,  # ganho negativo nao desconta
+        "extra_requests": {"scrapedo": 3},
+    }
@@ -1,40 +1,28 @@
 """
-Gera teams.json a partir do config.py para consumo pelo frontend.
-Executado pelo workflow do GitHub Actions para manter app.bundle.js sincronizado.
+Gera teams.json a partir do registro de jogos (games.json) para consumo pelo frontend.
+O generate_ics.py ja regrava teams.json no passo de salvamento; este script serve para
+gerar o arquivo manualmente. Executar a partir da raiz do repositorio.
 """
 
-import json
 import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
 
-from config import (
-    CS2_TEAMS,
-    CS2_EXCLUSIONS,
-    VALORANT_TEAMS,
-    ROCKET_LEAGUE_TEAMS,
-    LOL_TEAMS,
-)
+from registry import load_registry
+from feeds import write_teams_feed
+from artifacts import report_verdict
 
 
 def build_teams_json():
-    """Le dados de times do config.py e gera JSON para o frontend."""
-    teams_data = {
-        "cs2": sorted(CS2_TEAMS),
-        "valorant": sorted(VALORANT_TEAMS),
-        "rocket": sorted(ROCKET_LEAGUE_TEAMS),
-        "lol": sorted(LOL_TEAMS),
-    }
-
-    output_path = os.path.join(os.path.dirname(__file__), "teams.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(teams_data, f, indent=2, ensure_ascii=False)
+    """Le times do registro compilado e grava teams.json (somente se mudou)."""
+    teams_data = write_teams_feed(load_registry())
 
     total = sum(len(v) for v in teams_data.values())
     print(f"teams.json gerado com {total} times ({len(teams_data)} jogos)")
     for game, teams in teams_data.items():
         print(f"  {game}: {len(teams)} times")
+    report_verdict()
 
 
 if __name__ == "__main__":
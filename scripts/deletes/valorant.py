@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from calendar_manager import CalendarManager
 from logger import setup_logger
+from profiling import profile_run
 
 PREFIX = "[V] "
 LABEL = "Valorant"
@@ -42,5 +43,6 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    with profile_run("delete_valorant", enabled="--profile" in sys.argv[1:]):
+        success = main()
     sys.exit(0 if success else 1)
@@ -0,0 +1,327 @@
+"""
+Servidor HTTP local (opcional) de feeds filtrados por time e jogo.
+
+Mantem os eventos do calendar.ics em memoria com indices por jogo e por time e serve
+ICS ou JSON filtrados por query string. Respostas renderizadas ficam num cache LRU;
+ETag usa o hash do conteudo do calendar.ics (estavel entre reinicios do servidor), entao
+clientes revalidam com If-None-Match e recebem 304 enquanto o arquivo nao mudar.
+
+/changes.json?since=N devolve so o delta desde a versao N do changelog (ver changelog.py).
+
+Uso:
+    python scripts/server/feed_server.py --port 8080
+    curl "http://127.0.0.1:8080/calendar.ics?teams=FURIA,LOUD&games=CS2,LOL"
+    curl "http://127.0.0.1:8080/events.json?games=VAL"
+    curl "http://127.0.0.1:8080/changes.json?since=42"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, FrozenSet, List, Set
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
+
+import pytz
+from icalendar import Calendar
+
+from config import CALENDAR_FILENAME, CHANGELOG_FILE, normalize_team
+from calendar_manager import load_calendar, _get_event_start, _loaded_bytes
+from changelog import changes_since
+from feeds import calendar_shell, event_entry, parse_summary, prefix_table
+from registry import load_registry
+from logger import setup_logger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_CACHE_SIZE = 256
+RELOAD_CHECK_SECONDS = 1.0  # Intervalo minimo entre os stat() do calendario
+
+logger = setup_logger("feed_server")
+
+
+@dataclass
+class StoredEvent:
+    start: datetime
+    game: str
+    team1: str
+    team2: str
+    component: object
+
+
+@dataclass
+class Snapshot:
+    """Conjunto imutavel de eventos de uma versao dos dados. Trocado inteiro a cada recarga."""
+    version: int  # Recargas neste processo (so para log)
+    tag: str      # Hash do calendar.ics: base do ETag
+    header: Calendar
+    events: List[StoredEvent]  # Ordenados por horario
+    by_game: Dict[str, Set[int]] = field(default_factory=dict)
+    by_team: Dict[str, Set[int]] = field(default_factory=dict)
+
+    def query(self, teams: FrozenSet[str], games: FrozenSet[str]) -> List[StoredEvent]:
+        """Eventos (em ordem de horario) que batem com todos os filtros informados."""
+        selected = None
+        if games:
+            selected = set().union(*(self.by_game.get(g, set()) for g in games))
+        if teams:
+            team_ids = set().union(*(self.by_team.get(t, set()) for t in teams))
+            selected = team_ids if selected is None else selected & team_ids
+        if selected is None:
+            return self.events
+        return [self.events[i] for i in sorted(selected)]
+
+
+class EventStore:
+    """Carrega o calendario, monta indices e recarrega quando o arquivo muda (mtime)."""
+
+    def __init__(self, path: str = CALENDAR_FILENAME):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._last_check = 0.0
+        self._snapshot = None
+        self.reload()
+
+    def reload(self) -> Snapshot:
+        with self._lock:
+            mtime_ns = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+            cal = load_calendar(self.path)
+            version = (self._snapshot.version + 1) if self._snapshot else 1
+            self._snapshot = _build_snapshot(cal, version, _content_tag(self.path))
+            self._mtime_ns = mtime_ns
+            self._last_check = time.monotonic()
+        logger.info(
+            f"\U0001f4c2 Calendario carregado: {len(self._snapshot.events)} eventos (versao {version})"
+        )
+        return self._snapshot
+
+    def snapshot(self) -> Snapshot:
+        """Snapshot atual; recarrega se o calendario mudou desde a ultima verificacao."""
+        now = time.monotonic()
+        if now - self._last_check >= RELOAD_CHECK_SECONDS:
+            self._last_check = now
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns != self._mtime_ns:
+                return self.reload()
+        return self._snapshot
+
+
+def _content_tag(path: str) -> str:
+    """Hash curto dos bytes lidos por load_calendar: mesmo conteudo, mesmo ETag, em qualquer processo."""
+    return hashlib.sha1(_loaded_bytes.get(path, b"")).hexdigest()[:16]
+
+
+def _build_snapshot(cal: Calendar, version: int, tag: str) -> Snapshot:
+    prefixes = prefix_table(load_registry())
+    events = []
+    for comp in cal.walk("VEVENT"):
+        start = _get_event_start(comp)
+        parsed = parse_summary(str(comp.get("summary", "")), prefixes)
+        if start is None or parsed is None:
+            continue
+        game, team1, team2 = parsed
+        events.append(StoredEvent(start, game, team1, team2, comp))
+    events.sort(key=lambda e: e.start)
+
+    snapshot = Snapshot(version=version, tag=tag, header=calendar_shell(cal, "filtrado"), events=events)
+    for i, event in enumerate(events):
+        snapshot.by_game.setdefault(event.game, set()).add(i)
+        for team in (event.team1, event.team2):
+            snapshot.by_team.setdefault(normalize_team(team), set()).add(i)
+    return snapshot
+
+
+class LRUCache:
+    """Cache LRU thread-safe de respostas renderizadas."""
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+
+def _parse_list(query: Dict[str, List[str]], name: str) -> FrozenSet[str]:
+    values = ",".join(query.get(name, []))
+    return frozenset(v.strip() for v in values.split(",") if v.strip())
+
+
+def render_ics(snapshot: Snapshot, events: List[StoredEvent]) -> bytes:
+    cal = Calendar()
+    for name, value in snapshot.header.items():
+        cal[name] = value
+    for event in events:
+        cal.add_component(event.component)
+    return cal.to_ical()
+
+
+def render_json(snapshot: Snapshot, events: List[StoredEvent]) -> bytes:
+    payload = {
+        "version": snapshot.version,
+        "generated_at": datetime.now(pytz.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "events": [
+            {"game": e.game, **event_entry(e.component, e.start, e.team1, e.team2)} for e in events
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+RENDERERS = {
+    "/calendar.ics": ("text/calendar; charset=utf-8", render_ics),
+    "/events.json": ("application/json; charset=utf-8", render_json),
+}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive para clientes e carga de teste
+    disable_nagle_algorithm = True  # cabecalho e corpo saem em writes separados; evita atraso de 40ms
+    server_version = "EsportCalendarFeed/1.0"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/healthz":
+            self._send(200, "text/plain; charset=utf-8", b"ok\n")
+            return
+        if url.path == "/changes.json":
+            self._send_changes(parse_qs(url.query))
+            return
+        if url.path not in RENDERERS:
+            self._send(404, "text/plain; charset=utf-8", b"not found\n")
+            return
+
+        query = parse_qs(url.query)
+        teams = frozenset(normalize_team(t) for t in _parse_list(query, "teams"))
+        games = frozenset(g.upper() for g in _parse_list(query, "games"))
+
+        store: EventStore = self.server.store
+        cache: LRUCache = self.server.cache
+        snapshot = store.snapshot()
+
+        key = (snapshot.tag, url.path, teams, games)
+        etag = '"d%s-%s"' % (
+            snapshot.tag,
+            hashlib.sha1(repr((url.path, sorted(teams), sorted(games))).encode("utf-8")).hexdigest()[:12],
+        )
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, b"", etag)
+            return
+
+        content_type, render = RENDERERS[url.path]
+        body = cache.get(key)
+        if body is None:
+            body = render(snapshot, snapshot.query(teams, games))
+            cache.put(key, body)
+        self._send(200, content_type, body, etag)
+
+    def _send_changes(self, query: Dict[str, List[str]]) -> None:
+        """Delta do changelog desde ?since=N; cache e ETag pela versao do arquivo em disco."""
+        try:
+            since = int(query.get("since", ["0"])[0])
+        except ValueError:
+            self._send(400, "text/plain; charset=utf-8", b"since deve ser inteiro\n")
+            return
+
+        path = self.server.changelog_path
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        etag = '"c%x-%d"' % (mtime_ns, since)
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, b"", etag)
+            return
+
+        cache: LRUCache = self.server.cache
+        key = ("changes", mtime_ns, since)
+        body = cache.get(key)
+        if body is None:
+            body = json.dumps(changes_since(since, path=path), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            cache.put(key, body)
+        self._send(200, "application/json; charset=utf-8", body, etag)
+
+    def _send(self, status: int, content_type: str | None, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        logger.debug(format % args, extra={"url": self.path, "status": args[1] if len(args) > 1 else None})
+
+
+def create_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    calendar_path: str = CALENDAR_FILENAME,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    changelog_path: str = CHANGELOG_FILE,
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), FeedHandler)
+    server.daemon_threads = True
+    server.store = EventStore(calendar_path)
+    server.cache = LRUCache(cache_size)
+    server.changelog_path = changelog_path
+    return server
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor local de feeds filtrados")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--calendar", default=CALENDAR_FILENAME, help="Arquivo ICS de origem")
+    parser.add_argument("--changelog", default=CHANGELOG_FILE, help="Changelog servido em /changes.json")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Respostas no cache LRU")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> None:
+    args = parse_args(argv)
+    server = create_server(args.host, args.port, args.calendar, args.cache_size, args.changelog)
+    logger.info(f"\U0001f310 Servindo feeds em http://{args.host}:{args.port}/calendar.ics e /events.json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
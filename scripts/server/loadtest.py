@@ -0,0 +1,114 @@
+"""
+Teste de carga do feed_server: N conexoes keep-alive em paralelo por um tempo fixo.
+
+Mede requisicoes por segundo, percentis de latencia e distribuicao de status. Com
+--revalidate os clientes reenviam o ETag recebido (If-None-Match), simulando apps de
+calendario que revalidam periodicamente.
+
+Uso:
+    python scripts/server/feed_server.py --port 8080 &
+    python scripts/server/loadtest.py --url http://127.0.0.1:8080 --concurrency 8 --duration 10
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from collections import Counter
+from typing import List
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = (
+    "/calendar.ics",
+    "/events.json",
+    "/calendar.ics?teams=FURIA,LOUD",
+    "/calendar.ics?games=CS2,LOL",
+    "/events.json?teams=FURIA&games=CS2",
+)
+
+
+class Worker(threading.Thread):
+    def __init__(self, host: str, port: int, paths: List[str], deadline: float, revalidate: bool):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.paths = paths
+        self.deadline = deadline
+        self.revalidate = revalidate
+        self.latencies: List[float] = []
+        self.statuses = Counter()
+        self.bytes_received = 0
+
+    def run(self) -> None:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        etags = {}
+        i = 0
+        while time.perf_counter() < self.deadline:
+            path = self.paths[i % len(self.paths)]
+            i += 1
+            headers = {"If-None-Match": etags[path]} if self.revalidate and path in etags else {}
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException):
+                self.statuses["error"] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+                continue
+            self.latencies.append(time.perf_counter() - started)
+            self.statuses[resp.status] += 1
+            self.bytes_received += len(body)
+            if resp.getheader("ETag"):
+                etags[path] = resp.getheader("ETag")
+        conn.close()
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga do feed_server")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Base do servidor")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conexoes simultaneas")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duracao em segundos")
+    parser.add_argument("--path", action="append", dest="paths", help="Caminho a requisitar (repetivel)")
+    parser.add_argument("--revalidate", action="store_true", help="Reenvia ETag (If-None-Match)")
+    args = parser.parse_args(argv)
+
+    base = urlsplit(args.url)
+    paths = args.paths or list(DEFAULT_PATHS)
+    deadline = time.perf_counter() + args.duration
+    workers = [
+        Worker(base.hostname, base.port or 80, paths[i % len(paths):] + paths[:i % len(paths)], deadline, args.revalidate)
+        for i in range(args.concurrency)
+    ]
+
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for w in workers for l in w.latencies)
+    statuses = sum((w.statuses for w in workers), Counter())
+    total_bytes = sum(w.bytes_received for w in workers)
+
+    print(f"{len(latencies)} requisicoes em {elapsed:.1f}s com {args.concurrency} conexoes")
+    print(f"  RPS:        {len(latencies) / elapsed:.0f}")
+    print(
+        f"  Latencia:   p50 {_percentile(latencies, 50) * 1000:.2f} ms | p95 {_percentile(latencies, 95) * 1000:.2f} ms "
+        f"| p99 {_percentile(latencies, 99) * 1000:.2f} ms"
+    )
+    print(f"  Recebido:   {total_bytes / 1e6:.1f} MB")
+    print(f"  Status:     {dict(sorted(statuses.items(), key=lambda kv: str(kv[0])))}")
+    return 0 if latencies and not statuses.get("error") else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())